@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Cost of showing the page images through file paths and through labsim.assets.
+
+For every image the pages show, two numbers are reported:
+
+* bytes: the size of the file on disk and of the palette PNG that
+  ``labsim.assets`` stores and hands to Streamlit (what the browser
+  downloads);
+* per call: the time ``st.image`` spends turning the image into a media
+  file, measured on Streamlit's ``marshall_images``, which ``st.image`` calls.
+  For a path this reads the file and parses it with PIL; the 150 px logo
+  is also resized and re-encoded, on every rerun.  For the stored bytes
+  only the PNG header is parsed.
+
+The first call of ``assets.load`` (resize and palette encoding) is timed
+separately; it happens once per server process.
+
+Run from the repository root:
+    python benchmarks/bench_assets.py [calls per image]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from streamlit.elements.lib.image_utils import marshall_images
+from streamlit.elements.lib.layout_utils import LayoutConfig
+from streamlit.proto.Image_pb2 import ImageList as ImageListProto
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from labsim import assets  # noqa: E402
+
+IMAGES = [(f"images/{p.name}", "stretch") for p in sorted((ROOT / "images").glob("*.png"))]
+IMAGES.append(("image_a2e0d8.png", 150))
+
+
+def per_call(image, width, calls):
+    layout = LayoutConfig(width=width)
+    start = time.perf_counter()
+    for _ in range(calls):
+        marshall_images("bench", image, None, layout, ImageListProto(), clamp=False)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'image':38} {'file':>8} {'stored':>8} {'first load':>11} {'path/call':>10} {'asset/call':>11}")
+    totals = [0, 0, 0.0, 0.0]
+    for path, width in IMAGES:
+        start = time.perf_counter()
+        asset = assets.load(path, width)
+        first = time.perf_counter() - start
+        file_bytes = (ROOT / path).stat().st_size
+        from_path = per_call(str(ROOT / path), width, calls)
+        from_asset = per_call(asset.data, width, calls)
+        totals[0] += file_bytes
+        totals[1] += len(asset.data)
+        totals[2] += from_path
+        totals[3] += from_asset
+        print(f"{path:38} {file_bytes / 1024:6.0f}kB {len(asset.data) / 1024:6.0f}kB "
+              f"{first * 1000:9.0f}ms {from_path * 1000:8.2f}ms {from_asset * 1000:9.2f}ms")
+    print(f"{'total':38} {totals[0] / 1024:6.0f}kB {totals[1] / 1024:6.0f}kB "
+          f"{'':>11} {totals[2] * 1000:8.2f}ms {totals[3] * 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
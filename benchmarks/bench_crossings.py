@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Edge timing of the Comparator page from the sample grid and from
+labsim.crossings.
+
+A 100 Hz sine of 1 V amplitude is compared with a reference of 0.3 V, whose
+exact crossing instants are known.  For a range of sample densities the
+table lists the largest error of the edge times, in sample periods and in
+microseconds, when an edge is put on the first sample past the reference
+(what thresholding every sample gives) and when it is interpolated between
+the samples, together with the duty cycle each one measures (exact:
+``0.5 - asin(0.3) / pi``).
+
+The noisy case adds Gaussian noise and counts the edges found with and
+without a hysteresis band; the kernel is then timed on a million samples.
+
+Last, the slew-limited output of ``crossings.slewed`` (0.5 V/µs, 1 µs
+delay, the page defaults) is built from those edges and compared with a
+per-sample recursion that moves the output at most ``slew_rate * dt`` per
+sample towards the rail the delayed input asks for.
+
+Run from the repository root:
+    python benchmarks/bench_crossings.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from labsim import crossings  # noqa: E402
+
+FREQ = 100.0
+LEVEL = 0.3
+CYCLES = 10
+NOISE = 0.05  # V RMS
+RAIL = 15.0
+SLEW_RATE = 0.5e6  # V/s
+DELAY = 1e-6  # s
+BAND = 0.3  # V
+
+
+def exact_edges():
+    offset = np.arcsin(LEVEL) / (2 * np.pi)
+    cycle = np.arange(CYCLES)
+    return np.sort(np.concatenate([cycle + offset, cycle + 0.5 - offset])) / FREQ
+
+
+def sampled(points_per_cycle):
+    t = np.arange(CYCLES * points_per_cycle) / (points_per_cycle * FREQ)
+    return t, np.sin(2 * np.pi * FREQ * t)
+
+
+def grid_edges(y, t):
+    above = y > LEVEL
+    return t[np.flatnonzero(above[1:] != above[:-1]) + 1]
+
+
+def duty(times):
+    # The first edge of the sine is rising.
+    rising = times[::2]
+    return (times[1:-1:2] - rising[:-1]).sum() / (rising[-1] - rising[0])
+
+
+def slew_loop(y, t):
+    """Per-sample slew-limited output, stepping towards the rail of the delayed input."""
+    dt = t[1] - t[0]
+    shift = int(round(DELAY / dt))
+    ramp = SLEW_RATE * dt
+    out = np.empty(len(y))
+    level = RAIL if y[0] > LEVEL else -RAIL
+    for n in range(len(y)):
+        target = RAIL if y[max(n - shift, 0)] > LEVEL else -RAIL
+        level = min(level + ramp, target) if target > level else max(level - ramp, target)
+        out[n] = level
+    return out
+
+
+def main():
+    exact = exact_edges()
+    print(f"exact duty cycle {0.5 - np.arcsin(LEVEL) / np.pi:.6f}")
+    print(f"{'points/cycle':>12} {'grid error':>22} {'interpolated error':>26} {'grid duty':>10} {'interp duty':>12}")
+    for points in (10, 20, 50, 100, 1000):
+        t, y = sampled(points)
+        step = t[1] - t[0]
+        on_grid = grid_edges(y, t)
+        between = crossings.edges(y, t, LEVEL).times
+        grid_error = np.abs(on_grid - exact).max()
+        error = np.abs(between - exact).max()
+        print(f"{points:>12} {grid_error / step:>8.3f} smp {grid_error * 1e6:>8.2f} µs "
+              f"{error / step:>10.2e} smp {error * 1e6:>9.4f} µs {duty(on_grid):>10.6f} {duty(between):>12.6f}")
+
+    t, y = sampled(100)
+    y = y + NOISE * np.random.default_rng(0).standard_normal(len(y))
+    plain = crossings.edges(y, t, LEVEL)
+    banded = crossings.edges(y, t, LEVEL, band=BAND)
+    jitter = crossings.timing(banded).jitter
+    print(f"\nnoise {NOISE} V RMS: {len(plain.times)} crossings without a band, "
+          f"{len(banded.times)} edges with a {BAND} V band (exact {len(exact)}), "
+          f"period jitter {jitter * 1e6:.1f} µs p-p")
+
+    t, y = sampled(100_000)
+    start = time.perf_counter()
+    found = crossings.edges(y, t, LEVEL)
+    crossings.timing(found)
+    print(f"edges + timing of {len(y)} samples: {1e3 * (time.perf_counter() - start):.1f} ms")
+
+    start = time.perf_counter()
+    times, values = crossings.slewed(found, t[0], t[-1], RAIL, -RAIL, SLEW_RATE, DELAY)
+    fast = time.perf_counter() - start
+    start = time.perf_counter()
+    reference = slew_loop(y, t)
+    slow = time.perf_counter() - start
+    difference = np.abs(np.interp(t, times, values) - reference).max()
+    print(f"slewed output, {len(found.times)} edges: {len(times)} breakpoints in {1e3 * fast:.2f} ms; "
+          f"per-sample loop {1e3 * slow:.0f} ms, max difference {difference:.3f} V "
+          f"(one sample of slew is {SLEW_RATE * (t[1] - t[0]):.3f} V)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Load test for CRO figure rendering with one thread per simulated session.
+
+Each worker renders the three CRO figures of the comparator page with
+fresh parameters (so the figure cache never hits), the way a Streamlit
+session thread does on a miss.  Two strategies are compared:
+
+* pyplot: plt.subplots/plt.close behind one global lock, which is what
+  sessions need to stay clear of each other on pyplot's figure manager;
+* agg: labsim.figures' private Figure + Agg canvas, no shared state.
+
+Throughput is reported in figures per second for each thread count.  How
+far the agg column scales depends on the cores available and on how much of
+Agg/zlib runs with the GIL released.
+
+Run from the repository root:
+    python benchmarks/bench_figure_threads.py [figures per thread]
+"""
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from labsim import figures  # noqa: E402
+from labsim.decimate import RENDER_DPI, plot_trace  # noqa: E402
+from labsim.waveforms import generate_waveform  # noqa: E402
+
+THREAD_COUNTS = (1, 2, 4, 8)
+_pyplot_lock = threading.Lock()
+
+
+def make_draw(seed):
+    """A comparator-page CRO figure whose data is unique to ``seed``."""
+    v_ref = 0.2 + 0.001 * seed
+    y_in, t, amp, total_duration, _ = generate_waveform(1.0 + 0.001 * seed, 1000.0, 1)
+    y_out = np.where(y_in > v_ref, 15.0, -15.0)
+
+    def draw(ax):
+        plot_trace(ax, t, y_in, color='lime', label='Input (Ch 1)')
+        plot_trace(ax, t, y_out, color='cyan', label='Output (Ch 2)')
+        ax.set_facecolor("black")
+        ax.axhline(0, color='gray', linewidth=0.5)
+        ax.axhline(v_ref, color='red', linestyle='--', linewidth=1, label=f'V_ref={v_ref:.2f}V')
+        ax.set_ylim(-18, 18)
+        ax.set_xlim(0, total_duration)
+        ax.set_xlabel("Time (sec)")
+        ax.set_ylabel("Voltage (V)")
+        ax.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
+        ax.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
+
+    return draw
+
+
+def render_pyplot(draw):
+    with _pyplot_lock:
+        fig, ax = plt.subplots(figsize=(3, 2), dpi=100)
+        try:
+            draw(ax)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=RENDER_DPI, bbox_inches="tight")
+        finally:
+            plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_agg(draw):
+    return figures._rasterize(draw, (3, 2), 100)
+
+
+def throughput(render, n_threads, per_thread):
+    draws = [make_draw(i) for i in range(n_threads * per_thread)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        sizes = list(pool.map(render, draws))
+    elapsed = time.perf_counter() - start
+    assert all(sizes)
+    return len(draws) / elapsed
+
+
+def main():
+    per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    render_agg(make_draw(0))  # import and font-cache warm-up
+    render_pyplot(make_draw(0))
+
+    # Same pixels either way.
+    same = render_agg(make_draw(1)) == render_pyplot(make_draw(1))
+    print(f"identical PNG bytes from both paths: {same}")
+
+    print(f"{'threads':>7} {'pyplot (fig/s)':>15} {'agg (fig/s)':>12} {'agg scaling':>12}")
+    base = None
+    for n in THREAD_COUNTS:
+        locked = throughput(render_pyplot, n, per_thread)
+        private = throughput(render_agg, n, per_thread)
+        base = base or private
+        print(f"{n:>7} {locked:>15.1f} {private:>12.1f} {private / base:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Rerun time and message volume of a slider drag in the Simulation tab, with
+and without the fragment around it.
+
+Each step moves the amplitude slider and reruns the page twice through
+streamlit's AppTest.  In the "new" scenario every value is one not seen
+before, so the simulation and figure caches miss, as during a drag.  In the
+"cached" scenario the slider alternates between two values whose results
+are cached, which leaves mostly the cost of the rest of the page.  The two
+reruns are:
+
+* full: a plain rerun of the whole script, which is what every interaction
+  cost before the Simulation tab became a fragment (all six tabs, the MCQ
+  blocks, Theory images and Feedback form);
+* fragment: the rerun the browser requests for a widget inside the
+  fragment, i.e. RerunData(fragment_id=...), which only runs
+  ``simulation_tab``.
+
+Message volume is the serialized size of the ForwardMsgs the run enqueues,
+i.e. what goes over the websocket before compression.  st.image data is
+fetched separately over HTTP and is the same in both modes.
+
+Run from the repository root:
+    python benchmarks/bench_fragment_rerun.py [steps]
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import streamlit.testing.v1.local_script_runner as local_script_runner
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+CASES = (
+    ("pages/3_Integrator_Differentiator.py", "amplitude_slider_sim"),
+    ("pages/5_Comparator.py", "amplitude_slider_comparator"),
+    ("pages/6_Schmitt_Trigger.py", "amplitude_slider_schmitt"),
+    ("pages/11_Active_Filter.py", "amplitude_slider_filter"),
+)
+
+
+class Probe:
+    """Records the messages of each run and injects the fragment id."""
+
+    def __init__(self):
+        self.fragment_id = None
+        self.nbytes = 0
+        self.fragment_ids = set()
+        self._parse = local_script_runner.parse_tree_from_messages
+        self._rerun_data = local_script_runner.RerunData
+        local_script_runner.parse_tree_from_messages = self.parse
+        local_script_runner.RerunData = self.rerun_data
+
+    def parse(self, messages):
+        deltas = [m.delta for m in messages if m.HasField("delta")]
+        self.nbytes = sum(m.ByteSize() for m in messages)
+        self.fragment_ids = {d.fragment_id for d in deltas if d.fragment_id}
+        return self._parse(messages)
+
+    def rerun_data(self, **kwargs):
+        if self.fragment_id is not None:
+            kwargs["fragment_id"] = self.fragment_id
+        return self._rerun_data(**kwargs)
+
+
+def measure(probe, page, key, steps, cached):
+    at = AppTest.from_file(str(ROOT / page), default_timeout=120).run()
+    assert not at.exception, at.exception
+    fragment_id, = probe.fragment_ids
+    slider = at.slider(key=key)
+
+    results = {"full": [], "fragment": []}
+    for i in range(-1 if cached else 0, steps):
+        for mode in ("full", "fragment"):
+            probe.fragment_id = fragment_id if mode == "fragment" else None
+            if cached:
+                value = 1.5 if mode == "full" else 1.0
+            else:
+                value = round(1.0 + 0.0137 * (2 * i + (mode == "fragment")), 3)
+            start = time.perf_counter()
+            slider.set_value(value).run()
+            elapsed = time.perf_counter() - start
+            assert not at.exception, at.exception
+            if i >= 0:
+                results[mode].append((elapsed, probe.nbytes))
+            slider = at.slider(key=key)
+    probe.fragment_id = None
+    return results
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    probe = Probe()
+    print(f"{'page':<30} {'values':<7} {'mode':<9} {'rerun (ms)':>10} {'messages (kB)':>14}")
+    for page, key in CASES:
+        for cached in (False, True):
+            results = measure(probe, page, key, steps, cached)
+            for mode, samples in results.items():
+                ms = 1e3 * statistics.median(s[0] for s in samples)
+                kb = statistics.median(s[1] for s in samples) / 1024
+                print(f"{Path(page).stem:<30} {'cached' if cached else 'new':<7} {mode:<9} "
+                      f"{ms:>10.0f} {kb:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time report of the first view of each page after a server start.
+
+Every page runs once in a fresh interpreter started with
+``python -X importtime``.  Streamlit and its AppTest harness are imported
+before the measurement starts (the server has them loaded before the first
+session connects), so the report only contains what the page run itself
+imports: the page's own imports plus whatever the tab that is open needs.
+
+Two views are measured per experiment page:
+
+* Objective: the tab a page opens on, i.e. the first view after a server
+  (re)start;
+* Simulation: the first view of the Simulation tab, which needs the
+  simulation libraries.
+
+For each run the total import time is listed together with the share of the
+heavy packages (numpy, pandas, pyarrow, scipy, matplotlib, PIL) and the wall
+time of the run.
+
+Run from the repository root:
+    python benchmarks/bench_imports.py [page name filter ...]
+"""
+
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("numpy", "pandas", "pyarrow", "scipy", "matplotlib", "PIL")
+MARKER = "@@page-run"
+
+RUN_PAGE = """
+import sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({page!r}, default_timeout=600)
+if {section!r}:
+    at.session_state["sections:" + {stem!r}] = {section!r}
+sys.stderr.write("{marker}\\n")
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+sys.stderr.write("{marker} %.6f %d\\n" % (elapsed, len(at.exception)))
+"""
+
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)")
+
+
+def measure(page, section):
+    """(total import seconds, {package: seconds}, run seconds, exceptions)."""
+    code = RUN_PAGE.format(root=str(ROOT), page=str(page), stem=page.stem,
+                           section=section, marker=MARKER)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True).stderr
+    lines = stderr.splitlines()
+    markers = [i for i, line in enumerate(lines) if line.startswith(MARKER)]
+    if len(markers) != 2:
+        raise RuntimeError(f"{page.name} did not run:\n{stderr[-2000:]}")
+    start, end = markers
+    _, elapsed, exceptions = lines[end].split()
+
+    # importtime lists a module after everything it imported, one level of
+    # indentation deeper.  Rebuild that tree and book each heavy package at
+    # the outermost place it appears, whoever imported it.
+    stack = []
+    for line in lines[start + 1:end]:
+        match = _LINE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(2))
+        children = []
+        while stack and stack[-1][0] > depth:
+            children.append(stack.pop())
+        stack.append((depth, match.group(3), int(match.group(1)) / 1e6, children))
+    total = sum(node[2] for node in stack)
+    packages = defaultdict(float)
+    pending = list(stack)
+    while pending:
+        _, name, cumulative, children = pending.pop()
+        root = name.split(".")[0]
+        if root in HEAVY:
+            packages[root] += cumulative
+        else:
+            pending.extend(children)
+    return total, packages, float(elapsed), int(exceptions)
+
+
+def main():
+    pages = sorted((ROOT / "pages").glob("[0-9]*.py"), key=lambda p: int(p.name.split("_")[0]))
+    if len(sys.argv) > 1:
+        pages = [p for p in pages if any(a in p.name for a in sys.argv[1:])]
+
+    print(f"{'page':36} {'view':10} {'imports':>8} {'run':>7}  heavy packages imported (ms)")
+    for page in pages:
+        views = ["Objective", "Simulation"] if "sections.lab_tabs" in page.read_text(encoding="utf-8") else [""]
+        for section in views:
+            total, packages, elapsed, exceptions = measure(page, section)
+            heavy = ", ".join(f"{name} {packages[name] * 1000:.0f}" for name in HEAVY if name in packages)
+            note = f"  ({exceptions} exceptions)" if exceptions else ""
+            print(f"{page.name:36} {section or '-':10} {total * 1000:6.0f}ms {elapsed * 1000:5.0f}ms  "
+                  f"{heavy or '-'}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Timing of labsim.opamp.transient and transient_periodic against the
+per-sample loop transient_reference, at the page's largest capture size.
+
+Each scenario is an inverting stage (or a follower) of the default op-amp
+(1 MHz GBW, 0.5 V/us, +-15 V rails) driven hard enough to exercise one of
+the segment types: linear only, clipping at the rails, slewing square
+edges, a follower that slews for most of the period, and a triangle well
+above the closed-loop bandwidth.  The largest deviation of the segment-wise
+output from the loop is reported next to the timings.
+
+The segment-wise paths are timed as the best of three runs, so the scipy
+import on their first call is not counted.
+
+Run from the repository root:
+    python benchmarks/bench_opamp.py [samples]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from labsim import opamp  # noqa: E402
+from labsim import waveforms  # noqa: E402
+
+CYCLES = 3
+
+# name, waveform, amplitude (V), frequency (Hz), ideal gain, noise gain
+SCENARIOS = [
+    ("linear sine, G=-10", waveforms.sine, 0.5, 1e3, -10.0, 11.0),
+    ("clipped sine, G=-10", waveforms.sine, 3.0, 1e3, -10.0, 11.0),
+    ("square, slew + rails", waveforms.square, 2.0, 10e3, -10.0, 11.0),
+    ("follower, 100 kHz slew", waveforms.sine, 5.0, 100e3, 1.0, 1.0),
+    ("triangle, 1 MHz", waveforms.triangle, 1.0, 1e6, -10.0, 11.0),
+]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    samples = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    print(f"{'scenario':24} {'loop (ms)':>10} {'transient':>10} {'periodic':>10} {'max error (V)':>14}")
+    for name, wave, amp, freq, gain, noise_gain in SCENARIOS:
+        t = waveforms.time_base(samples, CYCLES / freq)
+        x = wave(t, freq, amp)
+        dt = t[1] - t[0]
+        dc_gain, bandwidth = opamp.closed_loop(gain, noise_gain)
+        slow, reference = best_of(lambda: opamp.transient_reference(x, dt, dc_gain, bandwidth), 1)
+        fast, y = best_of(lambda: opamp.transient(x, dt, dc_gain, bandwidth), 3)
+        periodic, _ = best_of(lambda: opamp.transient_periodic(x, dt, dc_gain, bandwidth), 3)
+        error = np.max(np.abs(y - reference))
+        print(f"{name:24} {1e3 * slow:>10.0f} {1e3 * fast:>10.1f} {1e3 * periodic:>10.1f} {error:>14.1e}")
+
+
+if __name__ == "__main__":
+    main()
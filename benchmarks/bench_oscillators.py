@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Timing of the oscillator start-up simulations in labsim.oscillators against
+a plain fixed-step RK4 loop over the same state equations.
+
+For each case the block-vectorized simulation runs until its envelope
+settles; the RK4 loop then integrates the same number of samples, one
+Python step per sample (``RK4_SUBSTEPS`` substeps each), and the largest
+difference between the two outputs is reported.  The lamp-stabilized Wien
+bridge updates its gain once per cycle, which the RK4 loop does not model,
+so only its timing is listed.  The first call pays the scipy import and is
+not timed.
+
+The astable multivibrator of the Square Wave Generator page is timed over
+its five displayed cycles at frequencies from 1 Hz to 100 kHz:
+``oscillators.astable`` plus ``astable_trace`` at ``DISPLAY_POINTS``
+points, against a per-sample loop at the page's old sample rate
+(``max(100 f, 1000)`` samples per second) that advances the capacitor
+exactly from sample to sample and switches at the first sample past a
+threshold.  The last column is how far that loop's last switch lands from
+the exact one, in sample periods: every switch comes up to a sample late
+and starts the next half-cycle beyond the threshold, so the loop drifts
+about one sample behind per switch.
+
+Run from the repository root:
+    python benchmarks/bench_oscillators.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from labsim import oscillators  # noqa: E402
+
+R = 10e3  # Ω, page defaults
+C = 0.1e-6  # F
+RK4_SUBSTEPS = 4
+BETA = 0.5  # R1 = R2
+DISPLAY_POINTS = 2000
+
+# name, start-up call, (matrix, drive, sense, output map) for the RK4 loop, formula period in RC
+CASES = [
+    (f"phase shift A={gain:g}",
+     lambda gain=gain: oscillators.phase_shift_startup(R, C, gain),
+     (oscillators.LADDER, oscillators.LADDER_DRIVE, np.ones(3),
+      oscillators._clipped(gain / (1 + gain), oscillators.RAIL)),
+     2 * np.pi * np.sqrt(6))
+    for gain in (29.5, 30.0, 32.0, 60.0)
+] + [
+    (f"Wien {stabilizer} G={gain:g}",
+     lambda gain=gain, stabilizer=stabilizer: oscillators.wien_startup(R, C, gain, stabilizer),
+     None if stabilizer == "lamp" else
+     (oscillators.WIEN, oscillators.WIEN_DRIVE, oscillators.WIEN_SENSE,
+      (oscillators._diode_limited if stabilizer == "diodes" else oscillators._clipped)(gain, oscillators.RAIL)),
+     2 * np.pi)
+    for stabilizer in oscillators.STABILIZERS for gain in (3.05, 3.2)
+]
+
+
+def rk4(system, period, samples):
+    matrix, drive, sense, (breaks, slopes, offsets) = system
+    breaks, slopes, offsets = np.array(breaks), np.array(slopes), np.array(offsets)
+    h = period / oscillators.STEPS_PER_CYCLE / RK4_SUBSTEPS
+    x = oscillators.SEED * np.random.default_rng(0).standard_normal(len(drive))
+    y = np.empty(samples)
+
+    def output(x):
+        d = sense @ x
+        piece = np.searchsorted(breaks, d)
+        return slopes[piece] * d + offsets[piece]
+
+    def slope(x):
+        return matrix @ x + drive * output(x)
+
+    for n in range(samples):
+        y[n] = output(x)
+        for _ in range(RK4_SUBSTEPS):
+            k1 = slope(x)
+            k2 = slope(x + h / 2 * k1)
+            k3 = slope(x + h / 2 * k2)
+            k4 = slope(x + h * k3)
+            x = x + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+    return y
+
+
+def main():
+    CASES[0][1]()
+    print(f"{'case':24} {'cycles':>7} {'samples':>8} {'RK4 loop (ms)':>14} {'vectorized (ms)':>16} {'max diff (V)':>13}")
+    for name, startup, system, period in CASES:
+        start = time.perf_counter()
+        t, y, frequency, settled = startup()
+        fast = time.perf_counter() - start
+        cycles = len(oscillators.cycle_envelope(y)[0])
+        if system is None:
+            print(f"{name:24} {cycles:>7} {len(y):>8} {'-':>14} {1e3 * fast:>16.1f} {'-':>13}")
+            continue
+        start = time.perf_counter()
+        reference = rk4(system, period, len(y))
+        slow = time.perf_counter() - start
+        print(f"{name:24} {cycles:>7} {len(y):>8} {1e3 * slow:>14.0f} {1e3 * fast:>16.1f} "
+              f"{np.max(np.abs(y - reference)):>13.1e}")
+
+
+def astable_loop(R, C, beta, duration, rate):
+    """Switch times of the astable from a per-sample comparator loop."""
+    a = np.exp(-1 / (rate * R * C))
+    vo, vc, switches = oscillators.RAIL, 0.0, []
+    for n in range(1, int(rate * duration)):
+        vc = vo + (vc - vo) * a
+        if vc * vo >= beta * vo * vo:
+            vo = -vo
+            switches.append(n / rate)
+    return np.array(switches)
+
+
+def astable_main():
+    print()
+    print(f"{'astable f (Hz)':24} {'samples':>8} {'loop (ms)':>10} {'event-driven (ms)':>18} {'last switch off by':>19}")
+    for frequency in (1.0, 100.0, 1e4, 1e5):
+        # C for the page's R at this frequency, T = 2 R C ln(1 + 2 R2 / R1).
+        capacitance = 1 / (frequency * 2 * R * np.log((1 + BETA) / (1 - BETA)))
+        duration = 5 / frequency
+        rate = max(100 * frequency, 1000)
+        start = time.perf_counter()
+        half_cycles = oscillators.astable(R, capacitance, BETA, duration)
+        oscillators.astable_trace(half_cycles, R, capacitance, duration, DISPLAY_POINTS)
+        fast = time.perf_counter() - start
+        start = time.perf_counter()
+        switches = astable_loop(R, capacitance, BETA, duration, rate)
+        slow = time.perf_counter() - start
+        last = min(len(switches), len(half_cycles[0]) - 1)
+        off = abs(switches[last - 1] - half_cycles[0][last]) * rate
+        print(f"{frequency:<24g} {int(rate * duration):>8} {1e3 * slow:>10.2f} {1e3 * fast:>18.2f} "
+              f"{off:>12.2f} samples")
+
+
+if __name__ == "__main__":
+    main()
+    astable_main()
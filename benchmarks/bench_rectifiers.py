@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Timing and accuracy of the batched Newton solver in labsim.rectifiers
+against a per-sample root finder.
+
+For inputs of growing length (a 5 V sine with a 0.3 V sine mixed in, so
+samples sit in the reverse, knee and forward regions of the diodes) the
+superdiode and the passive half-wave rectifier are solved once with
+``labsim.rectifiers`` and once sample by sample with ``scipy.optimize.brentq``
+on the same diode equation.  The per-sample loop is only run up to
+``LOOP_MAX_SAMPLES``.  The largest difference and the number of Newton
+passes (``MAX_ITERATIONS`` is lowered until the result changes) are listed.
+
+The smoothing capacitor (``smoothed``) is then timed against the per-sample
+peak-detector loop ``v = max(v * a, y[n])`` on a rectified 100 Hz sine, and
+``Meter`` against the separate NumPy reductions it replaces.
+
+Run from the repository root:
+    python benchmarks/bench_rectifiers.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from labsim import rectifiers  # noqa: E402
+from labsim.opamp import OPEN_LOOP_GAIN, RAIL  # noqa: E402
+
+LOOP_MAX_SAMPLES = 20_000
+
+
+def test_input(n):
+    t = np.linspace(0, 1, n, endpoint=False)
+    return 5 * np.sin(2 * np.pi * 3 * t) * np.sin(2 * np.pi * t) + 0.3 * np.sin(2 * np.pi * 50 * t)
+
+
+def diode_reference(E, R):
+    from scipy.optimize import brentq
+
+    nvt = rectifiers.N * rectifiers.VT
+    return brentq(lambda v: rectifiers.IS * np.expm1(v / nvt) - (E - v) / R,
+                  min(E, 0.0) - 1, nvt * np.log1p(max(E, 0.0) / (R * rectifiers.IS)), xtol=1e-15)
+
+
+def superdiode_loop(x, load=rectifiers.LOAD, gain=OPEN_LOOP_GAIN):
+    out = np.empty(len(x))
+    for n, xn in enumerate(x):
+        vd = diode_reference(gain * xn, (1 + gain) * load)
+        vo = (gain * xn - vd) / (1 + gain)
+        if abs(vo + vd) > RAIL:
+            E = np.copysign(RAIL, xn)
+            vo = E - diode_reference(E, load)
+        out[n] = vo
+    return out
+
+
+def passive_loop(x, load=rectifiers.LOAD):
+    return np.array([xn - diode_reference(xn, load) for xn in x])
+
+
+def passes(fn, x):
+    """Fewest Newton passes that give the converged result."""
+    full = fn(x)
+    saved = rectifiers.MAX_ITERATIONS
+    try:
+        for count in range(1, saved):
+            rectifiers.MAX_ITERATIONS = count
+            if np.array_equal(fn(x), full):
+                return count
+    finally:
+        rectifiers.MAX_ITERATIONS = saved
+    return saved
+
+
+def smoothed_loop(y, dt, tau):
+    a = np.exp(-dt / tau)
+    out = np.empty(len(y))
+    v = y[0]
+    for n, yn in enumerate(y):
+        v = max(v * a, yn)
+        out[n] = v
+    return out
+
+
+def meter_reference(y):
+    return y.mean(), np.sqrt(np.mean(y ** 2)), np.ptp(y)
+
+
+def smoothing_main():
+    tau = rectifiers.LOAD * 10e-6
+    print(f"\n{'samples':>10} {'smoothed (ms)':>14} {'per-sample (ms)':>16} {'max diff (V)':>13} "
+          f"{'Meter (ms)':>11} {'reductions (ms)':>16}")
+    for n in (10_000, 1_000_000, 10_000_000):
+        t = np.linspace(0, 1, n, endpoint=False)
+        y = np.abs(np.sin(2 * np.pi * 100 * t))
+        dt = t[1] - t[0]
+        start = time.perf_counter()
+        smooth = rectifiers.smoothed(y, dt, tau)
+        fast = time.perf_counter() - start
+        if n <= 1_000_000:
+            start = time.perf_counter()
+            reference = smoothed_loop(y, dt, tau)
+            loop = f"{1e3 * (time.perf_counter() - start):.0f}"
+            difference = f"{np.abs(smooth - reference).max():.1e}"
+        else:
+            loop = difference = "-"
+        start = time.perf_counter()
+        meter = rectifiers.Meter().feed(smooth)
+        metered = time.perf_counter() - start
+        start = time.perf_counter()
+        dc, rms, ripple = meter_reference(smooth)
+        reduced = time.perf_counter() - start
+        assert np.allclose([meter.dc, meter.rms, meter.ripple], [dc, rms, ripple])
+        print(f"{n:>10} {1e3 * fast:>14.1f} {loop:>16} {difference:>13} {1e3 * metered:>11.1f} {1e3 * reduced:>16.1f}")
+
+
+def main():
+    cases = [("superdiode", rectifiers.superdiode, superdiode_loop),
+             ("passive half-wave", rectifiers.passive, passive_loop)]
+    print(f"{'circuit':18} {'samples':>9} {'passes':>7} {'batched (ms)':>13} {'per-sample (ms)':>16} {'max diff (V)':>13}")
+    for n in (1_000, 20_000, 1_000_000):
+        x = test_input(n)
+        for name, fast, slow in cases:
+            start = time.perf_counter()
+            y = fast(x)
+            batched = time.perf_counter() - start
+            count = passes(fast, x)
+            if n <= LOOP_MAX_SAMPLES:
+                start = time.perf_counter()
+                reference = slow(x)
+                loop = f"{1e3 * (time.perf_counter() - start):.0f}"
+                difference = f"{np.abs(y - reference).max():.1e}"
+            else:
+                loop = difference = "-"
+            print(f"{name:18} {n:>9} {count:>7} {1e3 * batched:>13.1f} {loop:>16} {difference:>13}")
+    smoothing_main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Timing of labsim.hysteresis.schmitt against the per-sample loop it replaced
+in the Schmitt Trigger page, on noisy sine inputs of growing length.
+
+Both versions are first checked for identical output on inputs built to
+hit the edge cases (samples exactly on a threshold, NaN, starting inside
+the hysteresis band, above UTP and below LTP).  The loop is only timed up
+to ``LOOP_MAX_SAMPLES``; beyond that it would take minutes.
+
+Run from the repository root:
+    python benchmarks/bench_schmitt.py [largest size]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from labsim.hysteresis import schmitt, schmitt_reference  # noqa: E402
+
+V_SAT = 15.0
+V_UTP = 0.5 / 10.5 * V_SAT  # page defaults: R1 = 10 kΩ, R2 = 0.5 kΩ
+V_LTP = -V_UTP
+LOOP_MAX_SAMPLES = 1_000_000
+
+
+def noisy_sine(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 3, n, endpoint=False)
+    return np.sin(2 * np.pi * t) + 0.3 * rng.standard_normal(n)
+
+
+def check_equivalence(trials=2000):
+    rng = np.random.default_rng(1)
+    levels = np.array([-1.0, V_LTP, -0.2, 0.0, 0.2, V_UTP, 1.0, np.nan])
+    for _ in range(trials):
+        y = rng.choice(levels, rng.integers(0, 50))
+        args = (y, V_UTP, V_LTP, V_SAT, -V_SAT)
+        if not np.array_equal(schmitt(*args), schmitt_reference(*args)):
+            return False
+    y = noisy_sine(200_000)
+    return np.array_equal(schmitt(y, V_UTP, V_LTP, V_SAT, -V_SAT),
+                          schmitt_reference(y, V_UTP, V_LTP, V_SAT, -V_SAT))
+
+
+def best_of(fn, y, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(y, V_UTP, V_LTP, V_SAT, -V_SAT)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    largest = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10_000_000
+    print(f"identical output on edge cases and noisy input: {check_equivalence()}")
+
+    print(f"{'samples':>10} {'loop (ms)':>10} {'vectorized (ms)':>16} {'speedup':>8}")
+    n = 1_000
+    while n <= largest:
+        y = noisy_sine(n)
+        fast = best_of(schmitt, y, 5)
+        if n <= LOOP_MAX_SAMPLES:
+            slow = best_of(schmitt_reference, y, 1)
+            print(f"{n:>10} {1e3 * slow:>10.1f} {1e3 * fast:>16.2f} {slow / fast:>7.0f}x")
+        else:
+            print(f"{n:>10} {'-':>10} {1e3 * fast:>16.2f} {'-':>8}")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Per-call timing of labsim.waveforms.generate_waveform against the
+scipy-based generate_waveform that used to be copied into every page.
+
+Run from the repository root:
+    python benchmarks/bench_waveforms.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from labsim import waveforms  # noqa: E402
+
+
+def legacy_generate_waveform(amp, freq, wave_type_val, num_cycles=3):
+    """The per-page implementation this engine replaced."""
+    if freq == 0:
+        sampling_rate = 10000
+    else:
+        sampling_rate = max(100 * freq, 1000)
+    total_duration = num_cycles / freq if freq != 0 else 0.01
+    num_points = int(sampling_rate * total_duration)
+    if num_points < 2:
+        num_points = 2
+    t = np.linspace(0, total_duration, num_points, endpoint=False)
+    if freq == 0:
+        y = np.full_like(t, amp)
+    elif wave_type_val == 1:
+        y = amp * np.sin(2 * np.pi * freq * t)
+    elif wave_type_val == 2:
+        y = amp * np.cos(2 * np.pi * freq * t)
+    elif wave_type_val == 3:
+        y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5)
+    elif wave_type_val == 4:
+        y = amp * signal.square(2 * np.pi * freq * t)
+    else:
+        y = np.zeros_like(t)
+    return y, t, amp, total_duration, freq
+
+
+def best_of(fn, repeat=7):
+    number, _ = timeit.Timer(fn).autorange()
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main():
+    names = {1: "sine", 2: "cosine", 3: "triangle", 4: "square"}
+    print(f"{'wave':>9} {'freq (Hz)':>10} {'points':>9} {'scipy (us)':>11} "
+          f"{'labsim (us)':>12} {'buffered (us)':>14} {'speedup':>8} {'max |dy|':>9}")
+    for freq in (100.0, 1.0, 0.01):
+        for wave in (1, 2, 3, 4):
+            y_ref, t_ref, *_ = legacy_generate_waveform(1.0, freq, wave)
+            y_new, t_new, *_ = waveforms.generate_waveform(1.0, freq, wave)
+            mismatch = np.count_nonzero(np.abs(y_new - y_ref) > 1e-9)
+            # Square/triangle may differ only on samples that sit exactly on a
+            # half-cycle boundary, where radians-vs-cycles rounding flips the edge.
+            max_err = np.max(np.abs(y_new - y_ref)) if mismatch == 0 else float("nan")
+
+            y_buf = np.empty_like(y_ref)
+            t_buf = np.empty_like(t_ref)
+            legacy = best_of(lambda: legacy_generate_waveform(1.0, freq, wave))
+            fresh = best_of(lambda: waveforms.generate_waveform(1.0, freq, wave))
+            buffered = best_of(lambda: waveforms.generate_waveform(
+                1.0, freq, wave, out=y_buf, t_out=t_buf))
+            print(f"{names[wave]:>9} {freq:>10g} {len(t_ref):>9} {legacy * 1e6:>11.1f} "
+                  f"{fresh * 1e6:>12.1f} {buffered * 1e6:>14.1f} "
+                  f"{legacy / buffered:>7.1f}x {max_err:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
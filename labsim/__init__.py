@@ -0,0 +1 @@
+"""Shared simulation helpers used by the experiment pages."""
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide store of the page images (circuit diagrams, landing-page logo).
+
+``st.image("images/x.png")`` reads the file on every rerun and parses it
+with PIL twice (format sniffing, size check).  A file wider than the
+requested width is also resized and re-encoded, again on every rerun.
+``show`` does that work once per server process:
+
+* The file is read on first use and resized to the width it is displayed
+  at: an integer ``width`` is the exact pixel width st.image would resize
+  to, ``"stretch"`` uses Streamlit's own cap of ``MAX_WIDTH`` pixels.
+* The result is re-encoded as an optimized palette PNG.  The diagrams are
+  line art with under a thousand distinct colours; with ``PALETTE_COLORS``
+  of them 99 % of the pixels keep their exact colour (the rest are
+  anti-aliasing shades) and the files shrink to about a third.
+  Streamlit keeps palette PNGs as PNG, so it passes the bytes through
+  without converting them.
+* The bytes are held under their content hash.  Every session, tab and page
+  showing an image hands Streamlit the same bytes, and the media file
+  manager names files after their contents, so the browser sees one URL
+  and fetches each image once.
+"""
+
+import hashlib
+import io
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import streamlit as st
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Streamlit never serves st.image data wider than this (2 x 730 px).
+MAX_WIDTH = 2 * 730
+PALETTE_COLORS = 256
+
+Asset = namedtuple("Asset", ["data", "digest", "size"])
+
+_assets = {}
+_by_digest = {}
+_lock = threading.Lock()
+
+
+def _encode(path, width):
+    """Palette PNG bytes and pixel size of the image at ``path``, at most ``width`` wide."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    if image.getextrema()[3][0] < 255:
+        palette = image.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+    else:
+        palette = image.convert("RGB").quantize(PALETTE_COLORS)
+    buffer = io.BytesIO()
+    palette.save(buffer, format="png", optimize=True)
+    return buffer.getvalue(), palette.size
+
+
+def load(path, width="stretch"):
+    """The stored ``Asset`` of the image file ``path`` (relative to the repository) at ``width``."""
+    target = width if isinstance(width, int) else MAX_WIDTH
+    key = (str(path), target)
+    asset = _assets.get(key)
+    if asset is None:
+        data, size = _encode(ROOT / path, target)
+        digest = hashlib.sha256(data).hexdigest()
+        with _lock:
+            data = _by_digest.setdefault(digest, data)
+            asset = _assets.setdefault(key, Asset(data, digest, size))
+    return asset
+
+
+def show(path, caption=None, width="stretch"):
+    """Drop-in replacement for ``st.image(path, caption=caption, width=width)``."""
+    st.image(load(path, width).data, caption=caption, width=width)
+
+
+def clear():
+    with _lock:
+        _assets.clear()
+        _by_digest.clear()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide memoization of the pages' simulate_* functions.
+
+Streamlit re-runs a page for every widget interaction of every student,
+but the simulations are pure functions of a handful of scalars and a lab
+section mostly sits on the same defaults.  ``memoize`` keeps their results
+in one LRU store shared by all sessions of the server process:
+
+* Float arguments are rounded for the key to ``STEP``, the finest slider
+  step, so slider and float noise within one step (0.1 + 0.2 vs 0.3,
+  100.0 vs 100.0004) lands on one entry.  Values too small for that grid
+  (capacitances in uF) are rounded to ``DIGITS`` significant digits
+  instead, so they do not collapse onto zero.  The function itself always
+  runs on the arguments as given; a hit returns the result computed for the
+  first arguments stored under the key.
+* Memory is bounded by entry count and by the bytes of the NumPy arrays in
+  the results; the least recently used entries are evicted first.
+* Cached arrays are made read-only because every session shares them.
+* ``cache.warning``/``cache.error`` replace ``st.warning``/``st.error``
+  inside memoized functions.  They show the message as usual and record it,
+  and a cache hit shows the recorded messages again (``record``/``replay``
+  do the same for other caches).
+
+Hit/miss counters are available per function (``fn.cache_info()``) and for
+the whole store (``cache_info()``).  ``fn.cache_key(...)`` returns the key a
+call is stored under, so derived caches (rendered figures) can reuse it.
+"""
+
+import math
+import threading
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+import numpy as np
+import streamlit as st
+
+STEP = 1e-3
+DIGITS = 3
+MAX_ENTRIES = 512
+MAX_BYTES = 64 * 1024 * 1024
+ENTRY_OVERHEAD_BYTES = 1024
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize", "maxsize", "currbytes", "maxbytes"])
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by entry count and total byte size."""
+
+    def __init__(self, maxsize=MAX_ENTRIES, maxbytes=MAX_BYTES):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        if nbytes > self.maxbytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self._bytes += nbytes
+            while len(self._data) > self.maxsize or self._bytes > self.maxbytes:
+                _, (_, evicted_bytes) = self._data.popitem(last=False)
+                self._bytes -= evicted_bytes
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, len(self._data), self.maxsize,
+                             self._bytes, self.maxbytes)
+
+
+def quantize(value, step=STEP, digits=DIGITS):
+    """Rounds floats to a multiple of ``step``, or to ``digits`` significant
+    digits where that is finer; other values pass through."""
+    if isinstance(value, (bool, np.bool_)) or not isinstance(value, (float, np.floating)):
+        return value
+    value = float(value)
+    if not np.isfinite(value) or value == 0.0:
+        return value
+    step = min(step, 10.0 ** (math.floor(math.log10(abs(value))) - digits + 1))
+    return round(value / step) * step
+
+
+def _freeze(result):
+    """Marks the arrays in a result read-only and returns their total size in bytes."""
+    if isinstance(result, np.ndarray):
+        result.flags.writeable = False
+        return result.nbytes
+    if isinstance(result, (tuple, list)):
+        return sum(_freeze(item) for item in result)
+    if isinstance(result, dict):
+        return sum(_freeze(item) for item in result.values())
+    return 0
+
+
+# --- Messages that must survive a cache hit ---
+_recording = threading.local()
+
+
+def _show(level, message):
+    getattr(st, level)(message)
+    log = getattr(_recording, "messages", None)
+    if log is not None:
+        log.append((level, message))
+
+
+def warning(message):
+    """st.warning that is replayed when the surrounding memoized call hits the cache."""
+    _show("warning", message)
+
+
+def error(message):
+    """st.error that is replayed when the surrounding memoized call hits the cache."""
+    _show("error", message)
+
+
+def record(fn, *args, **kwargs):
+    """Calls ``fn`` and returns (result, messages it showed through warning/error)."""
+    outer = getattr(_recording, "messages", None)
+    _recording.messages = []
+    try:
+        result = fn(*args, **kwargs)
+        messages = tuple(_recording.messages)
+    finally:
+        _recording.messages = outer
+    if outer is not None:
+        outer.extend(messages)
+    return result, messages
+
+
+def replay(messages):
+    """Shows messages returned by ``record`` again, recording them like ``warning``/``error`` do."""
+    for level, message in messages:
+        _show(level, message)
+
+
+# --- Shared store and per-function counters ---
+_store = LRUCache()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def cache_info():
+    """Counters and size of the store shared by all memoized functions."""
+    return _store.info()
+
+
+def clear_cache():
+    _store.clear()
+    with _stats_lock:
+        _stats.clear()
+
+
+def code_identity(fn):
+    """Source location and code of ``fn``; stable across reruns that redefine it."""
+    code = fn.__code__
+    return code.co_filename, fn.__qualname__, hash((code.co_code, code.co_consts))
+
+
+def memoize(fn):
+    """Caches ``fn`` across sessions, keyed on its quantized arguments.
+
+    Pages define their simulate_* functions inside ``with tab4:`` blocks, so
+    the function object is new on every rerun; entries are therefore keyed on
+    the function's source location and bytecode rather than on its identity.
+    """
+    name = code_identity(fn)
+
+    with _stats_lock:
+        counters = _stats.setdefault(name, [0, 0])
+
+    def cache_key(*args, **kwargs):
+        """Key a call with these arguments is stored under (after quantization)."""
+        return (name, tuple(quantize(a) for a in args),
+                tuple(sorted((k, quantize(v)) for k, v in kwargs.items())))
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = cache_key(*args, **kwargs)
+
+        cached = _store.get(key)
+        if cached is not _MISSING:
+            result, messages = cached
+            with _stats_lock:
+                counters[0] += 1
+            replay(messages)
+            return result
+
+        result, messages = record(fn, *args, **kwargs)
+        with _stats_lock:
+            counters[1] += 1
+        _store.put(key, (result, messages), _freeze(result) + ENTRY_OVERHEAD_BYTES)
+        return result
+
+    def info():
+        with _stats_lock:
+            hits, misses = counters
+        store = _store.info()
+        return CacheInfo(hits, misses, store.currsize, store.maxsize, store.currbytes, store.maxbytes)
+
+    wrapper.cache_info = info
+    wrapper.cache_key = cache_key
+    return wrapper
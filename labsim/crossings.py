@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Threshold crossings of a sampled signal at sub-sample resolution.
+
+A comparator's output switches where its input crosses the reference.
+Thresholding each sample puts every edge on the sample grid, so edge times
+are only known to within one sample period, and so are the duty cycle and
+pulse widths derived from them.  ``edges`` finds the crossings instead:
+
+* ``above = y > level`` (the comparator's own test), and the sample pairs
+  where it changes are ``np.flatnonzero(above[1:] != above[:-1])``;
+* between the two samples of a pair the signal is taken to be a straight
+  line, and the crossing instant is where that line reaches ``level``.
+
+For a smooth input the interpolation error falls with the square of the
+sample spacing, so a few tens of samples per cycle give edge times to a
+small fraction of a sample.  A sample exactly on the level counts as below
+it, like in the comparator, and the interpolation puts the edge on that
+sample.
+
+Noise makes the signal cross the level several times per edge.  With a
+``band``, only crossings that take the signal from below
+``level - band / 2`` to above ``level + band / 2`` (or back) are edges, the
+Schmitt trigger rule of ``hysteresis.schmitt``; the edge instant is the
+last crossing of ``level`` itself before the signal leaves the band.
+
+``timing`` turns the edges into the figures of an oscilloscope's automatic
+measurements: the widths of the high and low pulses, the duty cycle and
+frequency over the complete cycles, and the peak-to-peak jitter of the
+period between rising edges.
+
+A real comparator does not switch within a sample.  ``slewed`` builds its
+output from the edges: each one starts a straight ramp towards the new rail
+``delay`` seconds after the crossing, at ``slew_rate`` V/s.  An edge that
+arrives before the previous ramp reached its rail turns the ramp around
+where it is.  The result is the exact piecewise-linear output as its
+breakpoints, two per edge, found in one pass over the edges; the samples
+are never visited, and the breakpoints can be drawn as they are at any
+zoom (or sampled with ``np.interp``).  Since the output is linear between
+breakpoints, ``edges`` of the breakpoints finds its crossings exactly.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from labsim.hysteresis import schmitt
+
+Edges = namedtuple("Edges", ["times", "rising", "initial"])
+Timing = namedtuple("Timing", ["high_widths", "low_widths", "duty_cycle", "frequency", "jitter"])
+
+
+def edges(y, t, level=0.0, band=0.0):
+    """``Edges`` of ``y > level`` for samples ``y`` at times ``t``.
+
+    ``times`` are the interpolated crossing instants, ``rising`` whether
+    each one goes upwards and ``initial`` whether ``y`` starts above the
+    level.
+    """
+    y = np.asarray(y, dtype=float)
+    t = np.asarray(t, dtype=float)
+    if len(y) == 0:
+        return Edges(np.empty(0), np.empty(0, dtype=bool), False)
+    above = y > level
+    index = np.flatnonzero(above[1:] != above[:-1])
+    if band > 0 and len(index):
+        state = schmitt(y, level + band / 2, level - band / 2, 0.0, 1.0).astype(bool)
+        # The sample at which the signal leaves the band, and the last
+        # crossing of the level before it.
+        leave = np.flatnonzero(state[1:] != state[:-1]) + 1
+        before = np.searchsorted(index, leave) - 1
+        # Starting inside the band on the other side of the level, the
+        # first exit has no crossing before it: it only settles the start.
+        initial = bool(state[leave[0]]) if len(leave) and before[0] < 0 else bool(state[0])
+        index = index[before[before >= 0]]
+    else:
+        initial = bool(above[0])
+    y0, y1 = y[index], y[index + 1]
+    times = t[index] + (level - y0) / (y1 - y0) * (t[index + 1] - t[index])
+    return Edges(times, above[index + 1], initial)
+
+
+def timing(found):
+    """``Timing`` of the pulses between ``found`` edges (NaN where there are too few)."""
+    times, rising = found.times, found.rising
+    high = _widths(times, rising, True)
+    low = _widths(times, rising, False)
+    starts = times[rising]
+    if len(starts) < 2:
+        duty_cycle = float(found.initial) if len(times) == 0 else np.nan
+        return Timing(high, low, duty_cycle, np.nan, np.nan)
+    periods = np.diff(starts)
+    # High time inside the complete cycles between the first and last rising edge.
+    inside = (times >= starts[0]) & (times <= starts[-1])
+    duty_cycle = _widths(times[inside], rising[inside], True).sum() / (starts[-1] - starts[0])
+    return Timing(high, low, duty_cycle, 1 / periods.mean(), np.ptp(periods))
+
+
+def slewed(found, start, stop, high, low, slew_rate, delay=0.0):
+    """Breakpoints ``(times, values)`` of a comparator output with finite slew rate and delay.
+
+    ``found`` are the ``Edges`` of the output (rising towards ``high``) and
+    [start, stop] the time span to cover; the breakpoints stay inside it.
+    """
+    level = high if found.initial else low
+    times, values = [start], [level]
+    # The ramp in progress runs from (times[-2], values[-2]) to
+    # (times[-1], values[-1]); the output stays flat after it.
+    for when, rising in zip(found.times + delay, found.rising):
+        if when >= stop:
+            break
+        target = high if rising else low
+        if when >= times[-1]:
+            level = values[-1]
+            if when > times[-1]:
+                times.append(when)
+                values.append(level)
+        else:
+            # Turned around part-way up (or down) the previous ramp.
+            fraction = (when - times[-2]) / (times[-1] - times[-2])
+            level = values[-2] + (values[-1] - values[-2]) * fraction
+            times[-1], values[-1] = when, level
+        times.append(when + abs(target - level) / slew_rate)
+        values.append(target)
+    if times[-1] > stop:
+        # Cut off part-way up (or down) the last ramp.
+        fraction = (stop - times[-2]) / (times[-1] - times[-2])
+        times[-1], values[-1] = stop, values[-2] + (values[-1] - values[-2]) * fraction
+    elif times[-1] < stop:
+        times.append(stop)
+        values.append(values[-1])
+    return np.array(times, dtype=float), np.array(values, dtype=float)
+
+
+def _widths(times, rising, high):
+    """Lengths of the complete pulses that start with a rising (``high``) or falling edge."""
+    first = _first(rising == high)
+    if first is None:
+        return np.empty(0)
+    times = times[first:]
+    count = len(times) // 2
+    return times[1:2 * count:2] - times[:2 * count:2]
+
+
+def _first(mask):
+    index = int(np.argmax(mask)) if len(mask) else 0
+    return index if len(mask) and mask[index] else None
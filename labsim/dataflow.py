@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Per-session dataflow graph of a page's simulation stages.
+
+Streamlit re-runs the whole page for every interaction, including typing a
+name into the Simulation tab or answering a Prelab question.  A page's
+simulation is a chain of stages (waveform -> circuit -> metrics -> figures
+-> results table), and most interactions leave all of them unchanged.
+``Flow.node`` runs one stage:
+
+    result = flow.node("circuit", (amplitude, frequency, ...), lambda: simulate_x(...))
+
+``inputs`` lists everything the stage depends on: widget values, or the
+results of earlier nodes.  When they are the same as on the previous rerun,
+the stored result is returned and ``compute`` is not called.  Plain values
+(numbers, strings, tuples of them) are compared by value.  Anything else,
+such as arrays and dicts returned by upstream nodes, is compared by
+identity.  A clean node returns the very object it stored, so a whole
+chain stays clean without comparing any array contents.
+
+``compute`` usually is a closure over page variables, so ``inputs`` must
+name every value it reads, as a figure key does for ``labsim.figures``.
+Messages shown through ``cache.warning``/``cache.error`` are shown again
+when a node is reused.  Each session keeps the flow of the page it is on.
+``Flow.report`` shows which nodes ran on the current rerun.
+"""
+
+import time
+
+import numpy as np
+import streamlit as st
+
+from labsim import cache
+
+_SESSION_KEY = "_labsim_flows"
+_VALUE_TYPES = (bool, int, float, complex, str, bytes, type(None), np.generic)
+
+
+def _same(old, new):
+    if old is new:
+        return True
+    if isinstance(old, tuple) and type(old) is type(new):
+        return len(old) == len(new) and all(_same(a, b) for a, b in zip(old, new))
+    return type(old) is type(new) and isinstance(old, _VALUE_TYPES) and bool(old == new)
+
+
+class Flow:
+    """The stages of one page; results are kept between reruns of a session."""
+
+    def __init__(self):
+        self._nodes = {}
+        self.log = []
+
+    def begin(self):
+        """Starts a new rerun: clears the log of executed nodes."""
+        self.log = []
+
+    def node(self, name, inputs, compute):
+        """Result of ``compute()``, recomputed only when ``inputs`` changed."""
+        inputs = tuple(inputs)
+        entry = self._nodes.get(name)
+        if entry is not None and _same(entry[0], inputs):
+            self.log.append((name, False, 0.0))
+            cache.replay(entry[2])
+            return entry[1]
+        start = time.perf_counter()
+        result, messages = cache.record(compute)
+        self.log.append((name, True, time.perf_counter() - start))
+        self._nodes[name] = (inputs, result, messages)
+        return result
+
+    def call(self, name, fn, *args):
+        """``fn(*args)`` as a node whose inputs are ``args``."""
+        return self.node(name, args, lambda: fn(*args))
+
+    def recomputed(self):
+        """Names of the nodes that ran on this rerun."""
+        return [name for name, ran, _ in self.log if ran]
+
+    def report(self):
+        """One caption line listing recomputed (with timings) and reused nodes."""
+        ran = [f"{name} ({1e3 * seconds:.0f} ms)" for name, did_run, seconds in self.log if did_run]
+        recomputed = set(self.recomputed())
+        reused = list(dict.fromkeys(name for name, did_run, _ in self.log
+                                    if not did_run and name not in recomputed))
+        st.caption("Recomputed: " + (", ".join(ran) or "nothing")
+                   + " | Reused: " + (", ".join(reused) or "nothing"))
+
+
+def page_flow(page):
+    """The session's ``Flow`` for ``page`` (pass ``__file__``), started for this rerun."""
+    flows = st.session_state.setdefault(_SESSION_KEY, {})
+    for name in [n for n in flows if n != page]:
+        del flows[name]
+    flow = flows.setdefault(page, Flow())
+    flow.begin()
+    return flow
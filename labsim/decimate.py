@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Screen-resolution decimation of CRO traces before they reach matplotlib.
+
+A CRO axes is only a few hundred pixels wide, so a 300 000-sample trace
+puts hundreds of points on every pixel column.  ``decimate`` reduces a
+trace to at most ``POINTS_PER_PIXEL`` points per column of the axes:
+
+* Min/max envelope: every column keeps the index of its minimum and its
+  maximum.  Columns whose vertical extent covers at least one pixel
+  (square-wave edges, steep slopes) keep both, in time order, so edges
+  and clipping plateaus are drawn exactly where the full trace would
+  draw them.
+* LTTB selection: columns that move less than a pixel only need one
+  point.  Of their min/max pair, the one spanning the largest triangle
+  with the neighbouring column centroids is kept, as in
+  Largest-Triangle-Three-Buckets.  Using the centroids on both sides
+  (instead of the previously selected point) lets the whole pass run as
+  array operations.
+
+The time base is assumed to be evenly sampled, as every page's is, so
+equal index buckets are equal pixel columns.
+"""
+
+import numpy as np
+
+# st.pyplot rasterizes figures at this resolution (dots per inch).
+RENDER_DPI = 200
+POINTS_PER_PIXEL = 2
+
+
+def axes_pixel_size(ax, dpi=RENDER_DPI):
+    """Width and height of an axes in rendered pixels."""
+    fig = ax.figure
+    pos = ax.get_position()
+    return (max(int(pos.width * fig.get_figwidth() * dpi), 1),
+            max(int(pos.height * fig.get_figheight() * dpi), 1))
+
+
+def _bucket_extrema(y, n_cols):
+    """Indices of the minimum and maximum of each of ``n_cols`` equal buckets.
+
+    When the extreme value repeats (a plateau), the occurrence nearest the
+    other extreme is returned, so a step inside a column is kept as a
+    vertical jump at the sample where it happens.
+    """
+    n = len(y)
+    width = -(-n // n_cols)  # ceil division
+    pad = width * n_cols - n
+    y_pad = np.pad(y, (0, pad), mode="edge") if pad else y
+    blocks = y_pad.reshape(n_cols, width)
+    flipped = blocks[:, ::-1]
+    offsets = np.arange(n_cols) * width
+    last = offsets + width - 1
+
+    min_first = np.argmin(blocks, axis=1) + offsets
+    max_first = np.argmax(blocks, axis=1) + offsets
+    min_last = last - np.argmin(flipped, axis=1)
+    max_last = last - np.argmax(flipped, axis=1)
+
+    falling = max_first < min_first
+    i_max = np.where(falling & (max_last < min_first), max_last, max_first)
+    i_min = np.where(~falling & (min_last < max_first), min_last, min_first)
+    return np.minimum(i_min, n - 1), np.minimum(i_max, n - 1)
+
+
+def decimate(x, y, n_cols, height_px=None):
+    """Reduces (x, y) to at most 2 * n_cols + 2 points for an n_cols-pixel-wide plot.
+
+    ``height_px`` is the plot height in pixels; it sets the one-pixel
+    threshold that decides whether a column keeps its min/max pair.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    n_cols = int(n_cols)
+    if n <= POINTS_PER_PIXEL * n_cols or n_cols < 1:
+        return x, y
+
+    i_min, i_max = _bucket_extrema(y, n_cols)
+    y_lo = y[i_min]
+    y_hi = y[i_max]
+
+    span = float(y_hi.max() - y_lo.min())
+    pixel = span / height_px if height_px else 0.0
+    active = (y_hi - y_lo) > pixel
+
+    # LTTB-style pick for the quiet columns: centroids of the neighbouring
+    # columns (clamped at the ends) form the other two triangle corners.
+    cx = 0.5 * (x[i_min] + x[i_max])
+    cy = 0.5 * (y_lo + y_hi)
+    ax_, ay_ = np.concatenate(([cx[0]], cx[:-1])), np.concatenate(([cy[0]], cy[:-1]))
+    bx_, by_ = np.concatenate((cx[1:], [cx[-1]])), np.concatenate((cy[1:], [cy[-1]]))
+
+    def triangle_area(idx):
+        return np.abs((ax_ - bx_) * (y[idx] - ay_) - (ax_ - x[idx]) * (by_ - ay_))
+
+    pick = np.where(triangle_area(i_max) > triangle_area(i_min), i_max, i_min)
+
+    first = np.where(active, np.minimum(i_min, i_max), pick)
+    second = np.where(active, np.maximum(i_min, i_max), -1)
+    idx = np.column_stack((first, second)).ravel()
+    idx = idx[idx >= 0]
+    idx = np.concatenate(([0], idx, [n - 1]))
+    idx = idx[np.concatenate(([True], np.diff(idx) != 0))]
+    return x[idx], y[idx]
+
+
+def decimate_for_axes(ax, x, y, dpi=RENDER_DPI):
+    """Decimates a trace to the pixel grid of ``ax``."""
+    width_px, height_px = axes_pixel_size(ax, dpi)
+    return decimate(x, y, width_px, height_px)
+
+
+def plot_trace(ax, x, y, *args, **kwargs):
+    """Drop-in replacement for ``ax.plot(x, y, ...)`` that decimates first."""
+    xd, yd = decimate_for_axes(ax, x, y)
+    return ax.plot(xd, yd, *args, **kwargs)
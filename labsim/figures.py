@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of rendered CRO figures.
+
+Building a figure, styling it and rasterizing it costs far more than the
+simulation behind it.  Pages describe each figure as a ``draw(ax)`` callback
+and hand it to ``show`` together with a key of everything the figure depends
+on (usually ``simulate_*.cache_key(...)``).  The PNG bytes are kept in a
+byte-bounded LRU store shared by all sessions.  On a hit the bytes go straight
+to ``st.image`` and matplotlib is not touched at all.  Misses are drawn on a
+``matplotlib.figure.Figure`` with its own Agg canvas rather than through
+pyplot, whose global figure manager is shared by every session thread.
+"""
+
+import io
+
+import streamlit as st
+
+from labsim.cache import LRUCache, code_identity
+from labsim.decimate import RENDER_DPI
+
+MAX_FIGURES = 1024
+MAX_FIGURE_BYTES = 32 * 1024 * 1024
+
+_figures = LRUCache(maxsize=MAX_FIGURES, maxbytes=MAX_FIGURE_BYTES)
+
+
+def _rasterize(draw, figsize, dpi):
+    # A bare Figure with its own Agg canvas is private to the calling thread,
+    # unlike pyplot's global figure manager, so sessions render in parallel
+    # and nothing has to be closed afterwards.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    draw(fig.subplots())
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=RENDER_DPI, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def cached_png(identity, key, figsize, dpi, rasterize):
+    """PNG bytes stored under ``key``; ``rasterize()`` produces them on a miss."""
+    full_key = (identity, key, tuple(figsize), dpi, RENDER_DPI)
+    png = _figures.get(full_key, None)
+    if png is None:
+        png = rasterize()
+        _figures.put(full_key, png, len(png))
+    return png
+
+
+def render_png(draw, key, figsize=(3, 2), dpi=100):
+    """PNG bytes of the figure drawn by ``draw(ax)``, rendered like st.pyplot does."""
+    return cached_png(code_identity(draw), key, figsize, dpi,
+                      lambda: _rasterize(draw, figsize, dpi))
+
+
+def show(draw, key, figsize=(3, 2), dpi=100, flow=None):
+    """Drop-in replacement for building a figure and passing it to ``st.pyplot``.
+
+    With a ``flow`` the figure is a node of the page's dataflow graph.
+    """
+    if flow is None:
+        png = render_png(draw, key, figsize, dpi)
+    else:
+        png = flow.node(f"figure:{draw.__name__}", (key, tuple(figsize), dpi),
+                        lambda: render_png(draw, key, figsize, dpi))
+    st.image(png, width="stretch")
+
+
+def cache_info():
+    return _figures.info()
+
+
+def clear_cache():
+    _figures.clear()
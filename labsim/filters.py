@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Discrete-time first-order active filters with carried state.
+
+The Active Filter page models a first-order RC section followed by a
+non-inverting amplifier of gain ``Av = 1 + RF/R1``:
+
+    low-pass   H(s) = Av * wc / (s + wc)
+    high-pass  H(s) = Av * s  / (s + wc),     wc = 2 * pi * fc
+
+``first_order_sos`` discretizes H(s) exactly for an input that is linear
+between samples (first-order hold), so every harmonic of a square or
+triangle wave is filtered with its own gain and phase.  With
+``a = exp(-dt * wc)`` and ``c = (1 - a) / (dt * wc)`` the sections are
+
+    low-pass   Av * ((1 - c) + (c - a) z^-1) / (1 - a z^-1)
+    high-pass  Av * c * (1 - z^-1) / (1 - a z^-1)
+
+The low-pass coefficients are never negative and add up to ``Av * (1 - a)``,
+so its output stays between the input's extremes times ``Av``, however high
+``fc`` is compared with the sample rate.  (The bilinear transform puts the
+pole near z = -1 once ``fc`` exceeds ``fs / pi``, and a square wave then
+rings with alternating sign.)  The high-pass is ``Av`` minus the low-pass,
+and the same section as ``differentiator_sos`` without a feedback
+capacitor.
+
+``SOSFilter`` runs ``scipy.signal.sosfilt`` chunk by chunk and keeps the
+filter state between calls, so an input of any length is processed in
+``CHUNK_SIZE`` pieces with constant working memory.
+
+The CRO shows the periodic steady state rather than the switch-on
+transient.  Every page samples an integer number of periods with
+``endpoint=False``, so the sampled window itself repeats exactly.  Over
+one window the state map is affine, ``z_end = Phi @ z_start + r``, with
+``r`` the end state from rest and the columns of ``Phi`` the end states of
+the unforced filter started from unit states.  The steady state is the
+fixed point ``z = (I - Phi)^-1 r``; starting there, the output over the
+window is already periodic.  Finding it takes a few extra state-only passes
+over the window, again in chunks, and no transient buffer.
+
+``lag`` is the other discretization of a first-order section,
+``gain / (1 + s * tau)``: with the input held constant between samples
+(zero-order hold) each sample step is solved exactly,
+
+    y[n+1] = a * y[n] + (1 - a) * gain * x[n],     a = exp(-dt / tau),
+
+which ``scipy.signal.lfilter`` runs in one call.  It stays exact however
+long ``tau`` is compared with the sample spacing, which is what the
+practical (leaky) integrator needs: ``tau = Rf * C`` is usually many
+periods long.  Its periodic start state has a closed form,
+``y0 = r / (1 - a**N)`` with ``r`` the end state from rest, so
+``lag_periodic`` costs two passes over the window whatever ``tau`` is.
+
+``differentiator_sos`` discretizes the practical differentiator
+``gain * s * tau / ((1 + s * tau) * (1 + s * tau_f))`` for an input that is
+linear between samples (first-order hold), the natural reading of a
+sampled smooth waveform.  The derivative of such an input is constant over
+each step, ``(x[n] - x[n-1]) / dt``, and the remaining lags of ``tau`` (and
+``tau_f``) are then solved exactly for that held derivative.  Without a
+feedback capacitor this is the single section
+
+    gain * tau * (1 - a) / dt * (1 - z^-1) / (1 - a z^-1),
+
+so a square-wave edge gives a finite spike that decays with ``tau`` rather
+than the 1/dt spike of a plain difference quotient.  A feedback capacitor
+adds the pole of ``tau_f``; the two-pole step comes from the matrix
+exponential, which also covers ``tau == tau_f``.  Building the sections
+from the pole factors rather than from expanded polynomials (as
+``scipy.signal.cont2discrete`` does) keeps them well conditioned when
+``tau`` is millions of samples long.  They run through ``SOSFilter`` and
+``filter_periodic`` like the Active Filter's sections.
+
+``frequency_response`` evaluates the analog H(s) over a whole Bode sweep in
+one vectorized call.
+
+scipy.signal takes over a second to import, so it is imported by the
+functions that use it rather than with this module; a page that only shows
+its Objective or Theory tab never loads it.
+"""
+
+import numpy as np
+
+# --- Filter codes (same integers the Active Filter page uses) ---
+LOWPASS = 1
+HIGHPASS = 2
+
+CHUNK_SIZE = 65536
+SWEEP_POINTS = 400
+SWEEP_DECADES = 3
+
+
+def first_order_zpk(filter_type, fc, gain):
+    """Analog zeros, poles and gain of the first-order section (angular frequency)."""
+    wc = 2 * np.pi * fc
+    if filter_type == LOWPASS:
+        return np.array([]), np.array([-wc]), gain * wc
+    if filter_type == HIGHPASS:
+        return np.array([0.0]), np.array([-wc]), gain
+    raise ValueError(f"Unknown filter type {filter_type!r}.")
+
+
+def first_order_sos(filter_type, fc, gain, fs):
+    """Sections of the filter for an input sampled at ``fs`` and linear between samples."""
+    dt = 1 / fs
+    tau = 1 / (2 * np.pi * fc)
+    if filter_type == LOWPASS:
+        a = np.exp(-dt / tau)
+        c = -tau * np.expm1(-dt / tau) / dt
+        return np.array([[gain * (1 - c), gain * (c - a), 0.0, 1.0, -a, 0.0]])
+    if filter_type == HIGHPASS:
+        return differentiator_sos(dt, tau, gain)
+    raise ValueError(f"Unknown filter type {filter_type!r}.")
+
+
+class SOSFilter:
+    """``sosfilt`` with its state carried from one ``process`` call to the next."""
+
+    def __init__(self, sos, zi=None):
+        self.sos = np.asarray(sos, dtype=float)
+        self.zi = np.zeros((len(self.sos), 2)) if zi is None else np.array(zi, dtype=float)
+
+    def process(self, x, out=None):
+        from scipy import signal
+
+        y, self.zi = signal.sosfilt(self.sos, x, zi=self.zi)
+        if out is None:
+            return y
+        out[:] = y
+        return out
+
+    def run(self, x, out=None, chunk_size=CHUNK_SIZE):
+        """Filters ``x`` in chunks of ``chunk_size`` samples into ``out``."""
+        if out is None:
+            out = np.empty(len(x))
+        for start in range(0, len(x), chunk_size):
+            self.process(x[start:start + chunk_size], out=out[start:start + chunk_size])
+        return out
+
+    def advance(self, x, chunk_size=CHUNK_SIZE):
+        """Runs ``x`` through the filter for its end state only."""
+        for start in range(0, len(x), chunk_size):
+            self.process(x[start:start + chunk_size])
+
+
+def periodic_steady_state(sos, x, chunk_size=CHUNK_SIZE):
+    """Filter state at the start of ``x`` for which the response to ``x`` repeated is periodic."""
+    sos = np.asarray(sos, dtype=float)
+    shape = (len(sos), 2)
+    size = 2 * len(sos)
+    forced = SOSFilter(sos)
+    forced.advance(x, chunk_size)
+
+    # Columns of Phi: the unforced filter started from each unit state.
+    zeros = np.broadcast_to(0.0, len(x))
+    free = np.empty((size, size))
+    for j in range(size):
+        unforced = SOSFilter(sos, np.eye(size)[j].reshape(shape))
+        unforced.advance(zeros, chunk_size)
+        free[:, j] = unforced.zi.ravel()
+
+    return np.linalg.solve(np.eye(size) - free, forced.zi.ravel()).reshape(shape)
+
+
+def filter_periodic(sos, x, out=None, chunk_size=CHUNK_SIZE):
+    """Steady-state response to ``x``, taken as one period of a repeating input."""
+    section = SOSFilter(sos, periodic_steady_state(sos, x, chunk_size))
+    return section.run(x, out=out, chunk_size=chunk_size)
+
+
+def lag(x, dt, tau, gain=1.0, y0=0.0, out=None):
+    """Samples of ``gain / (1 + s * tau)`` driven by ``x`` (held between samples), from ``y0``."""
+    from scipy import signal
+
+    a = np.exp(-dt / tau)
+    y = np.empty(len(x)) if out is None else out
+    if len(x):
+        y[0] = y0
+        y[1:], _ = signal.lfilter([(1 - a) * gain], [1, -a], x[:-1], zi=[a * y0])
+    return y
+
+
+def lag_periodic(x, dt, tau, gain=1.0, out=None):
+    """Steady-state response of ``gain / (1 + s * tau)`` to ``x`` repeated."""
+    from scipy import signal
+
+    if not len(x):
+        return lag(x, dt, tau, gain, out=out)
+    a = np.exp(-dt / tau)
+    rest, _ = signal.lfilter([(1 - a) * gain], [1, -a], x, zi=[0.0])
+    # a**N = exp(-N dt / tau); expm1 keeps 1 - a**N accurate when tau >> N dt.
+    y0 = rest[-1] / -np.expm1(-len(x) * dt / tau)
+    return lag(x, dt, tau, gain, y0=y0, out=out)
+
+
+def differentiator_sos(dt, tau, gain, tau_f=0.0):
+    """Sections of ``gain * s * tau / ((1 + s * tau) * (1 + s * tau_f))`` for a first-order-hold input."""
+    a = np.exp(-dt / tau)
+    if tau_f <= 0:
+        k = -gain * tau * np.expm1(-dt / tau) / dt
+        return np.array([[k, -k, 0.0, 1.0, -a, 0.0]])
+    from scipy.linalg import expm
+
+    # States v1 (lag of tau) and v2 (lag of tau_f), driven by the derivative
+    # d held over the step: [v; d] advances by expm(dt * [[A, B], [0, 0]]).
+    step = expm(dt * np.array([[-1 / tau, 0.0, 1 / tau],
+                               [1 / tau_f, -1 / tau_f, 0.0],
+                               [0.0, 0.0, 0.0]]))
+    (a1, _, g1), (p21, a2, g2) = step[:2]
+    # v2 / d = (g2 z^-1 + (p21 g1 - a1 g2) z^-2) / ((1 - a1 z^-1) (1 - a2 z^-1)),
+    # and d = (1 - z^-1) / dt * x one step earlier.
+    k = gain * tau / dt
+    return np.array([[k * g2, k * (p21 * g1 - a1 * g2), 0.0, 1.0, -a1, 0.0],
+                     [1.0, -1.0, 0.0, 1.0, -a2, 0.0]])
+
+
+def frequency_response(filter_type, fc, gain, frequencies):
+    """Magnitude (dB) and phase (degrees) of the analog filter at ``frequencies`` (Hz).
+
+    One ``scipy.signal.freqs`` call evaluates the whole sweep.
+    """
+    from scipy import signal
+
+    b, a = signal.zpk2tf(*first_order_zpk(filter_type, fc, gain))
+    _, h = signal.freqs(b, a, worN=2 * np.pi * np.asarray(frequencies, dtype=float))
+    with np.errstate(divide="ignore"):
+        magnitude_db = 20 * np.log10(np.abs(h))
+    return magnitude_db, np.degrees(np.angle(h))
+
+
+def sweep_frequencies(fc, points=SWEEP_POINTS, decades=SWEEP_DECADES, include=()):
+    """Log-spaced frequencies ``decades`` either side of ``fc``, widened to cover ``include``."""
+    low, high = fc / 10 ** decades, fc * 10 ** decades
+    include = [f for f in include if f > 0]
+    if include:
+        low, high = min(low, min(include)), max(high, max(include))
+    return np.logspace(np.log10(low), np.log10(high), points)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Hysteresis (Schmitt trigger) switching without a per-sample Python loop.
+
+The output of a Schmitt trigger is a two-state machine: in the high state it
+switches low once the input rises above the upper threshold point (UTP), in
+the low state it switches high once the input falls below the lower
+threshold point (LTP).  Whenever UTP >= LTP, "above UTP" and "below LTP"
+cannot both hold for one sample, so every such sample *sets* the state no
+matter what it was before, and every other sample keeps it.  The output is
+then the value of the most recent setting sample, forward-filled:
+
+* ``low = y > UTP`` and ``high = y < LTP`` mark the setting samples;
+* sample 0 always sets the state (low if above UTP, high otherwise, the
+  start-up rule of the pages);
+* ``np.repeat`` stretches the state of each setting sample up to the next.
+
+Comparisons with NaN are false, so NaN samples keep the state, as in the
+loop.  Inverted thresholds (UTP < LTP, where a sample can toggle the state)
+are left to ``schmitt_reference``.
+"""
+
+import numpy as np
+
+
+def schmitt_reference(y, v_utp, v_ltp, v_high, v_low):
+    """Sample-by-sample hysteresis loop; the definition ``schmitt`` reproduces."""
+    y = np.asarray(y)
+    out = np.zeros(y.shape, dtype=float)
+    if len(y) == 0:
+        return out
+    out[0] = v_low if y[0] > v_utp else v_high
+    for i in range(1, len(y)):
+        if out[i-1] == v_high:
+            out[i] = v_low if y[i] > v_utp else out[i-1]
+        elif out[i-1] == v_low:
+            out[i] = v_high if y[i] < v_ltp else out[i-1]
+    return out
+
+
+def schmitt(y, v_utp, v_ltp, v_high, v_low):
+    """Output of a Schmitt trigger for input ``y``; starts high unless y[0] > UTP."""
+    y = np.asarray(y)
+    n = len(y)
+    if n == 0:
+        return np.zeros(y.shape, dtype=float)
+    if v_utp < v_ltp:
+        return schmitt_reference(y, v_utp, v_ltp, v_high, v_low)
+
+    low = y > v_utp
+    setting = low | (y < v_ltp)
+    setting[0] = True
+    starts = np.flatnonzero(setting)
+    lengths = np.diff(starts, append=n)
+    states = np.where(low[starts], v_low, v_high).astype(float)
+    return np.repeat(states, lengths)
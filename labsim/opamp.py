@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Large-signal transient model of a single-pole op-amp stage.
+
+The ideal stages of the Basic Op-Amp page are ``gain * x`` clipped at the
+rails.  A real op-amp adds three limits:
+
+* Gain-bandwidth: a dominant-pole op-amp A(s) = A0 / (1 + s / wa), with
+  GBW = A0 * fa, in a loop of noise gain ``1/beta`` (1 + Rf/R1 for both
+  the inverting and the non-inverting stage, 1 for the follower) gives a
+  first-order closed loop.  Its DC gain is ``gain * A0*beta / (1 + A0*beta)``
+  and its -3 dB bandwidth is ``fa * (1 + A0*beta)``, about GBW / noise gain
+  (``closed_loop``).
+* Slew rate: the output cannot move faster than ``slew_rate`` V/s.  The
+  first-order loop asks for a slope of ``w * (u - y)`` towards the target
+  ``u``, so it slews whenever the error exceeds ``slew_rate / w``.
+* Rails: the output saturates at +-``rail``.
+
+The input is held constant between samples (zero-order hold), and each
+sample step is solved exactly: an exponential approach ``y -> u`` with
+factor ``a = exp(-w dt)`` when the error is small, a straight ramp of
+``slew_rate * dt`` when it is large, or a ramp followed by the exponential
+when the error drops below the slew threshold part-way through the step.
+``transient_reference`` applies that step sample by sample and is the
+ground truth.
+
+``transient`` produces the same samples without a per-sample Python loop.
+It splits the capture into segments that each have a closed form:
+
+* linear: the exponential steps form the IIR filter
+  ``y[n+1] = a y[n] + (1 - a) u[n]``, run with ``scipy.signal.lfilter`` over
+  a window that doubles while nothing happens;
+* slewing: ``y[n+k] = y[n] +- k * slew_rate * dt``;
+* saturated: ``y`` stays at the rail while the target is beyond it.
+
+Each segment ends at the first sample whose step belongs to another case,
+found with one vectorized comparison over the window.  The Python loop
+therefore runs once per slew edge or rail entry, not once per sample.
+
+``transient_periodic`` shows the periodic steady state rather than the
+switch-on transient, like ``filters.filter_periodic``.  The start state is
+the fixed point of the linear model over the window.  Slewing and
+saturation move the fixed point, so the window is simulated again from
+its own end state until the two agree (at most ``MAX_PASSES`` times).
+"""
+
+import math
+
+import numpy as np
+
+# --- Default op-amp (uA741-class) ---
+OPEN_LOOP_GAIN = 2e5
+GBW = 1e6  # Hz
+SLEW_RATE = 0.5e6  # V/s
+RAIL = 15.0  # V
+
+MAX_PASSES = 6
+WINDOW = 256
+
+
+def closed_loop(gain, noise_gain, gbw=GBW, open_loop_gain=OPEN_LOOP_GAIN):
+    """DC gain and -3 dB bandwidth (Hz) of a stage with ideal gain ``gain``."""
+    loop_gain = open_loop_gain / noise_gain
+    return gain * loop_gain / (1 + loop_gain), gbw / open_loop_gain * (1 + loop_gain)
+
+
+class _Step:
+    """Exact ZOH step of the slew-limited first-order loop for one sample period."""
+
+    def __init__(self, dt, bandwidth, slew_rate, rail):
+        self.dt = dt
+        self.w = 2 * np.pi * bandwidth
+        self.a = math.exp(-self.w * dt)
+        self.slew_rate = slew_rate
+        self.rail = rail
+        # Error above which the loop would move faster than the slew rate.
+        self.threshold = slew_rate / self.w
+        self.ramp = slew_rate * dt
+
+    def __call__(self, y, u):
+        e = u - y
+        if abs(e) <= self.threshold:
+            y = u - e * self.a
+        else:
+            sign = 1.0 if e > 0 else -1.0
+            t_slew = (abs(e) - self.threshold) / self.slew_rate
+            if t_slew >= self.dt:
+                y = y + sign * self.ramp
+            else:
+                y = u - sign * self.threshold * math.exp(-self.w * (self.dt - t_slew))
+        return min(max(y, -self.rail), self.rail)
+
+
+def _first(mask, default):
+    index = int(np.argmax(mask))
+    return index if mask[index] else default
+
+
+def transient_reference(x, dt, dc_gain, bandwidth, slew_rate=SLEW_RATE, rail=RAIL, y0=0.0):
+    """Output samples for input ``x`` (sample spacing ``dt``), one exact step at a time."""
+    step = _Step(dt, bandwidth, slew_rate, rail)
+    y = np.empty(len(x))
+    state = min(max(y0, -rail), rail)
+    for n, xn in enumerate(x):
+        y[n] = state
+        state = step(state, dc_gain * xn)
+    return y
+
+
+def transient(x, dt, dc_gain, bandwidth, slew_rate=SLEW_RATE, rail=RAIL, y0=0.0, out=None):
+    """Same samples as ``transient_reference``, computed segment by segment."""
+    from scipy import signal
+
+    step = _Step(dt, bandwidth, slew_rate, rail)
+    a, threshold, ramp = step.a, step.threshold, step.ramp
+    u = np.multiply(x, dc_gain)
+    total = len(u)
+    y = np.empty(total) if out is None else out
+
+    n = 0
+    state = min(max(y0, -rail), rail)
+    mode = "linear"
+    window = WINDOW
+    while n < total:
+        size = min(window, total - n)
+        target = u[n:n + size]
+        if mode == "linear":
+            path = np.empty(size + 1)
+            path[0] = state
+            path[1:], _ = signal.lfilter([1 - a], [1, -a], target, zi=[a * state])
+            k_slew = _first(np.abs(target - path[:-1]) > threshold, size)
+            k_rail = _first(np.abs(path[1:]) > rail, size) + 1
+            if k_rail <= min(k_slew, size):
+                y[n:n + k_rail] = path[:k_rail]
+                state = math.copysign(rail, path[k_rail])
+                n, mode, window = n + k_rail, "rail", WINDOW
+            elif k_slew < size:
+                y[n:n + k_slew] = path[:k_slew]
+                state = path[k_slew]
+                n, mode, window = n + k_slew, "slew", WINDOW
+            else:
+                y[n:n + size] = path[:size]
+                state = path[size]
+                n, window = n + size, 2 * window
+        elif mode == "slew":
+            sign = 1.0 if target[0] > state else -1.0
+            path = state + sign * ramp * np.arange(size)
+            # Step m is a full ramp while the error stays above the threshold
+            # for the whole period.
+            k_end = _first(sign * (target - path) < threshold + ramp, size)
+            k_rail = _first(np.abs(path) > rail, size)
+            if k_rail <= k_end and k_rail < size:
+                y[n:n + k_rail] = path[:k_rail]
+                state = math.copysign(rail, path[k_rail])
+                n, mode, window = n + k_rail, "rail", WINDOW
+            elif k_end < size:
+                y[n:n + k_end + 1] = path[:k_end + 1]
+                state = step(path[k_end], target[k_end])
+                n, mode, window = n + k_end + 1, "linear", WINDOW
+            else:
+                y[n:n + size] = path
+                state = state + sign * ramp * size
+                n, window = n + size, 2 * window
+        else:
+            # Saturated: the state stays at the rail until the target is
+            # back inside it.
+            k_leave = _first(math.copysign(1.0, state) * (target - state) < 0, size)
+            y[n:n + k_leave] = state
+            n += k_leave
+            if k_leave < size:
+                mode, window = "linear", WINDOW
+            else:
+                window *= 2
+    return y
+
+
+def transient_periodic(x, dt, dc_gain, bandwidth, slew_rate=SLEW_RATE, rail=RAIL,
+                       max_passes=MAX_PASSES, out=None):
+    """Steady-state response to ``x``, taken as one period of a repeating input."""
+    from scipy import signal
+
+    step = _Step(dt, bandwidth, slew_rate, rail)
+    u = np.multiply(x, dc_gain)
+    # Fixed point of the linear model: y_end = a^N y0 + (end state from rest).
+    rest_end = signal.lfilter([1 - step.a], [1, -step.a], u)[-1] if len(u) else 0.0
+    start = rest_end / (1 - step.a ** len(u)) if step.a ** len(u) < 1 else 0.0
+    start = min(max(start, -rail), rail)
+
+    tolerance = 1e-9 * rail
+    for _ in range(max_passes):
+        y = transient(x, dt, dc_gain, bandwidth, slew_rate, rail, y0=start, out=out)
+        end = step(y[-1], u[-1])
+        if abs(end - start) <= tolerance:
+            break
+        start = end
+    return y
+
+
+def phase_shift(x, y, t, freq):
+    """Phase (degrees, -180..180] of the fundamental of ``y`` relative to that of ``x``.
+
+    ``t`` must span an integer number of periods of ``freq``.
+    """
+    basis = np.exp(-2j * np.pi * freq * np.asarray(t))
+    shift = np.angle(np.dot(y, basis) / np.dot(x, basis), deg=True)
+    return 180.0 if shift == -180.0 else float(shift)
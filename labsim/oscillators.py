@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+"""
+Start-up transients of the oscillator pages.
+
+The oscillator pages quote the Barkhausen frequency and gain; the functions
+here simulate the closed loop from a small noise seed, through the
+exponential build-up, to the amplitude-limited steady state.
+
+Both oscillators are a linear RC network driven by the amplifier output,
+``dx/dt = M @ x + drive * vo`` (time in units of RC), with ``vo`` a
+piecewise-linear function of one network voltage ``d = sense @ x``: a gain
+clipped at the rails, plus the bends of a diode limiter.  Within each
+piece the loop is linear, so ``_Loop`` integrates it with a fixed step of
+``1 / STEPS_PER_CYCLE`` of the formula period that is exact within the
+piece: the state advances by the affine map of ``expm(h * M_piece)``
+around the piece's equilibrium.  As in ``opamp.transient``, the powers of
+each piece's matrix for a whole block are computed once (one expm, then
+repeated doubling), so a segment that stays in one piece is a single
+stacked matrix-vector product over all of its samples, vectorized over the
+network states.  A piece that grows fast (a high gain between the rails)
+keeps only the powers below ``MAX_GROWTH``; no segment stays in it longer.  The step in which ``d`` crosses into another piece is
+split at the exact crossing time (a root of the piece's modal solution),
+so the waveform does not jitter with the sample grid.  The Python loop
+runs once per crossing.
+
+The simulation stops early once the envelope has settled: the RMS value
+and the mean period of the last ``SETTLED_CYCLES`` cycles (between rising
+zero crossings) agree with those of the ``SETTLED_CYCLES`` cycles before
+to ``SETTLED_TOLERANCE``, or, below the critical gain, once the
+oscillation has died out.  Cycles are measured between interpolated
+crossings, and a waveform with sharp bends (clipped, or limited by the
+diodes at a high gain) is measured slightly differently depending on where
+the sample grid falls in the cycle.  Comparing groups of cycles averages
+that out of the RMS values; the mean periods only have to agree to
+``PERIOD_JITTER`` samples when that is the looser bound.  A high-Q or low-frequency setting
+therefore costs the cycles it takes to settle, not ``MAX_CYCLES``.  The
+frequency is measured from the interpolated zero crossings of the last
+cycles.
+
+RC phase-shift oscillator
+-------------------------
+The ladder is three series capacitors C with shunt resistors R; the last R
+is the amplifier's input resistor R1 to the virtual ground.  With the
+capacitor voltages ``x = (vc1, vc2, vc3)`` the node voltages are
+``v3 = vo - sum(x)``, ``v2 = v3 + vc3``, ``v1 = v2 + vc2`` and the
+capacitor currents ``i3 = v3``, ``i2 = v2 + i3``, ``i1 = v1 + i2``, so
+``dx/dt = LADDER @ x + LADDER_DRIVE * vo``.  The inverting amplifier sets
+``vo = -A * v3``, an algebraic loop through the ladder's direct path whose
+solution is ``vo = clip(A / (1 + A) * sum(x))`` at the rails.  The
+oscillating pole pair sits on the imaginary axis at
+``f = 1 / (2 pi RC sqrt(6))`` for A = 29, and grows by about 4 % per
+cycle at A = 30.
+
+Wien bridge oscillator
+----------------------
+The states are the voltages of the series and the shunt capacitor,
+``x = (vs, vp)``; the shunt voltage is the non-inverting input, and the
+amplifier gives ``vo = G * vp`` (``WIEN``, ``WIEN_DRIVE``).  At G = 3 the
+poles sit on the imaginary axis at ``f = 1 / (2 pi RC)``; above 3 the
+oscillation grows until something limits it:
+
+* ``"none"``: the rails, which flatten the tops of the sine;
+* ``"diodes"``: antiparallel diodes (``DIODE_DROP``) across the part of RF
+  that makes up the gain above ``DIODE_GAIN``.  Once they conduct the
+  incremental gain drops below 3, and the amplitude settles where the
+  average gain is 3, a few volts and still nearly sinusoidal;
+* ``"lamp"``: a lamp (or thermistor) as R1, whose resistance rises with
+  the power it dissipates, ``R1 = R1_cold * (1 + P / LAMP_POWER)``.  The
+  lamp's temperature follows the output's square with a time constant of
+  ``LAMP_CYCLES`` cycles, slower than the signal, so the gain is updated
+  ``LAMP_UPDATES`` times per cycle between blocks.  The amplitude settles
+  at ``Vrms**2 = LAMP_POWER * (G - 3) / 2``, nearly undistorted (the lamp
+  still ripples a little at twice the frequency).  The lamp and the
+  amplitude form a lightly damped second-order loop, so the amplitude
+  overshoots and rings a few times before it settles.  (Updating the gain
+  only once per cycle delays the loop enough to turn that ringing into a
+  limit cycle well above G = 3.)
+
+Astable multivibrator
+---------------------
+The square wave generator needs no integration at all.  Its output sits at
+one rail, ``vo = +-rail``, and the capacitor charges through RF towards it,
+``vc(t) = vo + (vc0 - vo) * exp(-t / (RF C))``, until vc reaches the
+threshold ``beta * vo`` set by the R1/R2 divider; then the output flips.
+The time of each switch therefore has a closed form,
+``RF C * ln((vo - vc0) / (vo - beta * vo))``, and ``astable`` steps from
+one switch to the next: the loop runs once per half-cycle, whatever the
+frequency.  From an uncharged capacitor the first half-cycle charges from
+0 rather than from ``-beta * rail`` and is shorter,
+``RF C * ln(1 / (1 - beta))``; every later one lasts
+``RF C * ln((1 + beta) / (1 - beta))``, half the formula period.
+``astable_trace`` evaluates the exponentials of those segments on any time
+grid, with both sides of every switch added so the edges stay vertical at
+any display resolution.
+"""
+
+import numpy as np
+
+RAIL = 15.0  # V
+SEED = 1e-3  # V, RMS of the initial capacitor voltages
+STEPS_PER_CYCLE = 200
+BLOCK_CYCLES = 8
+MAX_CYCLES = 2000
+SETTLED_CYCLES = 4
+SETTLED_TOLERANCE = 1e-3
+PERIOD_JITTER = 2.0  # samples
+MAX_GROWTH = 1e100  # largest norm of a stored matrix power
+DECAYED = 1e-3  # of SEED: below this the oscillation has died out
+
+# Ladder state equations in units of RC (see the module docstring).
+LADDER = -np.array([[3.0, 2.0, 1.0],
+                    [2.0, 2.0, 1.0],
+                    [1.0, 1.0, 1.0]])
+LADDER_DRIVE = np.array([3.0, 2.0, 1.0])
+
+# Wien network: series RC from vo to the + input, shunt RC to ground.
+WIEN = -np.array([[1.0, 1.0],
+                  [1.0, 2.0]])
+WIEN_DRIVE = np.array([1.0, 1.0])
+WIEN_SENSE = np.array([0.0, 1.0])
+
+STABILIZERS = ("none", "diodes", "lamp")
+DIODE_DROP = 0.6  # V
+DIODE_GAIN = 2.5  # gain with the diodes conducting
+LAMP_POWER = 90.0  # V^2: Vrms = 3 V at G = 3.2
+LAMP_CYCLES = 2.0
+LAMP_UPDATES = 8  # per cycle
+LAMP_RESOLUTION = 1e-6  # relative gain change that makes a new output map
+
+
+class _Regime:
+    """Affine flow ``dx/dt = matrix @ (x - rest)`` of the loop in one piece of its output map."""
+
+    def __init__(self, matrix, rest, h, count, like=None):
+        from scipy.linalg import expm
+
+        self.matrix = matrix
+        self.rest = rest
+        if like is not None:
+            self.powers, self.values, self.vectors, self.inverse = (
+                like.powers, like.values, like.vectors, like.inverse)
+            return
+        # expm(h * matrix) ** k for k = 1 .. count, stacked, by doubling,
+        # up to the first power beyond MAX_GROWTH.
+        self.powers = np.empty((count, len(matrix), len(matrix)))
+        self.powers[0] = expm(h * matrix)
+        filled = 1
+        while filled < count:
+            take = min(filled, count - filled)
+            np.matmul(self.powers[:take], self.powers[filled - 1], out=self.powers[filled:filled + take])
+            filled += take
+            if np.abs(self.powers[filled - 1]).max() > MAX_GROWTH:
+                norms = np.abs(self.powers[:filled]).max(axis=(1, 2))
+                self.powers = self.powers[:max(_first(norms > MAX_GROWTH, filled), 1)]
+                break
+        self.values, self.vectors = np.linalg.eig(matrix)
+        # Near a repeated eigenvalue (the Wien loop at a gain of 1 or 5) the
+        # modal form is ill-conditioned; ``at`` then falls back to expm.
+        self.inverse = np.linalg.inv(self.vectors) if np.linalg.cond(self.vectors) < 1e8 else None
+
+    def path(self, state, count):
+        """States after 1 .. ``count`` steps from ``state``."""
+        return self.rest + self.powers[:count] @ (state - self.rest)
+
+    def at(self, state, tau):
+        """State ``tau`` (in units of RC) after ``state``."""
+        if self.inverse is None:
+            from scipy.linalg import expm
+
+            return self.rest + expm(tau * self.matrix) @ (state - self.rest)
+        modes = self.inverse @ (state - self.rest) * np.exp(self.values * tau)
+        return self.rest + (self.vectors @ modes).real
+
+    def crossing(self, state, sense, level, h):
+        """Time within the next ``h`` at which ``sense @ x`` reaches ``level``."""
+        from scipy.optimize import brentq
+
+        return brentq(lambda tau: sense @ self.at(state, tau) - level, 0.0, h)
+
+
+class _Loop:
+    """``dx/dt = matrix @ x + drive * vo`` with ``vo`` piecewise linear in ``d = sense @ x``.
+
+    ``set_output`` gives the output map: ``breaks`` (ascending values of d)
+    split it into pieces ``vo = slope * d + offset``.  Each piece is one
+    ``_Regime``; pieces of equal slope share their matrix powers.
+    """
+
+    def __init__(self, matrix, drive, sense, h, block):
+        self.matrix, self.drive, self.sense = matrix, drive, sense
+        self.h, self.block = h, block
+        self.slopes, self.regimes = (), []
+
+    def set_output(self, breaks, slopes, offsets):
+        # Slopes of the previous output map keep their powers.
+        templates = dict(zip(self.slopes, self.regimes))
+        self.breaks = np.asarray(breaks, dtype=float)
+        self.slopes = np.asarray(slopes, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=float)
+        self.regimes = []
+        for slope, offset in zip(self.slopes, self.offsets):
+            matrix = self.matrix + slope * np.outer(self.drive, self.sense)
+            rest = np.linalg.solve(matrix, -self.drive * offset)
+            template = templates.get(slope)
+            regime = _Regime(matrix, rest, self.h, self.block, like=template)
+            templates.setdefault(slope, regime)
+            self.regimes.append(regime)
+
+    def output(self, d):
+        piece = np.searchsorted(self.breaks, d)
+        return self.slopes[piece] * d + self.offsets[piece]
+
+    def run(self, state, y):
+        """Advances ``len(y)`` steps from ``state``, writing the outputs to ``y``; returns the state."""
+        n, total = 0, len(y)
+        while n < total:
+            piece = int(np.searchsorted(self.breaks, self.sense @ state))
+            current = self.regimes[piece]
+            size = min(total - n, len(current.powers))
+            path = current.path(state, size)
+            d = path @ self.sense
+            low = self.breaks[piece - 1] if piece else -np.inf
+            high = self.breaks[piece] if piece < len(self.breaks) else np.inf
+            count = _first((d < low) | (d > high), size)
+            y[n:n + count] = self.output(d[:count])
+            n += count
+            if count == size:
+                state = path[-1]
+                continue
+            # Finish the step that leaves the piece in the next ones, from
+            # the exact times d reaches the breaks between them.  A steep
+            # piece (the diode knee at a high gain) can be crossed within
+            # one step.
+            entry = path[count - 1] if count else state
+            remaining, state, end = self.h, path[count], d[count]
+            while not low <= end <= high:
+                level, following = (high, piece + 1) if end > high else (low, piece - 1)
+                tau = current.crossing(entry, self.sense, level, remaining)
+                entry, remaining = current.at(entry, tau), remaining - tau
+                piece, current = following, self.regimes[following]
+                state = current.at(entry, remaining)
+                end = self.sense @ state
+                low = self.breaks[piece - 1] if piece else -np.inf
+                high = self.breaks[piece] if piece < len(self.breaks) else np.inf
+            y[n] = self.output(end)
+            n += 1
+        return state
+
+
+def _clipped(gain, rail):
+    """Output map ``vo = clip(gain * d, -rail, rail)``."""
+    return [-rail / gain, rail / gain], [0.0, gain, 0.0], [-rail, 0.0, rail]
+
+
+def _diode_limited(gain, rail):
+    """Output map of the non-inverting amplifier with the diode limiter, clipped."""
+    if gain <= DIODE_GAIN:
+        return _clipped(gain, rail)
+    knee = DIODE_DROP / (gain - DIODE_GAIN)
+    top = (rail - DIODE_DROP) / DIODE_GAIN
+    if knee >= top:
+        return _clipped(gain, rail)
+    return ([-top, -knee, knee, top], [0.0, DIODE_GAIN, gain, DIODE_GAIN, 0.0],
+            [-rail, -DIODE_DROP, 0.0, DIODE_DROP, rail])
+
+
+def _first(mask, default):
+    index = int(np.argmax(mask))
+    return index if mask[index] else default
+
+
+def _rising_crossings(y):
+    """Interpolated sample positions where ``y`` crosses zero upwards."""
+    index = np.flatnonzero((y[:-1] < 0) & (y[1:] >= 0))
+    return index + y[index] / (y[index] - y[index + 1])
+
+
+def cycle_envelope(y):
+    """RMS values and lengths (in samples) of the complete cycles of ``y``."""
+    crossings = _rising_crossings(y)
+    if len(crossings) < 2:
+        return np.empty(0), np.empty(0)
+    # Mean square of the straight lines between samples, from crossing to
+    # crossing: whole steps by the trapezoid rule, plus the part-steps at
+    # each end, where y rises from 0 and y**2 integrates to a third.
+    squares = y * y
+    steps = np.concatenate(([0.0], np.cumsum((squares[:-1] + squares[1:]) / 2)))
+    first, last = np.ceil(crossings).astype(int), np.floor(crossings).astype(int)
+    ends = squares[first] * (first - crossings) / 3
+    starts = squares[last] * (crossings - last) / 3
+    sums = steps[last[1:]] - steps[first[:-1]] + ends[:-1] + starts[1:]
+    periods = np.diff(crossings)
+    return np.sqrt(sums / periods), periods
+
+
+def _envelope(y, floor):
+    """``"settled"``, ``"decayed"`` (RMS below ``floor``) or None for the tail ``y``."""
+    rms, periods = cycle_envelope(y)
+    if len(rms) and rms[-1] < floor:
+        return "decayed"
+    if len(rms) < 2 * SETTLED_CYCLES:
+        return "decayed" if len(y) and np.abs(y).max() < floor else None
+    # RMS and mean period of the last SETTLED_CYCLES cycles and of the ones before.
+    energy = (rms * rms * periods)[-2 * SETTLED_CYCLES:].reshape(2, -1).sum(axis=1)
+    length = periods[-2 * SETTLED_CYCLES:].reshape(2, -1).sum(axis=1)
+    rms, periods = np.sqrt(energy / length), length / SETTLED_CYCLES
+    if (np.ptp(rms) <= SETTLED_TOLERANCE * rms.max()
+            and np.ptp(periods) <= max(SETTLED_TOLERANCE * periods.max(), PERIOD_JITTER)):
+        return "settled"
+    return None
+
+
+def _startup(loop, state, steps_per_cycle, max_cycles, seed, update=None, update_steps=None):
+    """Runs ``loop`` until its envelope settles or dies out; returns ``(vo, settled)``.
+
+    With ``update``, the loop runs ``update_steps`` samples at a time and
+    ``update(vo)`` is called with each run's output before the next one.
+    """
+    total = steps_per_cycle * max_cycles + 1
+    y = np.empty(total)
+    y[0] = loop.output(loop.sense @ state)
+    n = 1
+    envelope = None
+    window = 3 * SETTLED_CYCLES * steps_per_cycle
+    while n < total and envelope is None:
+        end = min(n + steps_per_cycle * BLOCK_CYCLES, total)
+        if update is None:
+            state = loop.run(state, y[n:end])
+        else:
+            for start in range(n, end, update_steps):
+                run = y[start:min(start + update_steps, end)]
+                state = loop.run(state, run)
+                update(run)
+        n = end
+        tail = y[max(0, n - window):n]
+        envelope = _envelope(tail, DECAYED * seed)
+        # A heavily clipped oscillator runs slower than the formula period:
+        # widen the tail until it holds enough cycles.
+        if envelope is None and len(_rising_crossings(tail)) <= 2 * SETTLED_CYCLES and window < n:
+            window *= 2
+    return y[:n], envelope == "settled"
+
+
+def _measured(y, settled, step):
+    """Time axis and frequency of ``y`` sampled every ``step`` seconds."""
+    t = np.arange(len(y)) * step
+    crossings = _rising_crossings(y)
+    if settled:
+        crossings = crossings[-SETTLED_CYCLES - 1:]
+    if len(crossings) < 2:
+        return t, 0.0
+    return t, (len(crossings) - 1) / ((crossings[-1] - crossings[0]) * step)
+
+
+def phase_shift_startup(R, C, gain, rail=RAIL, seed=SEED, max_cycles=MAX_CYCLES,
+                        steps_per_cycle=STEPS_PER_CYCLE):
+    """Start-up of the RC phase-shift oscillator (R in ohms, C in farads).
+
+    Returns ``(t, vo, frequency, settled)``: the output from the noise seed
+    until the envelope settled or died out (or ``max_cycles`` formula
+    periods), the frequency measured over the last cycles (0 if fewer than
+    two zero crossings) and whether the envelope settled.
+    """
+    h = 2 * np.pi * np.sqrt(6) / steps_per_cycle
+    loop = _Loop(LADDER, LADDER_DRIVE, np.ones(3), h, steps_per_cycle * BLOCK_CYCLES)
+    # vo = -A * v3 = -A * (vo - sum(x)), i.e. vo = A / (1 + A) * sum(x).
+    loop.set_output(*_clipped(gain / (1 + gain), rail))
+    state = seed * np.random.default_rng(0).standard_normal(3)
+    y, settled = _startup(loop, state, steps_per_cycle, max_cycles, seed)
+    t, frequency = _measured(y, settled, h * R * C)
+    return t, y, frequency, settled
+
+
+def wien_startup(R, C, gain, stabilizer="none", rail=RAIL, seed=SEED, max_cycles=MAX_CYCLES,
+                 steps_per_cycle=STEPS_PER_CYCLE):
+    """Start-up of the Wien bridge oscillator with small-signal gain ``gain`` = 1 + RF/R1.
+
+    ``stabilizer`` is one of ``STABILIZERS``.  Returns
+    ``(t, vo, frequency, settled)`` like ``phase_shift_startup``.
+    """
+    if stabilizer not in STABILIZERS:
+        raise ValueError(f"Unknown stabilizer {stabilizer!r}.")
+    h = 2 * np.pi / steps_per_cycle
+    state = seed * np.random.default_rng(0).standard_normal(2)
+    if stabilizer != "lamp":
+        loop = _Loop(WIEN, WIEN_DRIVE, WIEN_SENSE, h, steps_per_cycle * BLOCK_CYCLES)
+        loop.set_output(*(_diode_limited if stabilizer == "diodes" else _clipped)(gain, rail))
+        y, settled = _startup(loop, state, steps_per_cycle, max_cycles, seed)
+    else:
+        update_steps = max(steps_per_cycle // LAMP_UPDATES, 1)
+        loop = _Loop(WIEN, WIEN_DRIVE, WIEN_SENSE, h, update_steps)
+        loop.set_output(*_clipped(gain, rail))
+        # Lamp temperature as the mean square it has settled to (V^2).
+        heat = [0.0]
+        applied = [gain]
+        smoothing = -np.expm1(-update_steps / (steps_per_cycle * LAMP_CYCLES))
+
+        def update(block):
+            heat[0] += (np.mean(block * block) - heat[0]) * smoothing
+            effective = 1 + (gain - 1) / (1 + heat[0] / LAMP_POWER)
+            # While the amplitude is tiny the lamp stays cold.
+            if abs(effective - applied[0]) > LAMP_RESOLUTION * applied[0]:
+                applied[0] = effective
+                loop.set_output(*_clipped(effective, rail))
+
+        y, settled = _startup(loop, state, steps_per_cycle, max_cycles, seed, update=update,
+                              update_steps=update_steps)
+    t, frequency = _measured(y, settled, h * R * C)
+    return t, y, frequency, settled
+
+
+def astable(R, C, beta, duration, rail=RAIL, vc0=0.0):
+    """Half-cycles of the op-amp astable multivibrator (RF = ``R`` ohms, C in farads).
+
+    ``beta`` is the feedback fraction R2 / (R1 + R2) and ``vc0`` the initial
+    capacitor voltage; the output starts high unless ``vc0`` is already at
+    the upper threshold.  Returns ``(starts, outputs, charges)``: the start
+    time of every half-cycle up to ``duration`` seconds, the output during
+    it and the capacitor voltage at its start.
+    """
+    tau = R * C
+    vo = -rail if vc0 >= beta * rail else rail
+    starts, outputs, charges = [0.0], [vo], [vc0]
+    while True:
+        # vc reaches beta * vo after tau * ln((vo - vc) / (vo - beta * vo)).
+        end = starts[-1] + tau * np.log((vo - charges[-1]) / (vo - beta * vo))
+        if end >= duration:
+            break
+        starts.append(end)
+        charges.append(beta * vo)
+        vo = -vo
+        outputs.append(vo)
+    return np.array(starts), np.array(outputs), np.array(charges)
+
+
+def astable_trace(half_cycles, R, C, duration, points):
+    """``(t, vo, vc)`` of ``astable``'s half-cycles on ``points`` samples over [0, duration].
+
+    Every switching time appears twice, with the values just before and
+    just after the switch.
+    """
+    starts, outputs, charges = half_cycles
+    grid = np.linspace(0.0, duration, points)
+    switches = starts[1:]
+    t = np.concatenate([grid, switches, switches])
+    # Half-cycle of each sample: the grid by time, the two copies of switch
+    # k (which starts half-cycle k) as the end of k - 1 and the start of k.
+    segment = np.concatenate([np.searchsorted(starts, grid, side="right") - 1,
+                              np.arange(len(switches)), np.arange(1, len(starts))])
+    order = np.lexsort((segment, t))
+    t, segment = t[order], segment[order]
+    vo = outputs[segment]
+    vc = vo + (charges[segment] - vo) * np.exp(-(t - starts[segment]) / (R * C))
+    return t, vo, vc
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Precision and passive rectifiers with Shockley diodes.
+
+The ideal rectifiers of the Precision Rectifier page are ``max(x, 0)`` and
+``abs(x)``.  Here the diodes follow the Shockley equation,
+
+    I = IS * (exp(vd / (N * VT)) - 1),
+
+and the op-amps have a finite open-loop gain ``A`` (``opamp.OPEN_LOOP_GAIN``)
+and saturate at ``opamp.RAIL``.  The circuits are solved quasi-statically,
+sample by sample, which is what a 741 does well below its bandwidth.
+
+Every circuit below reduces, for each sample, to one conducting diode in
+series with a Thevenin source ``E`` and resistance ``R``:
+
+    IS * (exp(vd / (N * VT)) - 1) = (E - vd) / R
+
+``_diode`` solves that for all samples at once with Newton's method.  The
+left side is convex and increasing in ``vd``, so Newton steps started from
+above the root fall monotonically onto it.  The start is the diode voltage
+that would carry the largest possible current ``E / R``, or 0 for
+``E <= 0`` (a reverse-biased diode, whose root lies between ``E`` and 0).
+Each iteration is one pass over the samples that have not converged yet:
+the rest are masked out, so a sample near the knee does not make the
+others iterate again.
+
+* ``superdiode``: the half-wave precision rectifier.  The op-amp drives the
+  diode, the load ``RL`` sits on the cathode, and the cathode is fed back
+  to the inverting input, so ``vA = A (x - vo)``, ``vo = I RL`` and
+  ``E = A x``, ``R = (1 + A) RL``.  The output misses the input by
+  ``(vd + x) / (1 + A)``: microvolts instead of the diode drop.  For
+  ``x < 0`` the op-amp runs into its negative rail; the diode then sees
+  ``E = -rail`` through ``RL`` and only leaks.
+* ``precision_full_wave``: the inverting half-wave stage with two diodes
+  (equal resistors ``R``) followed by the summing stage
+  ``vo = -(x + 2 vP)``.  For ``x > 0`` the output diode conducts,
+  ``E = (1 + A) x``, ``R = (2 + A) R`` and ``vP = (2 vd - A x) / (2 + A)``;
+  for ``x <= 0`` the feedback diode clamps the op-amp,
+  ``E = -(1 + A) x``, ``R = (1 + A) R`` and ``vP`` is the op-amp's input
+  error ``-vd / (1 + A)``.  The summer's noise gain is 4.
+* ``passive``: a diode in series with ``RL`` (``E = x``), and a diode
+  bridge, two diodes in series (``E = |x| / 2``, ``R = RL / 2``).  The
+  output is ``I RL``: the input less one or two diode drops, and nothing
+  at all below the knee.
+
+A smoothing capacitor C across the load turns either rectifier into a peak
+detector.  ``smoothed`` works segment by segment, like ``opamp.transient``:
+
+* conducting: the rectifier charges C at once, so the output is the
+  rectified signal itself.  Conduction ends after the first sample from
+  which the signal falls faster than C can discharge, ``y[n+1] < a y[n]``
+  with ``a = exp(-dt / (RL C))``; those samples are found for the whole
+  capture in one comparison;
+* discharging: C discharges through RL, ``v a**k`` after k samples, until
+  the signal catches up with it again.  The decay over a window that
+  doubles while nothing happens is compared with the signal in one
+  vectorized step.
+
+The Python loop runs twice per cycle.  ``smoothed_periodic`` starts the
+capacitor from its charge at the end of the window, the periodic steady
+state, as ``filters.filter_periodic`` does for the filters.
+
+``Meter`` reads a signal like a bench multimeter: DC (average), true RMS,
+peak-to-peak ripple and form factor (RMS / DC).  It keeps running sums and
+extremes, fed ``filters.CHUNK_SIZE`` samples at a time, so a long capture is
+measured in one pass with no temporary arrays (``np.dot`` gives the sum of
+squares without squaring into a new array).
+"""
+
+import math
+
+import numpy as np
+
+from labsim.filters import CHUNK_SIZE
+from labsim.opamp import OPEN_LOOP_GAIN, RAIL
+
+# --- Diode (1N4148 SPICE model) ---
+IS = 2.52e-9  # A
+N = 1.752
+VT = 0.02585  # V at 300 K
+
+LOAD = 10e3  # Ω, RL and R1 of the page diagrams
+NEWTON_TOL = 1e-12  # V, relative beyond 1 V (a rail-driven reverse bias)
+MAX_ITERATIONS = 100
+WINDOW = 256
+
+
+def _diode(E, R, IS=IS, N=N, VT=VT):
+    """Diode voltage and current with ``IS * (exp(vd / (N VT)) - 1) = (E - vd) / R``."""
+    E = np.asarray(E, dtype=float)
+    R = np.broadcast_to(R, E.shape)
+    nvt = N * VT
+    vd = nvt * np.log1p(np.maximum(E, 0.0) / (R * IS))
+    # Unconverged samples, compacted after every pass.
+    active = np.arange(E.size)
+    v, e, r = vd.ravel(), E.ravel(), R.ravel()
+    out = vd.reshape(-1)
+    for _ in range(MAX_ITERATIONS):
+        if not len(v):
+            break
+        grow = IS * np.exp(v / nvt)
+        step = (grow - IS - (e - v) / r) / (grow / nvt + 1 / r)
+        v = v - step
+        out[active] = v
+        keep = np.abs(step) > NEWTON_TOL * (1 + np.abs(v))
+        active, v, e, r = active[keep], v[keep], e[keep], r[keep]
+    return vd, (E - vd) / R
+
+
+def superdiode(x, load=LOAD, gain=OPEN_LOOP_GAIN, rail=RAIL):
+    """Output of the half-wave precision rectifier (superdiode) for input ``x``."""
+    x = np.asarray(x, dtype=float)
+    vd, current = _diode(gain * x, (1 + gain) * load)
+    vo = current * load
+    # Where the op-amp output would lie beyond a rail, it sits on the rail.
+    saturated = np.flatnonzero(np.abs(vo + vd) > rail)
+    if len(saturated):
+        _, current = _diode(np.copysign(rail, x[saturated]), load)
+        vo[saturated] = current * load
+    return vo
+
+
+def precision_full_wave(x, resistance=LOAD, gain=OPEN_LOOP_GAIN, rail=RAIL):
+    """Output of the two-op-amp precision full-wave rectifier for input ``x``."""
+    x = np.asarray(x, dtype=float)
+    positive = x > 0
+    E = np.where(positive, (1 + gain) * x, -(1 + gain) * x)
+    R = np.where(positive, 2 + gain, 1 + gain) * resistance
+    vd, _ = _diode(E, R)
+    v_half = np.where(positive, (2 * vd - gain * x) / (2 + gain), -vd / (1 + gain))
+    vo = -(x + 2 * v_half) / (1 + 4 / gain)
+    return np.clip(vo, -rail, rail)
+
+
+def passive(x, full_wave=False, load=LOAD):
+    """Output of a plain diode rectifier (one diode, or a bridge) into ``load``."""
+    x = np.asarray(x, dtype=float)
+    if full_wave:
+        _, current = _diode(np.abs(x) / 2, load / 2)
+    else:
+        _, current = _diode(x, load)
+    return current * load
+
+
+def smoothed(y, dt, tau, v0=None, out=None):
+    """Voltage on a smoothing capacitor fed by the rectified signal ``y`` (time constant ``tau`` = RL C).
+
+    ``v0`` is the initial capacitor voltage (default: charged to ``y[0]``).
+    """
+    y = np.asarray(y, dtype=float)
+    total = len(y)
+    out = np.empty(total) if out is None else out
+    if total == 0:
+        return out
+    a = math.exp(-dt / tau)
+    # Conduction stops after sample n when y[n + 1] < a * y[n].
+    falls = np.flatnonzero(y[1:] < a * y[:-1])
+
+    n = 0
+    out[0] = v = y[0] if v0 is None else max(v0, y[0])
+    charging = v <= y[0]
+    window = WINDOW
+    while n < total - 1:
+        if charging:
+            index = np.searchsorted(falls, n)
+            end = falls[index] if index < len(falls) else total - 1
+            out[n:end + 1] = y[n:end + 1]
+            n, v, charging, window = end, y[end], False, WINDOW
+            continue
+        size = min(window, total - 1 - n)
+        path = v * np.exp(-dt / tau * np.arange(1, size + 1))
+        caught = np.flatnonzero(y[n + 1:n + 1 + size] >= path)
+        if len(caught):
+            # The signal meets the capacitor again and charges it.
+            k = caught[0]
+            out[n + 1:n + 1 + k] = path[:k]
+            n, charging = n + k + 1, True
+        else:
+            out[n + 1:n + 1 + size] = path
+            n, v, window = n + size, path[-1], 2 * window
+    if charging:
+        out[n] = y[n]
+    return out
+
+
+def smoothed_periodic(y, dt, tau, out=None):
+    """``smoothed`` in the periodic steady state of ``y`` taken as one period of a repeating input."""
+    out = smoothed(y, dt, tau, out=out)
+    if len(out):
+        smoothed(y, dt, tau, v0=out[-1] * math.exp(-dt / tau), out=out)
+    return out
+
+
+class Meter:
+    """DC, true RMS and ripple of a signal fed in chunks, like a bench multimeter."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.low = np.inf
+        self.high = -np.inf
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float)
+        if not len(chunk):
+            return
+        self.count += len(chunk)
+        self.total += chunk.sum()
+        self.squares += np.dot(chunk, chunk)
+        self.low = min(self.low, chunk.min())
+        self.high = max(self.high, chunk.max())
+
+    def feed(self, x, chunk_size=CHUNK_SIZE):
+        """Updates the meter with ``x``, ``chunk_size`` samples at a time."""
+        for start in range(0, len(x), chunk_size):
+            self.update(x[start:start + chunk_size])
+        return self
+
+    @property
+    def dc(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def rms(self):
+        return math.sqrt(self.squares / self.count) if self.count else 0.0
+
+    @property
+    def ripple(self):
+        """Peak-to-peak variation."""
+        return self.high - self.low if self.count else 0.0
+
+    @property
+    def ac_rms(self):
+        """RMS of the ripple, with the DC part removed."""
+        return math.sqrt(max(self.rms ** 2 - self.dc ** 2, 0.0))
+
+    @property
+    def form_factor(self):
+        """RMS / DC (NaN without a DC part)."""
+        return self.rms / self.dc if self.dc > 0 else math.nan
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Per-session oscilloscope figures that are updated in place.
+
+``labsim.figures`` builds a new Figure for every miss.  For a CRO display
+most of that work is the same from one rerun to the next: the black axes,
+graticule, labels, ticks and legend only change when the axis limits or the
+reference lines do.  ``show`` keeps one ``Oscilloscope`` per figure per
+session and splits a figure in two:
+
+* ``setup(ax)`` draws the static part and creates the traces and readouts
+  as animated artists (``trace`` and ``readout`` below).  It runs again
+  only when one of the page variables it reads changes; those values form
+  the layout signature.  The static render is kept as a blitting
+  background.
+* Each rerun then only calls ``Line2D.set_data`` / ``Text.set_text``,
+  restores the background, draws the animated artists over it and encodes
+  the canvas, which was sized to the tight bounding box with the layout.
+
+Results still go through the shared PNG cache of ``labsim.figures``.  A
+session only keeps the scopes of the page it is on.
+"""
+
+import io
+import threading
+import types
+
+import numpy as np
+import streamlit as st
+
+from labsim import figures
+from labsim.cache import code_identity
+from labsim.decimate import RENDER_DPI, decimate_for_axes
+
+_SESSION_KEY = "_labsim_scopes"
+_LAYOUT_TYPES = (bool, int, float, str, type(None), np.integer, np.floating, np.bool_)
+
+
+def trace(ax, **style):
+    """An empty animated trace; ``show`` fills it with ``set_data``."""
+    line, = ax.plot([], [], animated=True, **style)
+    return line
+
+
+def readout(ax, x, y, **style):
+    """An animated text annotation in axes coordinates; ``show`` sets its text."""
+    return ax.text(x, y, "", transform=ax.transAxes, animated=True, **style)
+
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def layout_signature(setup):
+    """Values of the page variables ``setup`` reads.
+
+    Modules, functions and classes are skipped.  Anything else that isn't a
+    plain scalar (arrays, dicts) can't be compared cheaply and would make a
+    stale background undetectable, so it is rejected.
+    """
+    values = []
+    scopes = [(name, setup.__globals__[name]) for name in sorted(_code_names(setup.__code__))
+              if name in setup.__globals__]
+    if setup.__closure__:
+        scopes += [(name, cell.cell_contents)
+                   for name, cell in zip(setup.__code__.co_freevars, setup.__closure__)]
+    for name, value in scopes:
+        if isinstance(value, (types.ModuleType, type)) or callable(value):
+            continue
+        if isinstance(value, tuple) and all(isinstance(v, _LAYOUT_TYPES) for v in value):
+            values.append((name, value))
+        elif isinstance(value, _LAYOUT_TYPES):
+            values.append((name, value))
+        else:
+            raise TypeError(f"scope setup reads {name!r} of type {type(value).__name__}; "
+                            "pass scalars to setup and arrays through traces")
+    return tuple(values)
+
+
+class Oscilloscope:
+    """One CRO figure of one session, kept alive across reruns."""
+
+    def __init__(self, figsize, dpi=RENDER_DPI):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.subplots()
+        self._figsize = tuple(figsize)
+        self._position = self.ax.get_position()
+        self.layout = None
+        self.lock = threading.Lock()
+        self._background = None
+        self._lines = []
+        self._readouts = []
+
+    def _draw_static(self, setup, layout):
+        fig, ax = self.figure, self.ax
+        fig.set_size_inches(self._figsize)
+        ax.set_position(self._position)
+        ax.clear()
+        setup(ax)
+        self._lines = [a for a in ax.lines if a.get_animated()]
+        self._readouts = [a for a in ax.texts if a.get_animated()]
+        # The legend sits above the traces, so it is drawn with them.
+        if ax.get_legend() is not None:
+            ax.get_legend().set_animated(True)
+
+        # Labels of these small figures stick out of the figure, which
+        # savefig(bbox_inches="tight") handles by growing the canvas.  Do the
+        # same once per layout: resize the figure to the padded tight box and
+        # move the axes so they keep their size in inches.
+        self.canvas.draw()
+        tight = fig.get_tightbbox(self.canvas.get_renderer()).padded(0.1)
+        width, height = self._figsize
+        fig.set_size_inches(tight.width, tight.height)
+        ax.set_position([(self._position.x0 * width - tight.x0) / tight.width,
+                         (self._position.y0 * height - tight.y0) / tight.height,
+                         self._position.width * width / tight.width,
+                         self._position.height * height / tight.height])
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(fig.bbox)
+        self.layout = layout
+
+    def render(self, setup, traces, readouts=()):
+        """PNG bytes of the scope showing ``traces`` [(x, y), ...] and ``readouts``."""
+        from PIL import Image
+
+        layout = (code_identity(setup), layout_signature(setup))
+        with self.lock:
+            if layout != self.layout:
+                self._draw_static(setup, layout)
+            if len(traces) != len(self._lines) or len(readouts) != len(self._readouts):
+                raise ValueError(f"setup created {len(self._lines)} traces and "
+                                 f"{len(self._readouts)} readouts, got {len(traces)} and {len(readouts)}")
+
+            ax = self.ax
+            for line, (x, y) in zip(self._lines, traces):
+                line.set_data(*decimate_for_axes(ax, x, y, self.figure.dpi))
+            for text, value in zip(self._readouts, readouts):
+                text.set_text(value)
+
+            self.canvas.restore_region(self._background)
+            for artist in self._lines + self._readouts:
+                ax.draw_artist(artist)
+            legend = ax.get_legend()
+            if legend is not None:
+                ax.draw_artist(legend)
+
+            pixels = np.asarray(self.canvas.buffer_rgba())
+            buffer = io.BytesIO()
+            Image.fromarray(pixels, "RGBA").save(buffer, format="png")
+            return buffer.getvalue()
+
+
+def _session_scope(setup, figsize):
+    scopes = st.session_state.setdefault(_SESSION_KEY, {})
+    page = setup.__code__.co_filename
+    for name in [n for n in scopes if n[0] != page]:
+        del scopes[name]
+    name = (page, setup.__qualname__, tuple(figsize))
+    if name not in scopes:
+        scopes[name] = Oscilloscope(figsize)
+    return scopes[name]
+
+
+def render_png(setup, key, traces, readouts=(), figsize=(3, 2), dpi=100):
+    """Cached PNG of a scope figure; ``key`` must determine traces and readouts."""
+    return figures.cached_png(
+        code_identity(setup), key, figsize, dpi,
+        lambda: _session_scope(setup, figsize).render(setup, traces, readouts))
+
+
+def show(setup, key, traces, readouts=(), figsize=(3, 2), dpi=100, flow=None):
+    """Scope counterpart of ``figures.show``.
+
+    ``dpi`` is the nominal figure dpi the page used; like ``st.pyplot`` the
+    scope itself always renders at ``RENDER_DPI``.  With a ``flow`` the figure
+    is a node of the page's dataflow graph, keyed on ``key``.
+    """
+    if flow is None:
+        png = render_png(setup, key, traces, readouts, figsize, dpi)
+    else:
+        png = flow.node(f"figure:{setup.__name__}", (key, tuple(figsize), dpi),
+                        lambda: render_png(setup, key, traces, readouts, figsize, dpi))
+    st.image(png, width="stretch")
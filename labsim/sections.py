@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+The six experiment sections (Objective ... Feedback) as lazily executed tabs.
+
+A plain ``st.tabs`` runs the body of every tab on every rerun, so a student
+reading Theory still pays for the simulation and its CRO figures.
+``lab_tabs`` gives the tabs a key and ``on_change="rerun"``.  Streamlit then
+knows which tab is selected, and each page runs a tab's body only when it
+is open:
+
+    tab1, tab2, ... = sections.lab_tabs(__file__)
+    with tab4:
+        if tab4.open:
+            simulation_tab()
+
+Switching tabs is one rerun that executes the newly selected section only.
+Widgets of the other sections are not rendered then, and Streamlit drops
+the state of widgets that are not rendered.  So every widget in a section
+is created with a key and ``persist_state="session"``, which keeps its
+value while it is hidden.  (The "page" scope would be the natural fit, but
+every full rerun starts a new script runner whose page hash is still empty,
+which Streamlit treats as a page switch: page-scoped values of hidden
+widgets are gone after one more rerun.)  Session scope also keeps values
+across page visits, so widgets that every page creates under the same name
+(the MCQ radios, name and feedback fields) take their key from ``page_key``.
+"""
+
+from pathlib import Path
+
+import streamlit as st
+
+SECTIONS = ("Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback")
+
+
+def lab_tabs(page, sections=SECTIONS):
+    """Lazily executed tabs for ``page`` (pass ``__file__``); check ``tab.open``."""
+    return st.tabs(list(sections), key=f"sections:{Path(page).stem}", on_change="rerun")
+
+
+def page_key(page, name):
+    """Widget key ``name`` made unique to ``page`` (pass ``__file__``)."""
+    return f"{Path(page).stem}:{name}"
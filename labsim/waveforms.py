@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Function-generator waveforms shared by all experiment pages.
+
+Sampling policy
+---------------
+Every page shows ``num_cycles`` (default 3) periods of the input signal.
+The time base is sampled at ``POINTS_PER_CYCLE`` points per period, but
+never slower than ``MIN_SAMPLE_RATE`` samples per second, so a signal of
+frequency f gets ``max(100 * f, 1000) * num_cycles / f`` samples.  A DC
+input (f = 0) is drawn over ``DC_DURATION`` seconds at ``DC_SAMPLE_RATE``.
+At least two samples are always returned.
+
+Pages that must stay responsive over the full slider range (0.001 Hz to
+1100 MHz) use the bounded mode instead: a fixed number of points per cycle,
+independent of frequency, capped at ``max_points`` samples in total.  When
+the cap bites, the points per cycle are reduced but never below
+``MIN_POINTS_PER_CYCLE`` (ten times the Nyquist minimum of 2); past that,
+fewer cycles are drawn rather than aliasing the signal.
+
+The kernels below work on the cycle fraction ``u = frac(f * t)`` with plain
+NumPy ufuncs instead of ``scipy.signal.sawtooth``/``square`` (which build
+boolean masks and fancy-index every sample), and they can write into a
+caller-supplied ``out`` buffer so repeated calls do not allocate.
+"""
+
+import numpy as np
+
+# --- Waveform codes (same integers the pages already use) ---
+SINE = 1
+COSINE = 2
+TRIANGLE = 3
+SQUARE = 4
+
+WAVE_TYPES = {
+    "Sine wave": SINE,
+    "Cosine wave": COSINE,
+    "Triangular wave": TRIANGLE,
+    "Square wave": SQUARE,
+}
+
+# --- Sampling policy ---
+POINTS_PER_CYCLE = 100
+MIN_SAMPLE_RATE = 1000.0
+DC_SAMPLE_RATE = 10000.0
+DC_DURATION = 0.01
+MAX_POINTS = 200000
+MIN_POINTS_PER_CYCLE = 20
+
+
+def sample_count(freq, num_cycles=3, sample_rate=None, min_points=2):
+    """Returns (num_points, total_duration) for the documented sampling policy.
+
+    ``sample_rate`` overrides the points-per-cycle rule with a fixed rate.
+    """
+    if freq == 0:
+        total_duration = DC_DURATION
+        rate = DC_SAMPLE_RATE if sample_rate is None else sample_rate
+    else:
+        total_duration = num_cycles / freq
+        rate = max(POINTS_PER_CYCLE * freq, MIN_SAMPLE_RATE) if sample_rate is None else sample_rate
+    num_points = max(int(rate * total_duration), min_points, 2)
+    return num_points, total_duration
+
+
+def bounded_sample_count(freq, num_cycles=3, points_per_cycle=POINTS_PER_CYCLE,
+                         max_points=MAX_POINTS):
+    """Returns (num_points, total_duration) with a points-per-cycle target and a sample cap."""
+    points_per_cycle = max(int(points_per_cycle), MIN_POINTS_PER_CYCLE)
+    if freq == 0:
+        return max(min(points_per_cycle * num_cycles, max_points), 2), DC_DURATION
+
+    if points_per_cycle * num_cycles > max_points:
+        points_per_cycle = max(max_points // num_cycles, MIN_POINTS_PER_CYCLE)
+        num_cycles = min(num_cycles, max(max_points // points_per_cycle, 1))
+    return points_per_cycle * num_cycles, num_cycles / freq
+
+
+def time_base(num_points, total_duration, out=None):
+    """Evenly spaced samples on [0, total_duration), like linspace(endpoint=False)."""
+    if out is None:
+        out = np.empty(num_points)
+    out[:] = np.arange(num_points)
+    out *= total_duration / num_points
+    return out
+
+
+def _cycle_fraction(t, freq, out):
+    """Writes frac(freq * t) into ``out``."""
+    out = np.multiply(t, freq, out=out)
+    np.remainder(out, 1.0, out=out)
+    return out
+
+
+def sine(t, freq, amp=1.0, out=None):
+    """amp * sin(2*pi*f*t)."""
+    out = np.multiply(t, 2 * np.pi * freq, out=out)
+    np.sin(out, out=out)
+    out *= amp
+    return out
+
+
+def cosine(t, freq, amp=1.0, out=None):
+    """amp * cos(2*pi*f*t)."""
+    out = np.multiply(t, 2 * np.pi * freq, out=out)
+    np.cos(out, out=out)
+    out *= amp
+    return out
+
+
+def triangle(t, freq, amp=1.0, out=None):
+    """Symmetric triangle, identical to amp * sawtooth(2*pi*f*t, width=0.5)."""
+    out = _cycle_fraction(t, freq, out)
+    out -= 0.5
+    np.abs(out, out=out)
+    out *= -4 * amp
+    out += amp
+    return out
+
+
+def square(t, freq, amp=1.0, out=None):
+    """50 % duty square wave, identical to amp * square(2*pi*f*t)."""
+    out = _cycle_fraction(t, freq, out)
+    out -= 0.5
+    # +amp on the first half-cycle, -amp from the midpoint onwards.
+    np.copysign(amp, out, out=out)
+    np.negative(out, out=out)
+    return out
+
+
+KERNELS = {
+    SINE: sine,
+    COSINE: cosine,
+    TRIANGLE: triangle,
+    SQUARE: square,
+}
+
+
+def generate_waveform(amp, freq, wave_type_val, num_cycles=3, sample_rate=None,
+                      min_points=2, max_points=None, points_per_cycle=POINTS_PER_CYCLE,
+                      out=None, t_out=None):
+    """Generates the function-generator output.
+
+    Returns (y, t, amp, total_duration, freq), the same tuple the pages used
+    to build themselves.  Passing ``max_points`` selects the bounded sampling
+    mode.  ``out``/``t_out`` may be preallocated arrays of the length given by
+    ``sample_count`` (or ``bounded_sample_count``).
+    """
+    if max_points is not None:
+        num_points, total_duration = bounded_sample_count(freq, num_cycles, points_per_cycle, max_points)
+    else:
+        num_points, total_duration = sample_count(freq, num_cycles, sample_rate, min_points)
+    for buf in (out, t_out):
+        if buf is not None and len(buf) != num_points:
+            raise ValueError(f"Output buffer has {len(buf)} samples, expected {num_points}.")
+
+    t = time_base(num_points, total_duration, out=t_out)
+
+    if wave_type_val not in KERNELS:
+        y = np.empty(num_points) if out is None else out
+        y.fill(0.0)
+    elif freq == 0:
+        y = np.empty(num_points) if out is None else out
+        y.fill(amp)
+    else:
+        y = KERNELS[wave_type_val](t, freq, amp, out=out)
+
+    return y, t, amp, total_duration, freq
+
+
+def format_sample_rate(num_points, total_duration):
+    """Effective sample rate of a time base as a readable string, e.g. '20.0 kS/s'."""
+    rate = num_points / total_duration if total_duration > 0 else 0.0
+    for scale, unit in ((1e9, "GS/s"), (1e6, "MS/s"), (1e3, "kS/s")):
+        if rate >= scale:
+            return f"{rate / scale:.1f} {unit}"
+    return f"{rate:.1f} S/s"
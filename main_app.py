@@ -1,6 +1,8 @@
 import streamlit as st
 import os
 
+from labsim import assets
+
 st.set_page_config(
     page_title="Electronics Lab Simulator",
     layout="wide",
@@ -89,7 +91,7 @@ with col_text:
 
 with col_logo:
     # Ensure the logo path is correct
-    st.image("image_a2e0d8.png", width=150)
+    assets.show("image_a2e0d8.png", width=150)
 
 # --- MAIN TITLE ---
 st.markdown("<h2 class='main-title'>Welcome to the Electronics Lab Simulator!</h2>", unsafe_allow_html=True)
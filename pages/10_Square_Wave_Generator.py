@@ -8,16 +8,14 @@ Created on Thu Jul  3 01:43:53 2025
 # pages/9_Square_Wave_Generator.py
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
+from labsim import assets, cache, dataflow, oscillators, scope, sections
 
 st.set_page_config(layout="wide", page_title="Square Wave Generator")
 
 st.title("Square Wave Generator Simulator")
 
 # Create the tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 mcq_questions = [
     {
@@ -116,8 +114,9 @@ mcq_questions1 = [
 
 
 with tab1:
+    if tab1.open:
     
-    st.markdown("""
+        st.markdown("""
     **Objective:** To understand the operation of an op-amp based square wave generator (astable multivibrator) and its relationship to the circuit's components.
 
     **Pre-requisites:**
@@ -130,53 +129,55 @@ with tab1:
 
 # --- Prelab Tab ---
 with tab2:
-    st.header("Prelab")
+    if tab2.open:
+        st.header("Prelab")
     
     
-    st.subheader("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.subheader("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
 
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
 
 # --- Theory Tab ---
 with tab3:
-    st.header("Theory")
-    st.markdown(r"""
+    if tab3.open:
+        st.header("Theory")
+        st.markdown(r"""
     An op-amp **square wave generator**, also known as an **astable multivibrator**, is a circuit that produces a continuous square wave output without any external trigger signal. It operates by utilizing an op-amp as a comparator with **positive feedback** and an **RC circuit** that acts as a timing element.
 
     ### Principle of Operation
@@ -204,7 +205,10 @@ with tab3:
     """)
 
 # --- Simulation Tab ---
-with tab4:
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     # --- Layout with Columns ---
     col1, col2 = st.columns([1, 2])
     
@@ -218,7 +222,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.2f",
-            key="RF_input_sq_wave"
+            key="RF_input_sq_wave",
+            persist_state="session"
         )
     
         # Number input for Capacitance (C) in µF.
@@ -228,7 +233,8 @@ with tab4:
             value=0.1,
             step=0.001,
             format="%.3f",
-            key="C_input_sq_wave"
+            key="C_input_sq_wave",
+            persist_state="session"
         )
     
         # Number input for Resistance R1 (part of voltage divider for thresholds) in kΩ.
@@ -238,7 +244,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.2f",
-            key="R1_input_sq_wave"
+            key="R1_input_sq_wave",
+            persist_state="session"
         )
     
         # Number input for Resistance R2 (part of voltage divider for thresholds) in kΩ.
@@ -248,7 +255,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.2f",
-            key="R2_input_sq_wave"
+            key="R2_input_sq_wave",
+            persist_state="session"
         )
     
        
@@ -267,12 +275,13 @@ with tab4:
         T_off = 0.0
         freq = 0.0
         y_signal = np.array([])
+        vc_signal = np.array([])
         t_time = np.array([])
         total_duration = 0.0
         C_amp = 0.0
     
         if (R1_ohms + R2_ohms) == 0:
-            st.error("Sum of R1 and R2 cannot be zero. Please adjust values.")
+            cache.error("Sum of R1 and R2 cannot be zero. Please adjust values.")
             return None
             
         # Simplified beta for the original log function T = 2 * RF * C * ln((1 + beta) / (1 - beta))
@@ -286,13 +295,13 @@ with tab4:
         # Let's check for log validity
         log_argument = (1 + 2 * R2_ohms / R1_ohms) if R1_ohms > 0 else 0
         if log_argument <= 1:
-            st.error("Invalid R1/R2 values. R1 must be positive and not lead to a log argument <= 1.")
+            cache.error("Invalid R1/R2 values. R1 must be positive and not lead to a log argument <= 1.")
             return None
 
         try:
             T = 2 * RF_ohms * C_farads * np.log(1 + 2 * R2_ohms / R1_ohms)
         except (ValueError, ZeroDivisionError):
-            st.error("Error in calculating period. Check RF, C, R1, R2 values.")
+            cache.error("Error in calculating period. Check RF, C, R1, R2 values.")
             return None
 
         T_on = T / 2
@@ -306,24 +315,28 @@ with tab4:
         C_amp = beta * amp_supply
 
         num_cycles = 5
+        num_points = 2000
         amp = amp_supply
+        T_first = 0.0
     
         if freq == 0 or np.isinf(freq) or np.isnan(freq):
             sampling_rate = 10000
             total_duration = 0.01
             y_signal = np.full(int(sampling_rate * total_duration), 0.0)
+            vc_signal = y_signal
             t_time = np.linspace(0, total_duration, int(sampling_rate * total_duration), endpoint=False)
-            st.warning("No oscillation detected with current parameters. Output will be flat.")
+            cache.warning("No oscillation detected with current parameters. Output will be flat.")
         else:
-            sampling_rate = max(100 * freq, 1000)
+            # Switch by switch from an uncharged capacitor: the cost grows
+            # with the number of half-cycles, the display with num_points.
             total_duration = num_cycles / freq
-            num_points = int(sampling_rate * total_duration)
-            if num_points < 2: num_points = 2
-            t_time = np.linspace(0, total_duration, num_points, endpoint=False)
+            half_cycles = oscillators.astable(RF_ohms, C_farads, beta, total_duration, amp)
+            t_time, y_signal, vc_signal = oscillators.astable_trace(
+                half_cycles, RF_ohms, C_farads, total_duration, num_points)
+            T_first = half_cycles[0][1] * 1000 if len(half_cycles[0]) > 1 else 0.0
             T=T*1000;
             T_on=T_on*1000
             T_off=T_off*1000
-            y_signal = amp * signal.square(2 * np.pi * freq * t_time)
     
         return {
             "RF_kohm": RF_kohm,
@@ -337,7 +350,9 @@ with tab4:
             "Output_Amplitude_V": amp,
             "Total_Duration_s": total_duration,
             "Capacitor_Threshold_V": C_amp,
+            "First_Half_Cycle_s": T_first,
             "y_signal": y_signal,
+            "vc_signal": vc_signal,
             "t_time": t_time
         }
 
@@ -345,7 +360,7 @@ with tab4:
     with col2:
         st.header("Calculated Values")
 # 3. RUN THE CALCULATION (Crucial step - must be after inputs, but before outputs)
-        sim_results = calculate_square_wave_parameters(RF_kohm, C_uF, R1_kohm, R2_kohm)
+        sim_results = flow.call("circuit", calculate_square_wave_parameters, RF_kohm, C_uF, R1_kohm, R2_kohm)
 # st.metric requires: label, value (formatted as a string if you want decimals)
         st.metric(
           label="Calculated Frequency (f)",
@@ -356,36 +371,50 @@ with tab4:
         
         st.header("Circuit Diagram")
         
-        st.image("images/squarewavegenerator.png", caption="Square Wave Generator Circuit", width='stretch')
+        assets.show("images/squarewavegenerator.png", caption="Square Wave Generator Circuit", width='stretch')
         
     st.subheader("CRO Display")
-    st.text_input("Your Name",key="p2")
-    sim_results = calculate_square_wave_parameters(RF_kohm, C_uF, R1_kohm, R2_kohm)
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
+    sim_results = flow.call("circuit", calculate_square_wave_parameters, RF_kohm, C_uF, R1_kohm, R2_kohm)
+    fig_key = (RF_kohm, C_uF, R1_kohm, R2_kohm)
     
     if sim_results is not None:
-            fig1, ax1 = plt.subplots(figsize=(6, 3), dpi=100)
             time_ms = sim_results["t_time"] * 1000
             total_duration_ms = sim_results["Total_Duration_s"] * 1000
-            ax1.plot(time_ms, sim_results["y_signal"], color='red')
-            ax1.set_title(f"Output Signal\nFrequency: {sim_results['Frequency_Hz']:.2f} Hz, Period: {sim_results['Period_s']:.2f} ms")
-            ax1.set_xlabel("Time (ms)")
-            ax1.set_ylabel("Amplitude (V)")
-            ax1.grid(True)
-            ax1.set_facecolor("black")
-            ax1.axhline(0, color='gray', linewidth=0.5)
-            ax1.axvline(0, color='gray', linewidth=0.5)
-            
+            threshold = sim_results["Capacitor_Threshold_V"]
+            title = f"Output and Capacitor Voltage\nFrequency: {sim_results['Frequency_Hz']:.2f} Hz, Period: {sim_results['Period_s']:.2f} ms"
             plot_ylim = sim_results["Output_Amplitude_V"] * 1.1 if sim_results["Output_Amplitude_V"] != 0 else 1.0
-            ax1.set_ylim(-plot_ylim, plot_ylim)
-            ax1.set_xlim(0, total_duration_ms)
-            ax1.tick_params(axis='x', colors='black')
-            ax1.tick_params(axis='y', colors='black')
+
+            def setup_output(ax1):
+                scope.trace(ax1, color='red', label="$V_{out}$")
+                scope.trace(ax1, color='yellow', label="$V_C$")
+                ax1.set_title(title)
+                ax1.set_xlabel("Time (ms)")
+                ax1.set_ylabel("Amplitude (V)")
+                ax1.grid(True)
+                ax1.set_facecolor("black")
+                ax1.axhline(0, color='gray', linewidth=0.5)
+                ax1.axvline(0, color='gray', linewidth=0.5)
+                ax1.axhline(threshold, color='yellow', linewidth=0.5, linestyle='--')
+                ax1.axhline(-threshold, color='yellow', linewidth=0.5, linestyle='--')
+                ax1.legend(loc='lower right', fontsize=7)
+            
+                ax1.set_ylim(-plot_ylim, plot_ylim)
+                ax1.set_xlim(0, total_duration_ms)
+                ax1.tick_params(axis='x', colors='black')
+                ax1.tick_params(axis='y', colors='black')
             
-            ax1.text(0.02, 0.95, f'Amp: {sim_results["Output_Amplitude_V"]:.2f} V', transform=ax1.transAxes,
-                      fontsize=8, color='white', verticalalignment='top')
-            ax1.text(0.02, 0.85, f'Freq: {sim_results["Frequency_Hz"]:.2f} Hz', transform=ax1.transAxes,
-                      fontsize=8, color='white', verticalalignment='top')
-            st.pyplot(fig1)
+                scope.readout(ax1, 0.02, 0.95,
+                              fontsize=8, color='white', verticalalignment='top')
+                scope.readout(ax1, 0.02, 0.85,
+                              fontsize=8, color='white', verticalalignment='top')
+            scope.show(setup_output, fig_key, [(time_ms, sim_results["y_signal"]), (time_ms, sim_results["vc_signal"])],
+                       [f'Amp: {sim_results["Output_Amplitude_V"]:.2f} V', f'Freq: {sim_results["Frequency_Hz"]:.2f} Hz'], figsize=(6, 3), dpi=100, flow=flow)
+            if sim_results["First_Half_Cycle_s"]:
+                st.caption(f"The capacitor starts uncharged, so the first half-cycle charges it from 0 V instead of "
+                           f"from $-{threshold:.2f}$ V and lasts {sim_results['First_Half_Cycle_s']:.2f} ms instead "
+                           f"of {sim_results['T_on_s']:.2f} ms. The dashed lines are the switching thresholds "
+                           f"$\\pm\\beta V_{{sat}}$.")
     
     st.header("Simulation Results")
     
@@ -408,7 +437,9 @@ with tab4:
                st.session_state.square_wave_history.append(new_entry)
     
     if st.session_state.square_wave_history:
-                df_history = pd.DataFrame(st.session_state.square_wave_history)
+                import pandas as pd
+                history = st.session_state.square_wave_history
+                df_history = flow.node("results table", (history, len(history)), lambda: pd.DataFrame(history))
                 st.table(df_history)
     
     if st.button("Clear Table History", key="clear_table_button_sq_wave"):
@@ -416,63 +447,70 @@ with tab4:
                 st.rerun()
     else:
             st.warning("Please adjust parameters to allow for oscillation.")
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 # --- Postlab Tab ---
 with tab5:
-    st.header("Postlab")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
 
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
 
 # --- Feedback Tab ---
 with tab6:
-    st.header("Feedback")
-    st.markdown("""
+    if tab6.open:
+        st.header("Feedback")
+        st.markdown("""
     We value your feedback to improve this simulator. Please let us know your thoughts.
     """)
-    st.text_input("Your Name")
-    st.text_input("Registration number/Faculty ID")
-    st.slider("How would you rate this simulator?(best -5)", 1, 5)
+        st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+        st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+        st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
    
-    st.text_input("1.  What did you find most useful about this simulator?")
-    st.text_input("2.  Were there any features that were confusing or difficult to use?")
-    st.text_input("3.  What new features would you like to see added in the future?")
+        st.text_input("1.  What did you find most useful about this simulator?", key=sections.page_key(__file__, "feedback_useful"), persist_state="session")
+        st.text_input("2.  Were there any features that were confusing or difficult to use?", key=sections.page_key(__file__, "feedback_confusing"), persist_state="session")
+        st.text_input("3.  What new features would you like to see added in the future?", key=sections.page_key(__file__, "feedback_wishes"), persist_state="session")
    
-    st.text_area("Any other comments or suggestions.", height=200, key="feedback_text")
-    if st.button("Submit Feedback"):
-      st.success("Thank you for your feedback!")
\ No newline at end of file
+        st.text_area("Any other comments or suggestions.", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+        if st.button("Submit Feedback"):
+          st.success("Thank you for your feedback!")
\ No newline at end of file
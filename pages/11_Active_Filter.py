@@ -8,16 +8,15 @@ Created on Thu Jul  3 01:47:47 2025
 # pages/10_Active_Filter.py
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
+from labsim.waveforms import generate_waveform
+from labsim import assets, cache, dataflow, figures, filters, scope, sections
 
 st.set_page_config(layout="wide", page_title="Active Filter")
 
 st.title("Active Filter Simulator")
 
 # Create the tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 # Define the MCQs and answers
 mcq_questions = [
@@ -95,8 +94,9 @@ mcq_questions1 = [
 
 
 with tab1:
+    if tab1.open:
     
-    st.markdown("""
+        st.markdown("""
     **Objective:** To understand the operation and frequency response of first-order active low-pass and high-pass filters.
 
     **Pre-requisites:**
@@ -109,55 +109,57 @@ with tab1:
 
 # --- Prelab Tab ---
 with tab2:
-    st.header("Prelab: Active Filters")
+    if tab2.open:
+        st.header("Prelab: Active Filters")
     
-    st.markdown("---")
-    st.header("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.markdown("---")
+        st.header("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
 
 
 # --- Theory Tab ---
 # --- Theory Tab ---
 with tab3:
-    st.header("Theory: Active Filter Fundamentals")
-    st.markdown(r"""
+    if tab3.open:
+        st.header("Theory: Active Filter Fundamentals")
+        st.markdown(r"""
     An **active filter** uses an active component like an **op-amp** in addition to resistors (R) and capacitors (C). The op-amp provides **gain** and acts as a **buffer**, preventing the filter from being loaded by subsequent stages.
 
     ### First-Order Active Low-Pass Filter
@@ -182,7 +184,10 @@ with tab3:
     """)
 
 # --- Simulation Tab ---
-with tab4:
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     # --- Layout with Columns ---
     col1, col2, col3 = st.columns([1, 1, 2])
     
@@ -192,21 +197,23 @@ with tab4:
             "Select Waveform",
             ("Sine wave", "Cosine wave", "Triangular wave", "Square wave"),
             index=0,
-            key="wave_type_radio_filter"
+            key="wave_type_radio_filter",
+            persist_state="session"
         )
         wave_type_map = {"Sine wave": 1, "Cosine wave": 2, "Triangular wave": 3, "Square wave": 4}
         selected_wave_type_int = wave_type_map[wave_type]
 
-        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_filter")
+        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_filter", persist_state="session")
 
         st.subheader("Frequency")
-        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_filter")
+        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_filter", persist_state="session")
         current_freq_unit = st.radio(
             "Frequency Unit",
             ("Hz", "kHz", "MHz"),
             index=0,
             horizontal=True,
-            key="freq_unit_radio_filter"
+            key="freq_unit_radio_filter",
+            persist_state="session"
         )
 
         def get_actual_frequency(freq_val_local, unit_local):
@@ -225,7 +232,8 @@ with tab4:
             "Select Filter Type",
             ("Lowpass Filter", "Highpass Filter"),
             index=0,
-            key="filter_type_radio"
+            key="filter_type_radio",
+            persist_state="session"
         )
         filter_type_map = {"Lowpass Filter": 1, "Highpass Filter": 2}
         selected_filter_type_int = filter_type_map[filter_type]
@@ -236,7 +244,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.3f",
-            key="R1_input_filter"
+            key="R1_input_filter",
+            persist_state="session"
         )
         RF_kohm = st.number_input(
             "$R_f$ (kΩ) (Feedback Resistor)",
@@ -244,7 +253,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.3f",
-            key="RF_input_filter"
+            key="RF_input_filter",
+            persist_state="session"
         )
         C_uF = st.number_input(
             "C (µF) (Filter Capacitor)",
@@ -252,7 +262,8 @@ with tab4:
             value=0.1,
             step=0.001,
             format="%.5f",
-            key="C_input_filter"
+            key="C_input_filter",
+            persist_state="session"
         )
         R_kohm = st.number_input(
             "R (kΩ) (Filter Resistor)",
@@ -260,41 +271,13 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.3f",
-            key="R_input_filter"
+            key="R_input_filter",
+            persist_state="session"
         )
 
       
 
     # --- Core Simulation Logic ---
-    def generate_waveform(amp, freq, wave_type_val, num_cycles=3):
-        if freq == 0:
-            sampling_rate = 10000
-        else:
-            sampling_rate = max(100 * freq, 1000)
-
-        total_duration = num_cycles / freq if freq != 0 else 0.01
-
-        num_points = int(sampling_rate * total_duration)
-        if num_points < 2:
-            num_points = 2
-
-        t = np.linspace(0, total_duration, num_points, endpoint=False)
-
-        if freq == 0:
-            y = np.full_like(t, amp)
-        elif wave_type_val == 1:
-            y = amp * np.sin(2 * np.pi * freq * t)
-        elif wave_type_val == 2:
-            y = amp * np.cos(2 * np.pi * freq * t)
-        elif wave_type_val == 3:
-            y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5)
-        elif wave_type_val == 4:
-            y = amp * signal.square(2 * np.pi * freq * t)
-        else:
-            y = np.zeros_like(t)
-
-        return y, t, amp, total_duration, freq
-
     def get_filter_name(filter_type_value):
         if filter_type_value == 1:
             return "Lowpass Filter"
@@ -302,6 +285,7 @@ with tab4:
             return "Highpass Filter"
         return "N/A"
 
+    @cache.memoize
     def simulate_filter_circuit(amp_input, actual_frequency, selected_wave_type_int,
                                 selected_filter_type_int, R1_kohm, RF_kohm, C_uF, R_kohm):
         y_input, t, amp_input_actual, total_duration, input_freq = generate_waveform(
@@ -313,8 +297,6 @@ with tab4:
         C_farads = C_uF * 1e-6
         R_ohms = R_kohm * 1000
 
-        y_output = np.zeros_like(y_input)
-        
         filter_name = get_filter_name(selected_filter_type_int)
 
         Av_ideal = 1 + (RF_ohms / R1_ohms) if R1_ohms != 0 else float('inf')
@@ -323,25 +305,16 @@ with tab4:
         if R_ohms > 0 and C_farads > 0:
             fc = 1 / (2 * np.pi * R_ohms * C_farads)
         else:
-            st.error("R and C for filter must be non-zero to calculate cutoff frequency.")
+            cache.error("R and C for filter must be non-zero to calculate cutoff frequency.")
             return y_input, np.zeros_like(y_input), t, amp_input_actual, total_duration, \
                    input_freq, 0.0, 0.0, 0.0, filter_name, 1.0, "No Output/Blocked", 0.0
 
-        if selected_filter_type_int == 1:
-            if input_freq == 0:
-                y_output = y_input * Av_ideal
-            else:
-                normalized_freq = input_freq / fc
-                gain_at_freq = Av_ideal / np.sqrt(1 + (normalized_freq)**2)
-                y_output = y_input * gain_at_freq
-
-        elif selected_filter_type_int == 2:
-            if input_freq == 0:
-                y_output = np.zeros_like(y_input)
-            else:
-                normalized_freq = input_freq / fc
-                gain_at_freq = Av_ideal * normalized_freq / np.sqrt(1 + (normalized_freq)**2)
-                y_output = y_input * gain_at_freq
+        # Filter the input sample by sample (exact discretization of the RC
+        # section times Av), so each harmonic gets its own gain and phase.  The CRO shows
+        # the steady state, without the switch-on transient.
+        sample_rate = len(t) / total_duration
+        sos = filters.first_order_sos(selected_filter_type_int, fc, Av_ideal, sample_rate)
+        y_output = filters.filter_periodic(sos, y_input)
 
         clipping_limit = 15.0
         y_output = np.clip(y_output, -clipping_limit, clipping_limit)
@@ -376,7 +349,7 @@ with tab4:
     with col3:
         (y_input, y_output, t, amp_input_actual, total_duration, input_freq, 
  output_amplitude, gain_vv, gain_db, filter_name, plot_ylim_output, 
- amplitude_display_text, fc) = simulate_filter_circuit(
+ amplitude_display_text, fc) = flow.call("circuit", simulate_filter_circuit,
     amplitude, actual_frequency, selected_wave_type_int,
     selected_filter_type_int, R1_kohm, RF_kohm, C_uF, R_kohm
 )
@@ -399,58 +372,67 @@ with tab4:
         st.header(" Circuit Diagram")
         
         if filter_type == "Lowpass Filter":
-            st.image("images/LPF.png", caption="Lowpass Filter Circuit", width='stretch')
+            assets.show("images/LPF.png", caption="Lowpass Filter Circuit", width='stretch')
         elif filter_type == "Highpass Filter":
-            st.image("images/HPF.png", caption="Highpass Filter Circuit", width='stretch')
+            assets.show("images/HPF.png", caption="Highpass Filter Circuit", width='stretch')
         
     st.header("CRO Displays")
-    st.text_input("Your Name",key="p2")
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
 # Create three columns *outside* the col1/col2/col3 definition to span the full width
     plot_col1, plot_col2 = st.columns(2)
-    sim_data = simulate_filter_circuit(
+    sim_data = flow.call("circuit", simulate_filter_circuit,
             amplitude, actual_frequency, selected_wave_type_int,
             selected_filter_type_int, R1_kohm, RF_kohm, C_uF, R_kohm
         )
+    fig_key = simulate_filter_circuit.cache_key(
+        amplitude, actual_frequency, selected_wave_type_int,
+        selected_filter_type_int, R1_kohm, RF_kohm, C_uF, R_kohm
+    )
 
     y_input, y_output, t, amp_input, total_duration, input_freq, \
     output_amplitude, gain_vv, gain_db, filter_name, plot_ylim_output, amplitude_display_text, fc = sim_data
 
-    fig1, ax1 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax1.plot(t, y_input, color='lime')
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
-        
-    max_plot_amp_input = amp_input * 1.5 if amp_input != 0 else 1.0
-    ax1.set_ylim(-max_plot_amp_input, max_plot_amp_input)
-        
-    ax1.set_xlim(0, total_duration)
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
-    ax1.set_xlabel("Time (ms)")
-    ax1.set_ylabel("Amplitude (V)")
-    ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
-    ax1.text(0.02, 0.95, f'Amp: {amp_input:.2f} V', transform=ax1.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
-    with plot_col1:    st.pyplot(fig1)
-
-    fig2, ax2 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax2.plot(t, y_output, color='cyan')
-    ax2.set_facecolor("black")
-    ax2.axhline(0, color='gray', linewidth=0.5)
-    ax2.axvline(0, color='gray', linewidth=0.5)
     current_max = np.max(np.abs(y_output))
     dynamic_ylim = (current_max * 1.5) if current_max > 0 else 1.0
-    ax2.set_ylim(-dynamic_ylim, dynamic_ylim)
-    ax2.set_xlim(0, total_duration)
-    ax2.tick_params(axis='x', colors='black')
-    ax2.tick_params(axis='y', colors='black')
-    ax2.set_xlabel("Time (ms)")
-    ax2.set_ylabel("Amplitude (V)")
-    ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
-    ax2.text(0.02, 0.95, amplitude_display_text, transform=ax2.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
-    with plot_col2:    st.pyplot(fig2)
+
+    def setup_input(ax1):
+        scope.trace(ax1, color='lime')
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
+        
+        max_plot_amp_input = amp_input * 1.5 if amp_input != 0 else 1.0
+        ax1.set_ylim(-max_plot_amp_input, max_plot_amp_input)
+        
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
+        ax1.set_xlabel("Time (ms)")
+        ax1.set_ylabel("Amplitude (V)")
+        ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+    with plot_col1:
+        scope.show(setup_input, fig_key, [(t, y_input)],
+                   [f'Amp: {amp_input:.2f} V'], figsize=(3, 2), dpi=100, flow=flow)
+
+    def setup_output(ax2):
+        scope.trace(ax2, color='cyan')
+        ax2.set_facecolor("black")
+        ax2.axhline(0, color='gray', linewidth=0.5)
+        ax2.axvline(0, color='gray', linewidth=0.5)
+        ax2.set_ylim(-dynamic_ylim, dynamic_ylim)
+        ax2.set_xlim(0, total_duration)
+        ax2.tick_params(axis='x', colors='black')
+        ax2.tick_params(axis='y', colors='black')
+        ax2.set_xlabel("Time (ms)")
+        ax2.set_ylabel("Amplitude (V)")
+        ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
+        scope.readout(ax2, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+    with plot_col2:
+        scope.show(setup_output, fig_key, [(t, y_output)],
+                   [amplitude_display_text], figsize=(3, 2), dpi=100, flow=flow)
 
     st.subheader("Frequency Response (Gain vs. Frequency)")
 
@@ -485,33 +467,68 @@ with tab4:
             
             st.rerun()
 
-    fig_semilog, ax_semilog = plt.subplots(figsize=(6, 3), dpi=100)
-    ax_semilog.set_facecolor("black")
-    ax_semilog.axhline(0, color='gray', linewidth=0.5)
-    ax_semilog.axvline(0, color='gray', linewidth=0.5)
+    show_sweep = st.checkbox(
+        "Show computed frequency sweep (magnitude and phase)",
+        value=False,
+        key="show_sweep_checkbox",
+        help="Evaluates the filter's transfer function at "
+             f"{filters.SWEEP_POINTS} log-spaced frequencies in one step.",
+        persist_state="session"
+    )
+
+    logged_points = sorted(st.session_state.frequency_response_data, key=lambda x: x[0])
+    Av_ideal = 1 + (RF_kohm / R1_kohm)
+    has_sweep = show_sweep and fc > 0 and not np.isinf(fc) and not np.isnan(fc)
+    bode_key = (tuple(logged_points), fc, has_sweep, selected_filter_type_int, Av_ideal)
+
+    def draw_bode(ax_semilog):
+        ax_semilog.set_facecolor("black")
+        ax_semilog.axhline(0, color='gray', linewidth=0.5)
+        ax_semilog.axvline(0, color='gray', linewidth=0.5)
         
-    if not st.session_state.frequency_response_data:
-            ax_semilog.text(0.5, 0.5, "No data to plot.\nClick 'Add Current Point & Log to Table'.",
-                             horizontalalignment='center', verticalalignment='center',
-                             transform=ax_semilog.transAxes, color='white', fontsize=12)
-    else:
-            sorted_data = sorted(st.session_state.frequency_response_data, key=lambda x: x[0])
-            frequencies_plot = [d[0] for d in sorted_data]
-            gains_db_plot = [d[1] for d in sorted_data]
-
-            ax_semilog.semilogx(frequencies_plot, gains_db_plot, 'o-', color='yellow')
-            ax_semilog.set_xlabel("Frequency (Hz)", color='black')
-            ax_semilog.set_ylabel("Gain (dB)", color='black')
-            ax_semilog.set_title("Frequency Response (Gain vs. Frequency)", color='white', fontsize=10)
-            ax_semilog.tick_params(axis='x', colors='black')
-            ax_semilog.tick_params(axis='y', colors='black')
-            ax_semilog.grid(True, which="both", ls="-", color='gray', alpha=0.5)
+        if not logged_points and not has_sweep:
+                ax_semilog.text(0.5, 0.5, "No data to plot.\nClick 'Add Current Point & Log to Table'.",
+                                 horizontalalignment='center', verticalalignment='center',
+                                 transform=ax_semilog.transAxes, color='white', fontsize=12)
+        else:
+                if has_sweep:
+                    # Only evaluated when the figure is not in the figure cache.
+                    sweep_freqs = filters.sweep_frequencies(fc, include=[d[0] for d in logged_points])
+                    sweep_db, sweep_phase = filters.frequency_response(
+                        selected_filter_type_int, fc, Av_ideal, sweep_freqs)
+                    ax_semilog.semilogx(sweep_freqs, sweep_db, '-', color='cyan', linewidth=1, label='Computed Gain')
+                    # -3 dB below the passband gain Av marks the cutoff.
+                    ax_semilog.axhline(20 * np.log10(Av_ideal) - 3, color='red', linestyle='--', linewidth=0.8,
+                                       label='-3 dB Level')
+                    ax_phase = ax_semilog.twinx()
+                    ax_phase.semilogx(sweep_freqs, sweep_phase, '--', color='orange', linewidth=1, label='Computed Phase')
+                    ax_phase.set_ylabel("Phase (deg)", color='black')
+                    ax_phase.set_ylim(-100, 100)
+                    ax_phase.tick_params(axis='y', colors='black')
+
+                if logged_points:
+                    frequencies_plot = [d[0] for d in logged_points]
+                    gains_db_plot = [d[1] for d in logged_points]
+                    ax_semilog.semilogx(frequencies_plot, gains_db_plot, 'o-', color='yellow', label='Logged Points')
+
+                ax_semilog.set_xlabel("Frequency (Hz)", color='black')
+                ax_semilog.set_ylabel("Gain (dB)", color='black')
+                ax_semilog.set_title("Frequency Response (Gain vs. Frequency)", color='white', fontsize=10)
+                ax_semilog.tick_params(axis='x', colors='black')
+                ax_semilog.tick_params(axis='y', colors='black')
+                ax_semilog.grid(True, which="both", ls="-", color='gray', alpha=0.5)
             
-            if fc > 0 and not np.isinf(fc) and not np.isnan(fc):
-                ax_semilog.axvline(fc, color='red', linestyle=':', label=f'Cutoff Freq: {fc:.2f} Hz')
-                ax_semilog.legend(loc='upper right', fontsize=7, facecolor='darkgray', edgecolor='white')
-
-    st.pyplot(fig_semilog)
+                if fc > 0 and not np.isinf(fc) and not np.isnan(fc):
+                    ax_semilog.axvline(fc, color='red', linestyle=':', label=f'Cutoff Freq: {fc:.2f} Hz')
+                handles, labels = ax_semilog.get_legend_handles_labels()
+                if has_sweep:
+                    phase_handles, phase_labels = ax_phase.get_legend_handles_labels()
+                    handles, labels = handles + phase_handles, labels + phase_labels
+                if handles:
+                    (ax_phase if has_sweep else ax_semilog).legend(
+                        handles, labels, loc='upper right', fontsize=7, facecolor='darkgray', edgecolor='white')
+
+    figures.show(draw_bode, bode_key, figsize=(6, 3), dpi=100, flow=flow)
 
     col_clear1, col_clear2 = st.columns(2)
     with col_clear1:
@@ -526,67 +543,76 @@ with tab4:
 
     st.subheader("Simulation Results Table")
     if 'filter_table_history' in st.session_state and st.session_state.filter_table_history:
-            df_history = pd.DataFrame(st.session_state.filter_table_history)
+            import pandas as pd
+            history = st.session_state.filter_table_history
+            df_history = flow.node("results table", (history, len(history)), lambda: pd.DataFrame(history))
             st.dataframe(df_history, width='stretch')
     else:
             st.info("No simulation results logged yet. Adjust parameters and click 'Add Current Point & Log to Table'.")
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 # --- Postlab Tab ---
 with tab5:
-    st.header("Postlab: Analysis and Conclusion")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab: Analysis and Conclusion")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
 
 # --- Feedback Tab ---
 with tab6:
-    st.header("Feedback")
-    st.markdown("""
+    if tab6.open:
+        st.header("Feedback")
+        st.markdown("""
     We value your feedback to improve this simulator. Please let us know your thoughts.
     """)
-    st.text_input("Your Name")
-    st.text_input("Registration number/Faculty ID")
-    st.slider("How would you rate this simulator?(best -5)", 1, 5)
+        st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+        st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+        st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
    
-    st.text_input("1.  What did you find most useful about this simulator?")
-    st.text_input("2.  Were there any features that were confusing or difficult to use?")
-    st.text_input("3.  What new features would you like to see added in the future?")
+        st.text_input("1.  What did you find most useful about this simulator?", key=sections.page_key(__file__, "feedback_useful"), persist_state="session")
+        st.text_input("2.  Were there any features that were confusing or difficult to use?", key=sections.page_key(__file__, "feedback_confusing"), persist_state="session")
+        st.text_input("3.  What new features would you like to see added in the future?", key=sections.page_key(__file__, "feedback_wishes"), persist_state="session")
    
-    st.text_area("Any other comments or suggestions.", height=200, key="feedback_text")
-    if st.button("Submit Feedback"):
-      st.success("Thank you for your feedback!")
\ No newline at end of file
+        st.text_area("Any other comments or suggestions.", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+        if st.button("Submit Feedback"):
+          st.success("Thank you for your feedback!")
\ No newline at end of file
@@ -6,12 +6,12 @@ Created on Wed Jun 18 21:04:27 2025
 """
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
+from labsim import assets, dataflow, opamp, scope, sections
+from labsim.waveforms import WAVE_TYPES, format_sample_rate, generate_waveform
 import io # To capture Matplotlib plots as images
-import pandas as pd
 # --- Constants ---
 CLIPPING_LIMIT = 15.0 # Define the clipping limit for output voltage
+MAX_SAMPLES = 200000 # Upper bound on samples per waveform, whatever the frequency
 
 # --- Helper Functions ---
 def get_actual_frequency(freq_val, unit):
@@ -23,35 +23,6 @@ def get_actual_frequency(freq_val, unit):
     else: # Hz
         return freq_val
 
-def generate_waveform(amp, freq, wave_type, num_cycles=3):
-    """Generates the specified waveform."""
-    sampling_rate = 1000000
-    
-    if freq == 0:
-        duration = 0.01
-        t = np.linspace(0, duration * num_cycles, int(sampling_rate * duration * num_cycles), endpoint=False)
-        y = np.zeros_like(t)
-    else:
-        period = 1 / freq
-        total_duration = period * num_cycles
-        num_points = int(sampling_rate * total_duration)
-        if num_points < 1000:
-            num_points = 1000
-        t = np.linspace(0, total_duration, num_points, endpoint=False)
-        
-        if wave_type == "Sine wave":
-            y = amp * np.sin(2 * np.pi * freq * t)
-        elif wave_type == "Cosine wave":
-            y = amp * np.cos(2 * np.pi * freq * t)
-        elif wave_type == "Triangular wave":
-            y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5)
-        elif wave_type == "Square wave":
-            y = amp * signal.square(2 * np.pi * freq * t)
-        else: # Default or no selection
-            y = np.zeros_like(t)
-
-    return y, t, amp, total_duration, freq
-
 def get_amplifier_name(amp_type_value):
     """Returns human-readable amplifier name."""
     if amp_type_value == "Inverting Amplifier":
@@ -62,8 +33,13 @@ def get_amplifier_name(amp_type_value):
         return "Buffer"
     return "N/A"
 
-def calculate_amplifier_output(y_input, amp_input, R1_kohm, Rf_kohm, amplifier_type_name):
-    """Calculates amplifier output based on type and resistances."""
+def calculate_amplifier_output(y_input, amp_input, R1_kohm, Rf_kohm, amplifier_type_name,
+                               t=None, input_freq=0, gbw=None, slew_rate=None):
+    """Calculates amplifier output based on type and resistances.
+
+    With ``gbw`` (Hz) and ``slew_rate`` (V/s) the stage is simulated as a
+    non-ideal op-amp (labsim.opamp) over the time base ``t`` instead.
+    """
     R1_val = R1_kohm * 1000
     Rf_val = Rf_kohm * 1000
 
@@ -98,6 +74,14 @@ def calculate_amplifier_output(y_input, amp_input, R1_kohm, Rf_kohm, amplifier_t
         output_amplitude = amp_input
         phase_diff_deg = 0
     
+    if gbw is not None and amplifier_type_name != "None" and len(t) > 1:
+        noise_gain = 1 if amplifier_type_name == "Voltage Follower" else 1 + Rf_val / R1_val
+        dc_gain, bandwidth = opamp.closed_loop(gain, noise_gain, gbw)
+        y_output = opamp.transient_periodic(y_input, t[1] - t[0], dc_gain, bandwidth,
+                                            slew_rate, CLIPPING_LIMIT)
+        if input_freq > 0 and np.any(y_input) and np.any(y_output):
+            phase_diff_deg = opamp.phase_shift(y_input, y_output, t, input_freq)
+
     # --- Output Clipping Logic ---
     y_output = np.clip(y_output, -CLIPPING_LIMIT, CLIPPING_LIMIT)
     
@@ -113,7 +97,7 @@ st.set_page_config(layout="wide", page_title="Op-Amp Lab Simulation")
 st.title("Op-Amp Lab Simulator")
 
 # Create tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 mcq_questions1 = [
     {
@@ -215,82 +199,88 @@ questions =[
 
 
 with tab1:
+    if tab1.open:
     
-    st.header("Objective")
-    st.markdown("""
+        st.header("Objective")
+        st.markdown("""
     
     The objective of this lab is to **investigate the fundamental operational amplifier (Op-Amp) configurations**, specifically the **Inverting Amplifier**, **Non-Inverting Amplifier**, and **Voltage Follower**. Students will determine the relationship between **external resistor values ($R_1$ and $R_f$) and circuit voltage gain**, analyze the **phase relationship** between input and output signals, and observe the effect of **output voltage clipping** when the signal exceeds the supply limits.
     """)
 with tab2:
-    st.header("Operational Amplifier Fundamentals Quiz")
-    st.markdown("""
+    if tab2.open:
+        st.header("Operational Amplifier Fundamentals Quiz")
+        st.markdown("""
     Test your knowledge on the basics of Op-Amps before starting the simulation.
     """)
-    st.markdown("---")
+        st.markdown("---")
     
-# --- MCQ Questions Section ---
-    st.subheader("MCQ Questions")
-    st.text_input("Your Name",key="p1")
+    # --- MCQ Questions Section ---
+        st.subheader("MCQ Questions")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
    
-    user_answers = {}
-    for i, mcq in enumerate(questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        user_answers = {}
+        for i, mcq in enumerate(questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(questions)
        
-       all_correct = True
-       for i, mcq in enumerate(questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
    
 with tab3:
-    st.subheader("Circuit Theory")
-    st.write("This section provides a brief overview of the theoretical concepts behind the circuits you will be simulating.")
-    st.markdown("#### The Operational Amplifier (Op-Amp)")
-    st.write("An operational amplifier is a DC-coupled high-gain electronic voltage amplifier with a differential input and, usually, a single-ended output. A key characteristic of the ideal Op-Amp is that it has infinite input impedance and zero output impedance.")
-    st.markdown("#### Inverting Amplifier")
-    st.write("In this configuration, the input signal is applied to the inverting input terminal. The output voltage is out of phase with the input and its gain is determined by the ratio of the feedback resistor ($R_f$) to the input resistor ($R_1$).")
-    st.image("images/invertingamplifier.png", caption="Inverting Amplifier Circuit", width='stretch')
-    st.latex(r"V_{out} = -\left(\frac{R_f}{R_1}\right) V_{in}")
-    
-    st.markdown("#### Non-Inverting Amplifier")
-    st.write("Here, the input signal is applied to the non-inverting input terminal. The output voltage is in phase with the input and its gain is given by the formula:")
-    st.image("images/Noninvertingamplifier.png", caption="Non-Inverting Amplifier Circuit", width='stretch')
-    st.latex(r"V_{out} = \left(1 + \frac{R_f}{R_1}\right) V_{in}")
-    
-    st.markdown("#### Buffer Amplifier (Voltage Follower)")
-    st.write("A buffer amplifier is a non-inverting amplifier with a gain of 1. It is used to isolate one stage of a circuit from another, providing high input impedance and low output impedance.")
-    st.image("images/voltagefollower.png", caption="Buffer Amplifier (Voltage Follower) Circuit", width='stretch')
-    st.latex(r"V_{out} = V_{in}")
-
-with tab4:
+    if tab3.open:
+        st.subheader("Circuit Theory")
+        st.write("This section provides a brief overview of the theoretical concepts behind the circuits you will be simulating.")
+        st.markdown("#### The Operational Amplifier (Op-Amp)")
+        st.write("An operational amplifier is a DC-coupled high-gain electronic voltage amplifier with a differential input and, usually, a single-ended output. A key characteristic of the ideal Op-Amp is that it has infinite input impedance and zero output impedance.")
+        st.markdown("#### Inverting Amplifier")
+        st.write("In this configuration, the input signal is applied to the inverting input terminal. The output voltage is out of phase with the input and its gain is determined by the ratio of the feedback resistor ($R_f$) to the input resistor ($R_1$).")
+        assets.show("images/invertingamplifier.png", caption="Inverting Amplifier Circuit", width='stretch')
+        st.latex(r"V_{out} = -\left(\frac{R_f}{R_1}\right) V_{in}")
+    
+        st.markdown("#### Non-Inverting Amplifier")
+        st.write("Here, the input signal is applied to the non-inverting input terminal. The output voltage is in phase with the input and its gain is given by the formula:")
+        assets.show("images/Noninvertingamplifier.png", caption="Non-Inverting Amplifier Circuit", width='stretch')
+        st.latex(r"V_{out} = \left(1 + \frac{R_f}{R_1}\right) V_{in}")
+    
+        st.markdown("#### Buffer Amplifier (Voltage Follower)")
+        st.write("A buffer amplifier is a non-inverting amplifier with a gain of 1. It is used to isolate one stage of a circuit from another, providing high input impedance and low output impedance.")
+        assets.show("images/voltagefollower.png", caption="Buffer Amplifier (Voltage Follower) Circuit", width='stretch')
+        st.latex(r"V_{out} = V_{in}")
+
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     st.header("Simulation")
     
     # Create columns for layout
@@ -303,14 +293,16 @@ with tab4:
             "Select Waveform:",
             ("Sine wave", "Cosine wave", "Triangular wave", "Square wave", "None"),
             index=0, # Default to Sine wave
-            key="wave_type_radio"
+            key="wave_type_radio",
+            persist_state="session"
         )
     
         amplitude = st.slider(
             "Amplitude (V)",
             min_value=0.0, max_value=5.0, value=1.0, step=0.01,
             format="%.2f V",
-            key="amplitude_slider"
+            key="amplitude_slider",
+            persist_state="session"
         )
     
         st.write("Frequency")
@@ -321,7 +313,8 @@ with tab4:
             index=0, # Default to Hz
             horizontal=True,
             label_visibility="collapsed", # Hide default label
-            key="freq_unit_radio"
+            key="freq_unit_radio",
+            persist_state="session"
         )
         freq_col1, _ = st.columns([2, 1])
         with freq_col1:
@@ -329,11 +322,21 @@ with tab4:
                 "Frequency Value",
                 min_value=0.0, max_value=1100.0, value=100.0, step=0.1,
                 label_visibility="collapsed", # Hide default label to combine with units
-                key="frequency_slider"
+                key="frequency_slider",
+                persist_state="session"
             )
         
         actual_frequency = get_actual_frequency(frequency_value, freq_unit)
-    
+
+        # Samples per period of the input; the total is capped at MAX_SAMPLES.
+        points_per_cycle = st.select_slider(
+            "Points per Cycle",
+            options=(50, 100, 200, 500, 1000),
+            value=200,
+            key="points_per_cycle_slider",
+            persist_state="session"
+        )
+
     with col2:
         st.header("Amplifier Settings")
         
@@ -341,7 +344,8 @@ with tab4:
             "Select Amplifier Type:",
             ("Inverting Amplifier", "Non-Inverting Amplifier", "Voltage Follower", "None"),
             index=0, # Default to Inverting Amplifier
-            key="amp_type_radio"
+            key="amp_type_radio",
+            persist_state="session"
         )
         
         # Determine if inputs should be disabled
@@ -358,7 +362,8 @@ with tab4:
             step=0.1,
             format="%.2f",
             key="r1_input",
-            disabled=disable_inputs
+            disabled=disable_inputs,
+            persist_state="session"
         )
     
         rf_kohm = st.number_input(
@@ -368,8 +373,35 @@ with tab4:
             step=0.1,
             format="%.2f",
             key="rf_input",
-            disabled=disable_inputs
+            disabled=disable_inputs,
+            persist_state="session"
         )
+
+        nonideal = st.checkbox(
+            "Non-ideal op-amp (GBW, slew rate, ±15 V rails)",
+            value=False,
+            key="nonideal_checkbox",
+            persist_state="session"
+        )
+        if nonideal:
+            gbw_mhz = st.number_input(
+                "Gain-Bandwidth Product (MHz)",
+                min_value=0.01, max_value=1000.0, value=opamp.GBW / 1e6, step=0.1,
+                format="%.2f",
+                key="gbw_input",
+                persist_state="session"
+            )
+            slew_v_per_us = st.number_input(
+                "Slew Rate (V/µs)",
+                min_value=0.01, max_value=1000.0, value=opamp.SLEW_RATE / 1e6, step=0.1,
+                format="%.2f",
+                key="slew_rate_input",
+                persist_state="session"
+            )
+            gbw_hz = gbw_mhz * 1e6
+            slew_rate = slew_v_per_us * 1e6
+        else:
+            gbw_hz = slew_rate = None
     
     # Use a state variable for the simulation results table
     if 'simulation_results' not in st.session_state:
@@ -380,7 +412,13 @@ with tab4:
     # --- Simulation Logic and Plotting (triggered when inputs change) ---
     
     # Generate input waveform
-    y_input, t, amp_input, total_duration, input_freq = generate_waveform(amplitude, actual_frequency, wave_type)
+    y_input, t, amp_input, total_duration, input_freq = flow.node(
+        "waveform", (amplitude, actual_frequency, wave_type, points_per_cycle),
+        lambda: generate_waveform(
+            amplitude, actual_frequency, WAVE_TYPES.get(wave_type),
+            points_per_cycle=points_per_cycle, max_points=MAX_SAMPLES
+        )
+    )
     
     # Use fixed values for Voltage Follower to ensure correct calculation
     if amplifier_type == "Voltage Follower":
@@ -391,26 +429,36 @@ with tab4:
         rf_kohm_calc = rf_kohm
     
     # Calculate output waveform
-    y_output, output_amplitude, phase_diff_deg,gain = calculate_amplifier_output(
-        y_input, amp_input, r1_kohm_calc, rf_kohm_calc, amplifier_type
+    y_output, output_amplitude, phase_diff_deg,gain = flow.call(
+        "circuit", calculate_amplifier_output,
+        y_input, amp_input, r1_kohm_calc, rf_kohm_calc, amplifier_type,
+        t, input_freq, gbw_hz, slew_rate
     )
     
     with col3:
         st.header(" Circuit Diagram")
         
         if amplifier_type == "Inverting Amplifier":
-            st.image("images/invertingamplifier.png", caption="Inverting Amplifier Circuit", width='stretch')
+            assets.show("images/invertingamplifier.png", caption="Inverting Amplifier Circuit", width='stretch')
         elif amplifier_type == "Non-Inverting Amplifier":
-            st.image("images/Noninvertingamplifier.png", caption="Non-Inverting Amplifier Circuit", width='stretch')
+            assets.show("images/Noninvertingamplifier.png", caption="Non-Inverting Amplifier Circuit", width='stretch')
         elif amplifier_type == "Voltage Follower":
-            st.image("images/voltagefollower.png", caption="Buffer Amplifier (Voltage Follower) Circuit", width='stretch')
+            assets.show("images/voltagefollower.png", caption="Buffer Amplifier (Voltage Follower) Circuit", width='stretch')
         else:
             st.info("Select an amplifier type to display its circuit diagram.")
         
     
     st.markdown("---")
     st.subheader("CRO Waveforms")
-    st.text_input("Your Name",key="p2")
+    st.caption(f"Effective sample rate: {format_sample_rate(len(t), total_duration)} "
+               f"({len(t):,} samples over {total_duration:.3g} s)")
+    if gbw_hz is not None and amplifier_type != "None":
+        noise_gain = 1 if amplifier_type == "Voltage Follower" else 1 + rf_kohm_calc / r1_kohm_calc
+        _, bandwidth = opamp.closed_loop(gain, noise_gain, gbw_hz)
+        st.caption(f"Non-ideal op-amp: closed-loop bandwidth {bandwidth / 1e3:.3g} kHz "
+                   f"(GBW / noise gain {noise_gain:.3g}), full-power bandwidth at ±{CLIPPING_LIMIT:.0f} V "
+                   f"{slew_rate / (2 * np.pi * CLIPPING_LIMIT) / 1e3:.3g} kHz")
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
     # ------------------------------------------------------------------
     # --- PLOTS IN FULL-WIDTH ROW ---
     # ------------------------------------------------------------------
@@ -422,42 +470,11 @@ with tab4:
     plot_width = 4.5 # Adjusted width for full-space visibility
     plot_height = 3.0
     
-    # Plot 1: Input Signal
-    fig1, ax1 = plt.subplots(figsize=(plot_width, plot_height)) 
-    ax1.plot(t, y_input, color='lime')
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
+    # Everything the three figures depend on; they are cached under this key.
+    fig_key = (wave_type, amplitude, actual_frequency, points_per_cycle,
+               amplifier_type, r1_kohm_calc, rf_kohm_calc, gbw_hz, slew_rate)
     plot1_ylim = amplitude * 1.5 if amplitude > 0 else 1.0
-    ax1.set_ylim(-plot1_ylim, plot1_ylim) 
-    ax1.set_xlim(0, total_duration)
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
-    ax1.set_title("Input Waveform (Ch 1)", color='white')
-    ax1.set_xlabel("Time (sec)")
-    ax1.set_ylabel("Voltage (V)")
-    if amplitude != 0:
-        ax1.text(0.02, 0.95, f'Amplitude: {amplitude:.2f} V', transform=ax1.transAxes, 
-                  fontsize=9, color='white', verticalalignment='top')
-    
-    with plot_col1: # Display fig1 in the first plot column
-        st.pyplot(fig1)
-    plt.close(fig1)
-
-    # Plot 2: Output Signal
-    fig2, ax2 = plt.subplots(figsize=(plot_width, plot_height)) 
-    ax2.plot(t, y_output, color='cyan')
-    ax2.set_facecolor("black")
-    ax2.axhline(0, color='gray', linewidth=0.5)
-    ax2.axvline(0, color='gray', linewidth=0.5)
     plot_ylim = max(output_amplitude * 1.2, 1.0)
-    ax2.set_ylim(-plot_ylim, plot_ylim)
-    ax2.set_xlim(0, total_duration)
-    ax2.tick_params(axis='x', colors='black')
-    ax2.tick_params(axis='y', colors='black')
-    ax2.set_title("Output Waveform (Ch 2)", color='white')
-    ax2.set_xlabel("Time (sec)")
-    ax2.set_ylabel("Voltage (V)")
 
     amplitude_display_text = f'Amplitude: {output_amplitude:.2f} V'
     if abs(output_amplitude - CLIPPING_LIMIT) < 0.01 and amplitude > 0:
@@ -465,33 +482,66 @@ with tab4:
     elif output_amplitude == 0 and amp_input != 0 and amplifier_type != "None":
         amplitude_display_text += ' (No Output)'
 
-    ax2.text(0.02, 0.95, amplitude_display_text, transform=ax2.transAxes,
-              fontsize=9, color='white', verticalalignment='top')
+    # Plot 1: Input Signal
+    def setup_input(ax1):
+        scope.trace(ax1, color='lime')
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
+        ax1.set_ylim(-plot1_ylim, plot1_ylim) 
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
+        ax1.set_title("Input Waveform (Ch 1)", color='white')
+        ax1.set_xlabel("Time (sec)")
+        ax1.set_ylabel("Voltage (V)")
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=9, color='white', verticalalignment='top')
+    
+    with plot_col1: # Display fig1 in the first plot column
+        scope.show(setup_input, fig_key, [(t, y_input)],
+                   [f'Amplitude: {amplitude:.2f} V' if amplitude != 0 else ''], figsize=(plot_width, plot_height), flow=flow)
+
+    # Plot 2: Output Signal
+    def setup_output(ax2):
+        scope.trace(ax2, color='cyan')
+        ax2.set_facecolor("black")
+        ax2.axhline(0, color='gray', linewidth=0.5)
+        ax2.axvline(0, color='gray', linewidth=0.5)
+        ax2.set_ylim(-plot_ylim, plot_ylim)
+        ax2.set_xlim(0, total_duration)
+        ax2.tick_params(axis='x', colors='black')
+        ax2.tick_params(axis='y', colors='black')
+        ax2.set_title("Output Waveform (Ch 2)", color='white')
+        ax2.set_xlabel("Time (sec)")
+        ax2.set_ylabel("Voltage (V)")
+        scope.readout(ax2, 0.02, 0.95,
+                      fontsize=9, color='white', verticalalignment='top')
     
     with plot_col2: # Display fig2 in the second plot column
-        st.pyplot(fig2)
-    plt.close(fig2)
+        scope.show(setup_output, fig_key, [(t, y_output)],
+                   [amplitude_display_text], figsize=(plot_width, plot_height), flow=flow)
 
     # Plot 3: Combined Waveform
-    fig_combined, ax_combined = plt.subplots(figsize=(plot_width, plot_height)) 
-    ax_combined.plot(t, y_input, color='lime', label='Input (Ch 1)')
-    ax_combined.plot(t, y_output, color='cyan', label='Output (Ch 2)')
-    ax_combined.set_facecolor("black")
-    ax_combined.axhline(0, color='gray', linewidth=0.5)
-    ax_combined.axvline(0, color='gray', linewidth=0.5)
-    max_combined_amp = max(plot1_ylim, plot_ylim)
-    ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
-    ax_combined.set_xlim(0, total_duration)
-    ax_combined.tick_params(axis='x', colors='black')
-    ax_combined.tick_params(axis='y', colors='black')
-    ax_combined.set_title("Combined Waveform", color='white')
-    ax_combined.legend(loc='upper right', facecolor='darkgray', edgecolor='white', fontsize=8)
-    ax_combined.set_xlabel("Time (sec)")
-    ax_combined.set_ylabel("Voltage (V)")
+    def setup_combined(ax_combined):
+        scope.trace(ax_combined, color='lime', label='Input (Ch 1)')
+        scope.trace(ax_combined, color='cyan', label='Output (Ch 2)')
+        ax_combined.set_facecolor("black")
+        ax_combined.axhline(0, color='gray', linewidth=0.5)
+        ax_combined.axvline(0, color='gray', linewidth=0.5)
+        max_combined_amp = max(plot1_ylim, plot_ylim)
+        ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
+        ax_combined.set_xlim(0, total_duration)
+        ax_combined.tick_params(axis='x', colors='black')
+        ax_combined.tick_params(axis='y', colors='black')
+        ax_combined.set_title("Combined Waveform", color='white')
+        ax_combined.legend(loc='upper right', facecolor='darkgray', edgecolor='white', fontsize=8)
+        ax_combined.set_xlabel("Time (sec)")
+        ax_combined.set_ylabel("Voltage (V)")
     
     with plot_col3: # Display fig_combined in the third plot column
-        st.pyplot(fig_combined)
-    plt.close(fig_combined)
+        scope.show(setup_combined, fig_key, [(t, y_input), (t, y_output)],
+                   [], figsize=(plot_width, plot_height), flow=flow)
     
     # ------------------------------------------------------------------
     # --- END PLOTS IN FULL-WIDTH ROW ---
@@ -570,62 +620,69 @@ with tab4:
       st.session_state.simulation_results = []
       st.session_state.row_id_counter = 0
       st.rerun()
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
       
 with tab5:
-    st.header("Postlab Questions")
+    if tab5.open:
+        st.header("Postlab Questions")
     
     
 
-    st.subheader("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.subheader("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
     
 
     
 with tab6:
-    st.header("Feedback")
-    st.markdown("""
+    if tab6.open:
+        st.header("Feedback")
+        st.markdown("""
     Your feedback is valuable to us! Please provide your comments on the simulator.
     """)
-    st.write("We would eager to hear your thoughts on this simulator.")
-    st.text_input("Your Name")
-    st.text_input("Registration number/Faculty ID")
-    st.slider("How would you rate this simulator?(best -5)", 1, 5)
-    st.text_area("Your comments...")
-    st.button("Submit Feedback")
\ No newline at end of file
+        st.write("We would eager to hear your thoughts on this simulator.")
+        st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+        st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+        st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
+        st.text_area("Your comments...", key=sections.page_key(__file__, "feedback_comments"), persist_state="session")
+        st.button("Submit Feedback")
\ No newline at end of file
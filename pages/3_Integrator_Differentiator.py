@@ -7,48 +7,17 @@ Created on Wed Jul  2 14:14:54 2025
 
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-from scipy.integrate import cumulative_trapezoid
-import pandas as pd
+from labsim.waveforms import generate_waveform
+from labsim import assets, cache, dataflow, filters, scope, sections
 
 st.set_page_config(layout="wide", page_title="Integrator/Differentiator Simulator")
 
 st.title("Integrator/Differentiator Simulator")
 
 # --- Create tabs for the app sections ---
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 # --- Core Simulation Logic (defined outside tabs for scope) ---
-def generate_waveform(amp, freq, wave_type_val, num_cycles=3):
-    if freq == 0:
-        sampling_rate = 10000
-    else:
-        sampling_rate = max(100 * freq, 1000)
-
-    total_duration = num_cycles / freq if freq != 0 else 0.01
-    
-    num_points = int(sampling_rate * total_duration)
-    if num_points < 2:
-        num_points = 2
-
-    t = np.linspace(0, total_duration, num_points, endpoint=False)
-
-    if freq == 0:
-        y = np.full_like(t, amp)
-    elif wave_type_val == 1:
-        y = amp * np.sin(2 * np.pi * freq * t)
-    elif wave_type_val == 2:
-        y = amp * np.cos(2 * np.pi * freq * t)
-    elif wave_type_val == 3:
-        y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5)
-    elif wave_type_val == 4:
-        y = amp * signal.square(2 * np.pi * freq * t)
-    else:
-        y = np.zeros_like(t)
-
-    return y, t, amp, total_duration, freq
-
 def get_amplifier_name(amp_type_value):
     if amp_type_value == 1:
         return "Integrator"
@@ -56,8 +25,21 @@ def get_amplifier_name(amp_type_value):
         return "Differentiator"
     return "N/A"
 
+@cache.memoize
 def simulate_circuit(amp_input, actual_frequency, selected_wave_type_int,
-                     selected_amplifier_type_int, R_in_kohm, C_f_uF):
+                     selected_amplifier_type_int, R_in_kohm, C_f_uF, Rf_kohm=None,
+                     Rs_kohm=None, Cf_uF=0.0):
+    """Input and output of the stage.
+
+    ``Rf_kohm`` puts a resistor across the integrator's feedback capacitor
+    (practical integrator): the stage becomes ``-(Rf/R) / (1 + s Rf C)``,
+    simulated exactly by ``filters.lag``.  ``Rs_kohm`` puts a resistor in
+    series with the differentiator's input capacitor, optionally with
+    ``Cf_uF`` across its feedback resistor (practical differentiator):
+    ``-s Rf C / ((1 + s Rs C) (1 + s Rf Cf))``, run as the IIR sections of
+    ``filters.differentiator_sos``.  In both, a periodic input is shown in
+    steady state and a DC input as the response from 0 V.
+    """
     y_input, t, amp_input_actual, total_duration, input_freq = generate_waveform(
         amp_input, actual_frequency, selected_wave_type_int
     )
@@ -75,12 +57,27 @@ def simulate_circuit(amp_input, actual_frequency, selected_wave_type_int,
 
     if selected_amplifier_type_int == 1:  # Integrator
         if R_in_ohms == 0 or C_f_farads == 0:
-            st.warning("Input R or Feedback C cannot be zero for Integrator. Output will be zero.")
+            cache.warning("Input R or Feedback C cannot be zero for Integrator. Output will be zero.")
             y_output = np.zeros_like(y_input)
             output_amplitude = 0
         else:
             dt = t[1] - t[0] if len(t) > 1 else 0
-            if dt > 0:
+            if dt > 0 and Rf_kohm is not None:
+                amplifier_name = "Practical Integrator"
+                tau = Rf_kohm * 1000 * C_f_farads
+                gain_factor = -Rf_kohm * 1000 / R_in_ohms
+                if input_freq == 0:
+                    y_output = filters.lag(y_input, dt, tau, gain_factor)
+                    phase_diff_deg = 0
+                else:
+                    y_output = filters.lag_periodic(y_input, dt, tau, gain_factor)
+                    if selected_wave_type_int == 1 or selected_wave_type_int == 2:
+                        phase_diff_deg = -np.degrees(np.arctan(2 * np.pi * actual_frequency * tau))
+                    else:
+                        phase_diff_deg = "N/A"
+            elif dt > 0:
+                from scipy.integrate import cumulative_trapezoid
+
                 y_integrated = cumulative_trapezoid(y_input, dx=dt, initial=0)
                 gain_factor = -1 / (R_in_ohms * C_f_farads)
                 y_output = gain_factor * y_integrated
@@ -97,18 +94,32 @@ def simulate_circuit(amp_input, actual_frequency, selected_wave_type_int,
 
     elif selected_amplifier_type_int == 2:  # Differentiator
         if C_f_farads == 0 or R_in_ohms == 0:
-            st.warning("Input C or Feedback R cannot be zero for Differentiator. Output will be zero.")
+            cache.warning("Input C or Feedback R cannot be zero for Differentiator. Output will be zero.")
             y_output = np.zeros_like(y_input)
             output_amplitude = 0
         else:
             dt = t[1] - t[0] if len(t) > 1 else 0
-            if dt > 0:
-                y_differentiated = np.diff(y_input) / dt
-                t_differentiated = (t[:-1] + t[1:]) / 2
-
+            if dt > 0 and Rs_kohm is not None:
+                amplifier_name = "Practical Differentiator"
+                tau = Rs_kohm * 1000 * C_f_farads
+                tau_f = R_in_ohms * Cf_uF * 1e-6
+                sos = filters.differentiator_sos(dt, tau, -R_in_ohms / (Rs_kohm * 1000), tau_f)
+                if input_freq == 0:
+                    y_output = filters.SOSFilter(sos).run(y_input)
+                    phase_diff_deg = 0
+                else:
+                    y_output = filters.filter_periodic(sos, y_input)
+                    if selected_wave_type_int == 1 or selected_wave_type_int == 2:
+                        w = 2 * np.pi * actual_frequency
+                        phase_diff_deg = 90 - np.degrees(np.arctan(w * tau) + np.arctan(w * tau_f))
+                    else:
+                        phase_diff_deg = "N/A"
+            elif dt > 0:
+                # Central differences inside, one-sided at the ends: the same
+                # samples as interpolating np.diff back from the midpoints.
                 gain_factor = -(R_in_ohms * C_f_farads)
-                y_output_temp = gain_factor * y_differentiated
-                y_output = np.interp(t, t_differentiated, y_output_temp)
+                y_output = np.gradient(y_input, dt)
+                y_output *= gain_factor
 
                 if input_freq > 0 and (selected_wave_type_int == 1 or selected_wave_type_int == 2):
                     phase_diff_deg = 90
@@ -251,97 +262,103 @@ mcq_questions1 = [
 
 # --- Prelab Tab ---
 with tab1:
-    st.header("Objective")
-    st.markdown("""
+    if tab1.open:
+        st.header("Objective")
+        st.markdown("""
    
     The objective of this lab is to **investigate the operation of fundamental Op-Amp Integrator and Differentiator circuits**. Students will analyze how these circuits mathematically transform different input **waveforms** (Sine, Square, Triangular) and **observe the effect of time constant ($RC$ product)** on the output amplitude and shape, including the resultant **phase shifts** and the practical limits of **output clipping**.
     """)
-    st.markdown("---")
+        st.markdown("---")
 
 
 with tab2:
-    st.header("Prelab: Review Questions")
+    if tab2.open:
+        st.header("Prelab: Review Questions")
   
-    st.markdown("---")
-    st.subheader("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.markdown("---")
+        st.subheader("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
           
    
 
 # --- Theory Tab ---
 with tab3:
-    st.header("Theory")
-    st.markdown("""
+    if tab3.open:
+        st.header("Theory")
+        st.markdown("""
         Here you will find the theoretical background for the two circuits you will be simulating.
     """)
 
-    st.subheader("Op-Amp Integrator")
-    st.markdown("""
+        st.subheader("Op-Amp Integrator")
+        st.markdown("""
         An op-amp integrator is an electronic circuit that performs the mathematical operation of integration on its input signal.
         It uses a resistor at the input and a capacitor in the feedback path. The output voltage is proportional to the time integral of the input voltage.
     """)
-    st.image("images/integrator.png", caption="Op-Amp Integrator Circuit Diagram", width='stretch') 
-   # [Image of an Op-Amp Integrator circuit diagram]
+        assets.show("images/integrator.png", caption="Op-Amp Integrator Circuit Diagram", width='stretch') 
+       # [Image of an Op-Amp Integrator circuit diagram]
 
-    st.markdown("""
+        st.markdown("""
         The output voltage ($V_{out}$) is given by the formula:
         $$ V_{out}(t) = -\\frac{1}{R_1 C_f} \\int V_{in}(t) dt $$
     """)
 
-    st.subheader("Op-Amp Differentiator")
-    st.markdown("""
+        st.subheader("Op-Amp Differentiator")
+        st.markdown("""
         An op-amp differentiator is an electronic circuit that performs the mathematical operation of differentiation on its input signal.
         It uses a capacitor at the input and a resistor in the feedback path. The output voltage is proportional to the rate of change of the input voltage.
     """)
-    st.image("images/differentiator.png", caption="Op-Amp Differentiator Circuit Diagram", width='stretch') 
+        assets.show("images/differentiator.png", caption="Op-Amp Differentiator Circuit Diagram", width='stretch') 
 
-#[Image of an Op-Amp Differentiator circuit diagram]
+    #[Image of an Op-Amp Differentiator circuit diagram]
 
-    st.markdown("""
+        st.markdown("""
         The output voltage ($V_{out}$) is given by the formula:
         $$ V_{out}(t) = -R_f C_1 \\frac{d V_{in}(t)}{dt} $$
     """)
 
 
 # --- Simulation Tab ---
-with tab4:
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     st.header("Simulation")
     
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -352,21 +369,23 @@ with tab4:
             "Select Waveform",
             ("Sine wave", "Cosine wave", "Triangular wave", "Square wave"),
             index=0,
-            key="wave_type_radio_sim"
+            key="wave_type_radio_sim",
+            persist_state="session"
         )
         wave_type_map = {"Sine wave": 1, "Cosine wave": 2, "Triangular wave": 3, "Square wave": 4}
         selected_wave_type_int = wave_type_map[wave_type]
 
-        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_sim")
+        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_sim", persist_state="session")
 
         st.subheader("Frequency")
-        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_sim")
+        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_sim", persist_state="session")
         current_freq_unit = st.radio(
             "Frequency Unit",
             ("Hz", "kHz", "MHz"),
             index=0,
             horizontal=True,
-            key="freq_unit_radio_sim"
+            key="freq_unit_radio_sim",
+            persist_state="session"
         )
 
         def get_actual_frequency(freq_val_local, unit_local):
@@ -385,7 +404,8 @@ with tab4:
             "Select Circuit Type",
             ("Integrator", "Differentiator"),
             index=0,
-            key="amp_type_radio_sim"
+            key="amp_type_radio_sim",
+            persist_state="session"
         )
         amplifier_type_map = {"Integrator": 1, "Differentiator": 2}
         selected_amplifier_type_int = amplifier_type_map[amplifier_type]
@@ -398,7 +418,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.2f",
-            key="R_input_sim"
+            key="R_input_sim",
+            persist_state="session"
         )
         C_f_uF = st.number_input(
             "Capacitance (C) (µF)",
@@ -406,8 +427,61 @@ with tab4:
             value=0.1,
             step=0.01,
             format="%.3f",
-            key="C_input_sim"
+            key="C_input_sim",
+            persist_state="session"
         )
+        Rf_kohm = Rs_kohm = None
+        Cf_uF = 0.0
+        if amplifier_type == "Integrator":
+            practical = st.checkbox(
+                "Practical integrator (Rf in parallel with C)",
+                value=False,
+                key="practical_checkbox_sim",
+                persist_state="session"
+            )
+            if practical:
+                Rf_kohm = st.number_input(
+                    "Parallel Resistance (Rf) (kΩ)",
+                    min_value=0.01,
+                    value=100.0,
+                    step=1.0,
+                    format="%.2f",
+                    key="Rf_input_sim",
+                    persist_state="session"
+                )
+                st.caption(f"DC gain -Rf/R = {-Rf_kohm / R_in_kohm:.3g}, corner frequency "
+                           f"1/(2π·Rf·C) = {1 / (2 * np.pi * Rf_kohm * 1e3 * C_f_uF * 1e-6):.3g} Hz")
+        else:
+            practical = st.checkbox(
+                "Practical differentiator (Rs in series with C, optional Cf across R)",
+                value=False,
+                key="practical_diff_checkbox_sim",
+                persist_state="session"
+            )
+            if practical:
+                Rs_kohm = st.number_input(
+                    "Series Resistance (Rs) (kΩ)",
+                    min_value=0.01,
+                    value=1.0,
+                    step=0.1,
+                    format="%.2f",
+                    key="Rs_input_sim",
+                    persist_state="session"
+                )
+                Cf_uF = st.number_input(
+                    "Feedback Capacitance (Cf) (µF, 0 = none)",
+                    min_value=0.0,
+                    value=0.0,
+                    step=0.001,
+                    format="%.4f",
+                    key="Cf_input_sim",
+                    persist_state="session"
+                )
+                caption = (f"High-frequency gain -R/Rs = {-R_in_kohm / Rs_kohm:.3g}, differentiates below "
+                           f"1/(2π·Rs·C) = {1 / (2 * np.pi * Rs_kohm * 1e3 * C_f_uF * 1e-6):.3g} Hz")
+                if Cf_uF > 0:
+                    caption += f", rolls off above 1/(2π·R·Cf) = {1 / (2 * np.pi * R_in_kohm * 1e3 * Cf_uF * 1e-6):.3g} Hz"
+                st.caption(caption)
 
     with col3:
        
@@ -417,9 +491,9 @@ with tab4:
       
         
         if amplifier_type == "Integrator":
-            st.image("images/integrator.png", caption="Integrating Amplifier Circuit", width='stretch')
+            assets.show("images/integrator.png", caption="Integrating Amplifier Circuit", width='stretch')
         elif amplifier_type == "Differentiator":
-            st.image("images/differentiator.png", caption="Differentiator Circuit", width='stretch')
+            assets.show("images/differentiator.png", caption="Differentiator Circuit", width='stretch')
        
         
         
@@ -427,7 +501,7 @@ with tab4:
         
         st.markdown("---")
     st.header("CRO Waveforms")
-    st.text_input("Your Name",key="p2")   
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")   
         # ------------------------------------------------------------------
         # --- PLOTS IN FULL-WIDTH ROW ---
         # ------------------------------------------------------------------
@@ -440,68 +514,74 @@ with tab4:
     plot_height = 6
 
     y_input, y_output, t, amp_input, total_duration, input_freq, \
-    output_amplitude, phase_diff_deg, amplifier_name, output_amp_display_text = simulate_circuit(
+    output_amplitude, phase_diff_deg, amplifier_name, output_amp_display_text = flow.call("circuit", simulate_circuit,
         amplitude, actual_frequency, selected_wave_type_int,
-            selected_amplifier_type_int, R_in_kohm, C_f_uF
+            selected_amplifier_type_int, R_in_kohm, C_f_uF, Rf_kohm, Rs_kohm, Cf_uF
         )
+    fig_key = simulate_circuit.cache_key(
+        amplitude, actual_frequency, selected_wave_type_int,
+        selected_amplifier_type_int, R_in_kohm, C_f_uF, Rf_kohm, Rs_kohm, Cf_uF
+    )
         
        
-    fig1, ax1 = plt.subplots(figsize=(plot_width, plot_height)) 
-    ax1.plot(t, y_input, color='lime')
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
-    ax1.set_ylim(-amp_input * 1.5 if amp_input != 0 else -1, amp_input * 1.5 if amp_input != 0 else 1)
-    ax1.set_xlim(0, total_duration)
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
-    ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
-    ax1.set_xlabel("Time (sec)")
-    ax1.set_ylabel("Voltage (V)")
-    ax1.text(0.02, 0.95, f'Amp: {amp_input:.2f} V', transform=ax1.transAxes,
-                     fontsize=8, color='white', verticalalignment='top')
+    plot_ylim = max(output_amplitude * 1.2, 1.0)
+    max_combined_amp = max(amp_input * 1.5, plot_ylim)
+
+
+    def setup_input(ax1):
+        scope.trace(ax1, color='lime')
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
+        ax1.set_ylim(-amp_input * 1.5 if amp_input != 0 else -1, amp_input * 1.5 if amp_input != 0 else 1)
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
+        ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
+        ax1.set_xlabel("Time (sec)")
+        ax1.set_ylabel("Voltage (V)")
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col1: # Display fig1 in the first plot column
-              st.pyplot(fig1)
-    plt.close(fig1)
+              scope.show(setup_input, fig_key, [(t, y_input)],
+                         [f'Amp: {amp_input:.2f} V'], figsize=(plot_width, plot_height), flow=flow)
 
         #with plot_row_col2:
-    fig2, ax2 = plt.subplots(figsize=(plot_width, plot_height)) 
-    ax2.plot(t, y_output, color='cyan')
-    ax2.set_facecolor("black")
-    ax2.axhline(0, color='gray', linewidth=0.5)
-    ax2.axvline(0, color='gray', linewidth=0.5)
-    plot_ylim = max(output_amplitude * 1.2, 1.0)
-    ax2.set_ylim(-plot_ylim, plot_ylim)
-    ax2.set_xlim(0, total_duration)
-    ax2.tick_params(axis='x', colors='black')
-    ax2.tick_params(axis='y', colors='black')
-    ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
-    ax2.set_xlabel("Time (sec)")
-    ax2.set_ylabel("Voltage (V)")
-    ax2.text(0.02, 0.95, output_amp_display_text, transform=ax2.transAxes,
-                     fontsize=8, color='white', verticalalignment='top')
+    def setup_output(ax2):
+        scope.trace(ax2, color='cyan')
+        ax2.set_facecolor("black")
+        ax2.axhline(0, color='gray', linewidth=0.5)
+        ax2.axvline(0, color='gray', linewidth=0.5)
+        ax2.set_ylim(-plot_ylim, plot_ylim)
+        ax2.set_xlim(0, total_duration)
+        ax2.tick_params(axis='x', colors='black')
+        ax2.tick_params(axis='y', colors='black')
+        ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
+        ax2.set_xlabel("Time (sec)")
+        ax2.set_ylabel("Voltage (V)")
+        scope.readout(ax2, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col2: # Display fig2 in the second plot column
-            st.pyplot(fig2)
-    plt.close(fig2)
-
-    fig_combined, ax_combined = plt.subplots(figsize=(plot_width, plot_height)) 
-    ax_combined.plot(t, y_input, color='lime', label='Input (Ch 1)')
-    ax_combined.plot(t, y_output, color='cyan', label='Output (Ch 2)')
-    ax_combined.set_facecolor("black")
-    ax_combined.axhline(0, color='gray', linewidth=0.5)
-    ax_combined.axvline(0, color='gray', linewidth=0.5)
-    max_combined_amp = max(amp_input * 1.5, plot_ylim)
-    ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
-    ax_combined.set_xlim(0, total_duration)
-    ax_combined.tick_params(axis='x', colors='black')
-    ax_combined.tick_params(axis='y', colors='black')
-    ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
-    ax_combined.set_xlabel("Time (sec)")
-    ax_combined.set_ylabel("Voltage (V)")
-    ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
+            scope.show(setup_output, fig_key, [(t, y_output)],
+                       [output_amp_display_text], figsize=(plot_width, plot_height), flow=flow)
+
+    def setup_combined(ax_combined):
+        scope.trace(ax_combined, color='lime', label='Input (Ch 1)')
+        scope.trace(ax_combined, color='cyan', label='Output (Ch 2)')
+        ax_combined.set_facecolor("black")
+        ax_combined.axhline(0, color='gray', linewidth=0.5)
+        ax_combined.axvline(0, color='gray', linewidth=0.5)
+        ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
+        ax_combined.set_xlim(0, total_duration)
+        ax_combined.tick_params(axis='x', colors='black')
+        ax_combined.tick_params(axis='y', colors='black')
+        ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
+        ax_combined.set_xlabel("Time (sec)")
+        ax_combined.set_ylabel("Voltage (V)")
+        ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
     with plot_col3: # Display fig_combined in the third plot column
-            st.pyplot(fig_combined)
-    plt.close(fig_combined)
+            scope.show(setup_combined, fig_key, [(t, y_input), (t, y_output)],
+                       [], figsize=(plot_width, plot_height), flow=flow)
 
     st.header("Simulation Results")
     
@@ -514,6 +594,8 @@ with tab4:
             "Integrator/Differentiator": amplifier_name,
             "R (kΩ)": f"{R_in_kohm:.1f}",
             "C (µF)": f"{C_f_uF:.3f}",
+            "Rf (kΩ)": f"{Rf_kohm:.1f}" if Rf_kohm is not None else "-",
+            "Rs (kΩ)": f"{Rs_kohm:.2f}" if Rs_kohm is not None else "-",
             "Input Amp (V)": f"{amp_input:.2f}",
             "Input Freq (kHz)": f"{input_freq:.2f}",
             "Output Amp (V)": f"{output_amplitude:.2f}",
@@ -523,68 +605,77 @@ with tab4:
         st.session_state.simulation_history.append(new_entry)
     
     if st.session_state.simulation_history:
-        df_history = pd.DataFrame(st.session_state.simulation_history)
+        import pandas as pd
+        history = st.session_state.simulation_history
+        df_history = flow.node("results table", (history, len(history)), lambda: pd.DataFrame(history))
         st.dataframe(df_history, width='stretch')
     
     if st.button("Clear Table History", key="clear_table_button_sim"):
         st.session_state.simulation_history = []
         st.rerun()
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 
 # --- Postlab Tab ---
 with tab5:
-    st.header("Postlab: Analysis and Conclusion")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab: Analysis and Conclusion")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
     
  
 
 # --- Feedback Tab ---
 with tab6:
-    st.header("Feedback")
-    st.write("We would eager to hear your thoughts on this simulator.")
-    st.text_input("Your Name")
-    st.text_input("Registration number/Faculty ID")
-    st.slider("How would you rate this simulator?(best -5)", 1, 5)
-    st.markdown("""
+    if tab6.open:
+        st.header("Feedback")
+        st.write("We would eager to hear your thoughts on this simulator.")
+        st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+        st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+        st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
+        st.markdown("""
         We appreciate your feedback! Please let us know if you found this simulator useful and how we can improve it.
     """)
-    st.text_area("Your Feedback", height=200, key="feedback_text")
-    if st.button("Submit Feedback"):
-        st.success("Thank you for your feedback!")
+        st.text_area("Your Feedback", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+        if st.button("Submit Feedback"):
+            st.success("Thank you for your feedback!")
@@ -8,14 +8,13 @@ Created on Thu Jul  3 01:18:52 2025
 # pages/3_Precision_Rectifier.py
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
+from labsim.waveforms import generate_waveform
+from labsim import assets, cache, dataflow, rectifiers, scope, sections
 
 st.set_page_config(layout="wide", page_title="Precision Rectifier")
 
 # Create tabs for different sections of the page.
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 import streamlit as st
 
@@ -61,8 +60,9 @@ mcq_questions1 = [
 
 # --- Tab 1: Prelab ---
 with tab1:
-     st.header("Objective")
-     st.markdown("""
+    if tab1.open:
+         st.header("Objective")
+         st.markdown("""
    
      The objective of this lab is to understand the operation of precision half-wave and full-wave rectifiers using operational amplifiers (op-amps). We will explore how op-amps overcome the forward voltage drop of diodes, allowing for rectification of very low-amplitude signals.
 
@@ -70,121 +70,123 @@ with tab1:
      """)
 
 with tab2:
-    st.header("Prelab: Precision Rectifier")
+    if tab2.open:
+        st.header("Prelab: Precision Rectifier")
    
    
 
-    # --- Add the MCQ section here ---
-    st.markdown("---")
-    st.subheader("Quick Check: Test Your Knowledge")
-
-    # Define the list of questions, options, and correct answers
-    mcq_questions = [
-        {
-            "question": "What is the primary function of a precision rectifier?",
-            "options": [
-                " To rectify low-amplitude AC signals by using an op-amp to overcome the diode's forward voltage drop.",
-                " To amplify low-frequency signals without distortion.",
-                " To convert a DC signal into a rectified AC signal.",
-                " To provide a stable voltage reference for a circuit."
-            ],
-            "correct_option_index": 0,
-            "explanation":  "A. To rectify low-amplitude AC signals by using an op-amp to overcome the diode's forward voltage drop."
-        },
-        {
-            "question": " In a precision half-wave rectifier, the op-amp essentially places the diode inside the feedback loop. What is the benefit of this arrangement?",
+        # --- Add the MCQ section here ---
+        st.markdown("---")
+        st.subheader("Quick Check: Test Your Knowledge")
+
+        # Define the list of questions, options, and correct answers
+        mcq_questions = [
+            {
+                "question": "What is the primary function of a precision rectifier?",
+                "options": [
+                    " To rectify low-amplitude AC signals by using an op-amp to overcome the diode's forward voltage drop.",
+                    " To amplify low-frequency signals without distortion.",
+                    " To convert a DC signal into a rectified AC signal.",
+                    " To provide a stable voltage reference for a circuit."
+                ],
+                "correct_option_index": 0,
+                "explanation":  "A. To rectify low-amplitude AC signals by using an op-amp to overcome the diode's forward voltage drop."
+            },
+            {
+                "question": " In a precision half-wave rectifier, the op-amp essentially places the diode inside the feedback loop. What is the benefit of this arrangement?",
+                "options": [
+                    " It increases the output impedance of the circuit.",
+                    " It makes the circuit insensitive to temperature changes.",
+                    " The op-amp's gain effectively eliminates the diode's forward voltage drop from the output signal.",
+                    " It provides a constant current source to the diode."
+                ],
+                "correct_option_index": 2,
+                "explanation":  "The op-amp's gain effectively eliminates the diode's forward voltage drop from the output signal."
+            },
+            {
+                "question": " Which of the following components is NOT typically found in a basic precision half-wave rectifier circuit?",
+                "options": [
+                    " Op-amp",
+                    " Diode",
+                    " Resistors",
+                    " Inductor"
+                ],
+                "correct_option_index": 3,
+                "explanation":  "Inductor"
+            },
+            {
+                "question": "For a precision full-wave rectifier, how does the circuit handle the negative half of the input sinusoidal signal?",
+                "options": [
+                    " It simply blocks the negative half-cycle.",
+                    " It inverts the negative half-cycle and adds it to the positive half-cycle.",
+                    " It converts the negative half-cycle to a DC voltage.",
+                    " It rectifies it into a negative half-wave output."
+                ],
+                "correct_option_index": 0,
+                "explanation":  "It inverts the negative half-cycle and adds it to the positive half-cycle."
+            },
+            {
+            "question": "An ideal op-amp used in a precision rectifier has what effect on the rectification threshold (the voltage required to 'turn on' the rectification)?",
             "options": [
-                " It increases the output impedance of the circuit.",
-                " It makes the circuit insensitive to temperature changes.",
-                " The op-amp's gain effectively eliminates the diode's forward voltage drop from the output signal.",
-                " It provides a constant current source to the diode."
+                " It raises the threshold to the op-amp's supply voltage.",
+                " It lowers the threshold to the diode's forward voltage ($V_D$).",
+                " It makes the threshold practically zero volts.",
+                " It doubles the threshold voltage."
             ],
             "correct_option_index": 2,
-            "explanation":  "The op-amp's gain effectively eliminates the diode's forward voltage drop from the output signal."
-        },
-        {
-            "question": " Which of the following components is NOT typically found in a basic precision half-wave rectifier circuit?",
-            "options": [
-                " Op-amp",
-                " Diode",
-                " Resistors",
-                " Inductor"
-            ],
-            "correct_option_index": 3,
-            "explanation":  "Inductor"
-        },
-        {
-            "question": "For a precision full-wave rectifier, how does the circuit handle the negative half of the input sinusoidal signal?",
-            "options": [
-                " It simply blocks the negative half-cycle.",
-                " It inverts the negative half-cycle and adds it to the positive half-cycle.",
-                " It converts the negative half-cycle to a DC voltage.",
-                " It rectifies it into a negative half-wave output."
-            ],
-            "correct_option_index": 0,
-            "explanation":  "It inverts the negative half-cycle and adds it to the positive half-cycle."
-        },
-        {
-        "question": "An ideal op-amp used in a precision rectifier has what effect on the rectification threshold (the voltage required to 'turn on' the rectification)?",
-        "options": [
-            " It raises the threshold to the op-amp's supply voltage.",
-            " It lowers the threshold to the diode's forward voltage ($V_D$).",
-            " It makes the threshold practically zero volts.",
-            " It doubles the threshold voltage."
-        ],
-        "correct_option_index": 2,
-        "explanation":  "It makes the threshold practically zero volts."
-    }
+            "explanation":  "It makes the threshold practically zero volts."
+        }
 
-    ]
+        ]
 
    
-    st.markdown("---")
-    st.subheader("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.markdown("---")
+        st.subheader("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
           
         
 # --- Tab 2: Theory ---
 with tab3:
-    st.header("Theory: The Precision Rectifier")
-    st.markdown("""
+    if tab3.open:
+        st.header("Theory: The Precision Rectifier")
+        st.markdown("""
     A **precision rectifier**, also known as a superdiode, is an electronic circuit that functions as a rectifier for very small input voltages. Unlike a conventional diode rectifier, which has a forward voltage drop of approximately 0.7V for silicon diodes, a precision rectifier uses an operational amplifier (op-amp) to effectively eliminate this voltage drop.
 
     ### Precision Half-Wave Rectifier
@@ -207,7 +209,10 @@ with tab3:
     """)
 
 # --- Tab 3: Simulation ---
-with tab4:
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     st.header("Precision Rectifier Simulator")
 
     # --- Layout with Columns ---
@@ -219,21 +224,23 @@ with tab4:
             "Select Waveform",
             ("Sine wave", "Cosine wave", "Triangular wave", "Square wave"),
             index=0,
-            key="wave_type_radio_rectifier"
+            key="wave_type_radio_rectifier",
+            persist_state="session"
         )
         wave_type_map = {"Sine wave": 1, "Cosine wave": 2, "Triangular wave": 3, "Square wave": 4}
         selected_wave_type_int = wave_type_map[wave_type]
 
-        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_rectifier")
+        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_rectifier", persist_state="session")
 
         st.subheader("Frequency")
-        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_rectifier")
+        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_rectifier", persist_state="session")
         current_freq_unit = st.radio(
             "Frequency Unit",
             ("Hz", "kHz", "MHz"),
             index=0,
             horizontal=True,
-            key="freq_unit_radio_rectifier"
+            key="freq_unit_radio_rectifier",
+            persist_state="session"
         )
 
         def get_actual_frequency(freq_val_local, unit_local):
@@ -252,46 +259,49 @@ with tab4:
             "Select Rectifier Type",
             ("Precision Half Wave Rectifier", "Precision Full Wave Rectifier"),
             index=0,
-            key="rectifier_type_radio"
+            key="rectifier_type_radio",
+            persist_state="session"
         )
         rectifier_type_map = {"Precision Half Wave Rectifier": 1, "Precision Full Wave Rectifier": 2}
         selected_rectifier_type_int = rectifier_type_map[rectifier_type]
 
+        circuit_model = st.radio(
+            "Circuit Model",
+            ("Ideal", "Real diodes and op-amp", "Compare with passive diode rectifier"),
+            index=0,
+            key="circuit_model_radio_rectifier",
+            persist_state="session"
+        )
+        circuit_model_map = {"Ideal": 1, "Real diodes and op-amp": 2, "Compare with passive diode rectifier": 3}
+        selected_model_int = circuit_model_map[circuit_model]
+        if selected_model_int != 1:
+            st.caption(f"1N4148 diodes (Shockley model), op-amp open-loop gain {rectifiers.OPEN_LOOP_GAIN:.0e}, "
+                       f"{rectifiers.LOAD / 1e3:.0f} kΩ resistors.")
+
+        # Optional smoothing capacitor across the load resistor.
+        smoothing = st.checkbox(
+            "Smoothing capacitor across the load",
+            value=False,
+            key="smoothing_checkbox_rectifier",
+            persist_state="session"
+        )
+        smoothing_C_uF = 0.0
+        if smoothing:
+            smoothing_C_uF = st.number_input(
+                "Capacitance (C) (µF)",
+                min_value=0.001,
+                value=10.0,
+                step=1.0,
+                format="%.3f",
+                key="smoothing_C_input_rectifier",
+                persist_state="session"
+            )
+            st.caption(f"Discharges through $R_L$ = {rectifiers.LOAD / 1e3:.0f} kΩ: "
+                       f"τ = $R_L C$ = {rectifiers.LOAD * smoothing_C_uF * 1e-3:.3g} ms.")
+
        
 
     # --- Core Simulation Logic ---
-    def generate_waveform(amp, freq, wave_type_val, num_cycles=3):
-        if freq == 0:
-            sampling_rate = 10000
-        else:
-            sampling_rate = max(100 * freq, 1000)
-
-        total_duration = num_cycles / freq if freq != 0 else 0.01
-
-        num_points = int(sampling_rate * total_duration)
-        if num_points < 2:
-            num_points = 2
-
-        t = np.linspace(0, total_duration, num_points, endpoint=False)
-
-        if freq == 0:
-            y = np.full_like(t, amp)
-        elif wave_type_val == 1:
-            y = amp * np.sin(2 * np.pi * freq * t)
-        elif wave_type_val == 2:
-            y = amp * np.cos(2 * np.pi * freq * t)
-        elif wave_type_val == 3:
-            y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5)
-        elif wave_type_val == 4:
-            y = amp * signal.square(2 * np.pi * freq * t)
-        else:
-            y = np.zeros_like(t)
-            
-            
-        
-
-        return y, t, amp, total_duration, freq
-
     def get_rectifier_name(rectifier_type_value):
         if rectifier_type_value == 1:
             return "Half Wave Rectifier"
@@ -299,7 +309,18 @@ with tab4:
             return "Full Wave Rectifier"
         return "N/A"
 
-    def simulate_rectifier_circuit(amp_input, actual_frequency, selected_wave_type_int, selected_rectifier_type_int):
+    @cache.memoize
+    def simulate_rectifier_circuit(amp_input, actual_frequency, selected_wave_type_int, selected_rectifier_type_int,
+                                   selected_model_int=1, smoothing_C_uF=0.0):
+        """
+        Rectifier output for the selected circuit model: 1 ideal, 2 Shockley
+        diodes with a finite-gain op-amp, 3 the same plus the passive diode
+        rectifier (``y_passive``, None otherwise).
+
+        With ``smoothing_C_uF`` the outputs are the steady-state voltage on
+        that capacitor across the load.  ``meter`` reads the output like a
+        multimeter (DC, true RMS, ripple, form factor).
+        """
         y_input, t, amp_input_actual, total_duration, input_freq = generate_waveform(
             amp_input, actual_frequency, selected_wave_type_int
         )
@@ -313,15 +334,31 @@ with tab4:
         output_time_ms = input_time_ms
         rectifier_name = get_rectifier_name(selected_rectifier_type_int)
 
+        y_passive = None
         if selected_rectifier_type_int == 1:
-            y_output[y_output < 0] = 0
+            if selected_model_int == 1:
+                y_output[y_output < 0] = 0
+            else:
+                y_output = rectifiers.superdiode(y_input)
         elif selected_rectifier_type_int == 2:
-            y_output = np.abs(y_output)
+            if selected_model_int == 1:
+                y_output = np.abs(y_output)
+            else:
+                y_output = rectifiers.precision_full_wave(y_input)
             output_freq = 2 * input_freq
             output_time_ms = (1 / output_freq) * 1000 if output_freq != 0 else 0
+        if selected_model_int == 3:
+            y_passive = rectifiers.passive(y_input, full_wave=selected_rectifier_type_int == 2)
+        if smoothing_C_uF > 0:
+            tau = rectifiers.LOAD * smoothing_C_uF * 1e-6
+            dt = t[1] - t[0]
+            y_output = rectifiers.smoothed_periodic(y_output, dt, tau)
+            if y_passive is not None:
+                y_passive = rectifiers.smoothed_periodic(y_passive, dt, tau)
 
         clipping_limit = 15.0
         y_output = np.clip(y_output, -clipping_limit, clipping_limit)
+        meter = rectifiers.Meter().feed(y_output)
 
         if np.all(y_output == 0):
             output_amplitude = 0
@@ -338,79 +375,122 @@ with tab4:
         output_freq=output_freq/1000
         
         return y_input, y_output, t, amp_input_actual, total_duration, input_freq, input_time_ms, \
-               output_amplitude, output_freq, output_time_ms, phase_diff_deg, rectifier_name, amplitude_display_text
+               output_amplitude, output_freq, output_time_ms, phase_diff_deg, rectifier_name, amplitude_display_text, y_passive, \
+               meter
 
     with col3:
         st.header(" Circuit Diagram")
         if rectifier_type == "Precision Half Wave Rectifier":
-            st.image("images/precisionhalfwaverectifier.png", caption="Half Wave Rectifier Circuit", width='stretch')
+            assets.show("images/precisionhalfwaverectifier.png", caption="Half Wave Rectifier Circuit", width='stretch')
         elif rectifier_type == "Precision Full Wave Rectifier":
-            st.image("images/precisionfullwaverectifier.png", caption="Full Wave Rectifier Circuit", width='stretch')
+            assets.show("images/precisionfullwaverectifier.png", caption="Full Wave Rectifier Circuit", width='stretch')
         
         
        
         
     st.header("CRO Displays")
-    st.text_input("Your Name",key="p2")
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
  # Create three columns *outside* the col1/col2/col3 definition to span the full width
     plot_col1, plot_col2, plot_col3 = st.columns(3) 
     y_input, y_output, t, amp_input, total_duration, input_freq, input_time_ms, \
-        output_amplitude, output_freq, output_time_ms, phase_diff_deg, rectifier_name, output_amp_display_text = simulate_rectifier_circuit(
-            amplitude, actual_frequency, selected_wave_type_int, selected_rectifier_type_int
+        output_amplitude, output_freq, output_time_ms, phase_diff_deg, rectifier_name, output_amp_display_text, \
+        y_passive, meter = flow.call("circuit", simulate_rectifier_circuit,
+            amplitude, actual_frequency, selected_wave_type_int, selected_rectifier_type_int, selected_model_int,
+            smoothing_C_uF
         )
+    fig_key = simulate_rectifier_circuit.cache_key(
+        amplitude, actual_frequency, selected_wave_type_int, selected_rectifier_type_int, selected_model_int,
+        smoothing_C_uF
+    )
+    compare_passive = y_passive is not None
 
-    fig1, ax1 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax1.plot(t, y_input, color='lime')
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
-    ax1.set_ylim(-amp_input * 1.5 if amp_input != 0 else -1, amp_input * 1.5 if amp_input != 0 else 1)
-    ax1.set_xlim(0, total_duration)
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
-    ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
-    ax1.set_xlabel("Time (sec)")
-    ax1.set_ylabel("Voltage (V)")
-    ax1.text(0.02, 0.95, f'Amp: {amp_input:.2f} V', transform=ax1.transAxes,
-                     fontsize=8, color='white', verticalalignment='top')
-    with plot_col1: # Display fig1 in the first plot column    
-            st.pyplot(fig1)
-
-    fig2, ax2 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax2.plot(t, y_output, color='cyan')
-    ax2.set_facecolor("black")
-    ax2.axhline(0, color='gray', linewidth=0.5)
-    ax2.axvline(0, color='gray', linewidth=0.5)
     plot_ylim = max(output_amplitude * 1.2, 1.0)
-    ax2.set_ylim(-plot_ylim, plot_ylim)
-    ax2.set_xlim(0, total_duration)
-    ax2.tick_params(axis='x', colors='black')
-    ax2.tick_params(axis='y', colors='black')
-    ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
-    ax2.set_xlabel("Time (sec)")
-    ax2.set_ylabel("Voltage (V)")
-    ax2.text(0.02, 0.95, output_amp_display_text, transform=ax2.transAxes,
-                     fontsize=8, color='white', verticalalignment='top')
-    with plot_col2: # Display fig2 in the second plot column     
-         st.pyplot(fig2)
-
-    fig_combined, ax_combined = plt.subplots(figsize=(3, 2), dpi=100)
-    ax_combined.plot(t, y_input, color='lime', label='Input (Ch 1)')
-    ax_combined.plot(t, y_output, color='cyan', label='Output (Ch 2)')
-    ax_combined.set_facecolor("black")
-    ax_combined.axhline(0, color='gray', linewidth=0.5)
-    ax_combined.axvline(0, color='gray', linewidth=0.5)
     max_combined_amp = max(amp_input * 1.5, plot_ylim)
-    ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
-    ax_combined.set_xlim(0, total_duration)
-    ax_combined.tick_params(axis='x', colors='black')
-    ax_combined.tick_params(axis='y', colors='black')
-    ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
-    ax_combined.set_xlabel("Time (sec)")
-    ax_combined.set_ylabel("Voltage (V)")
-    ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
+
+
+    def setup_input(ax1):
+        scope.trace(ax1, color='lime')
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
+        ax1.set_ylim(-amp_input * 1.5 if amp_input != 0 else -1, amp_input * 1.5 if amp_input != 0 else 1)
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
+        ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
+        ax1.set_xlabel("Time (sec)")
+        ax1.set_ylabel("Voltage (V)")
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+    with plot_col1: # Display fig1 in the first plot column    
+            scope.show(setup_input, fig_key, [(t, y_input)],
+                       [f'Amp: {amp_input:.2f} V'], figsize=(3, 2), dpi=100, flow=flow)
+
+    def setup_output(ax2):
+        scope.trace(ax2, color='cyan')
+        ax2.set_facecolor("black")
+        ax2.axhline(0, color='gray', linewidth=0.5)
+        ax2.axvline(0, color='gray', linewidth=0.5)
+        ax2.set_ylim(-plot_ylim, plot_ylim)
+        ax2.set_xlim(0, total_duration)
+        ax2.tick_params(axis='x', colors='black')
+        ax2.tick_params(axis='y', colors='black')
+        ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
+        ax2.set_xlabel("Time (sec)")
+        ax2.set_ylabel("Voltage (V)")
+        scope.readout(ax2, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+    with plot_col2: # Display fig2 in the second plot column     
+         scope.show(setup_output, fig_key, [(t, y_output)],
+                    [output_amp_display_text], figsize=(3, 2), dpi=100, flow=flow)
+
+    def setup_combined(ax_combined):
+        scope.trace(ax_combined, color='lime', label='Input (Ch 1)')
+        scope.trace(ax_combined, color='cyan', label='Output (Ch 2)')
+        if compare_passive:
+            scope.trace(ax_combined, color='orange', label='Passive diode')
+        ax_combined.set_facecolor("black")
+        ax_combined.axhline(0, color='gray', linewidth=0.5)
+        ax_combined.axvline(0, color='gray', linewidth=0.5)
+        ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
+        ax_combined.set_xlim(0, total_duration)
+        ax_combined.tick_params(axis='x', colors='black')
+        ax_combined.tick_params(axis='y', colors='black')
+        ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
+        ax_combined.set_xlabel("Time (sec)")
+        ax_combined.set_ylabel("Voltage (V)")
+        ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
     with plot_col3: # Display combined_fig in the third plot column     
-         st.pyplot(fig_combined)
+         combined_traces = [(t, y_input), (t, y_output)]
+         if compare_passive:
+             combined_traces.append((t, y_passive))
+         scope.show(setup_combined, fig_key, combined_traces,
+                    [], figsize=(3, 2), dpi=100, flow=flow)
+
+    # How far the rectified peak falls short of the input peak.
+    if selected_model_int != 1 and amp_input > 0:
+        input_peak = np.max(np.abs(y_input))
+        message = (f"Precision rectifier: output peak {output_amplitude:.4f} V, "
+                   f"{(input_peak - output_amplitude) * 1e6:.1f} µV below the input peak.")
+        if compare_passive:
+            passive_peak = np.max(y_passive)
+            message += (f" Passive diode rectifier: output peak {passive_peak:.4f} V, "
+                        f"{(input_peak - passive_peak) * 1e3:.0f} mV below it"
+                        + (" (the diode never really conducts)." if passive_peak < 0.1 * input_peak else "."))
+        st.caption(message)
+
+    # --- Multimeter readings of the output (Ch 2) ---
+    def format_form_factor(value):
+        return f"{value:.3f}" if np.isfinite(value) else "n/a"
+
+    meter_col1, meter_col2, meter_col3, meter_col4 = st.columns(4)
+    meter_col1.metric("DC (Average)", f"{meter.dc:.4f} V")
+    meter_col2.metric("True RMS", f"{meter.rms:.4f} V")
+    meter_col3.metric("Ripple (p-p)", f"{meter.ripple:.4f} V")
+    meter_col4.metric("Form Factor", format_form_factor(meter.form_factor))
+    if meter.dc > 0:
+        st.caption(f"Ripple RMS {meter.ac_rms * 1e3:.2f} mV, ripple factor {meter.ac_rms / meter.dc * 100:.2f} % "
+                   f"of the DC level.")
 
     st.header("Simulation Results")
     if 'simulation_history_rectifier' not in st.session_state:
@@ -426,70 +506,85 @@ with tab4:
             "Output Amp (V)": f"{output_amplitude:.2f}",
             "Output Freq (KHz)": f"{output_freq:.1f}",
             "Output Time period (ms)": f"{output_time_ms:.4f}",
-            "Phase Diff (deg)": f"{phase_diff_deg:.1f}"
+            "Phase Diff (deg)": f"{phase_diff_deg:.1f}",
+            "Model": circuit_model,
+            "C (µF)": f"{smoothing_C_uF:.3f}" if smoothing_C_uF > 0 else "-",
+            "DC (V)": f"{meter.dc:.4f}",
+            "RMS (V)": f"{meter.rms:.4f}",
+            "Ripple p-p (V)": f"{meter.ripple:.4f}",
+            "Form Factor": format_form_factor(meter.form_factor)
         }
         st.session_state.simulation_history_rectifier.append(new_entry)
 
     if st.session_state.simulation_history_rectifier:
-        df_history = pd.DataFrame(st.session_state.simulation_history_rectifier)
+        import pandas as pd
+        history = st.session_state.simulation_history_rectifier
+        df_history = flow.node("results table", (history, len(history)), lambda: pd.DataFrame(history))
         st.dataframe(df_history, width='stretch')
 
     if st.button("Clear Table History", key="clear_table_button_rectifier"):
         st.session_state.simulation_history_rectifier = []
         st.rerun()
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 # --- Tab 4: Postlab ---
 # --- Tab 4: Postlab ---
 with tab5:
-    st.header("Postlab: Analysis and Conclusion")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab: Analysis and Conclusion")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
 # --- Tab 5: Feedback ---
 with tab6:
-    st.header("Feedback")
-    st.write("We would eager to hear your thoughts on this simulator.")
-    st.text_input("Your Name")
-    st.text_input("Registration number/Faculty ID")
-    st.slider("How would you rate this simulator?(best -5)", 1, 5)
-    st.markdown("""
+    if tab6.open:
+        st.header("Feedback")
+        st.write("We would eager to hear your thoughts on this simulator.")
+        st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+        st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+        st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
+        st.markdown("""
         We appreciate your feedback! Please let us know if you found this simulator useful and how we can improve it.
     """)
-    st.text_area("Your Feedback", height=200, key="feedback_text")
-    if st.button("Submit Feedback"):
-        st.success("Thank you for your feedback!")
\ No newline at end of file
+        st.text_area("Your Feedback", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+        if st.button("Submit Feedback"):
+            st.success("Thank you for your feedback!")
\ No newline at end of file
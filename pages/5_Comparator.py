@@ -7,16 +7,15 @@ Created on Thu Jul  3 01:23:38 2025
 
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
+from labsim.waveforms import generate_waveform
+from labsim import assets, cache, crossings, dataflow, opamp, scope, sections
 
 st.set_page_config(layout="wide", page_title="Comparator")
 
 st.title("Comparator Simulator")
 
 # Create the tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 mcq_questions = [
     {
@@ -120,9 +119,10 @@ mcq_questions1 = [
      
 # --- Prelab Tab ---
 with tab1:
+    if tab1.open:
 
     
-    st.markdown("""
+        st.markdown("""
     **Objective:** To understand the operation of an operational amplifier (op-amp) as a comparator.
 
     **Pre-requisites:**
@@ -133,58 +133,60 @@ with tab1:
     """)
 
 with tab2:
+    if tab2.open:
    
-    # Simulate 'with tab1:' for a standalone executable script
-    st.header("Prelab")
+        # Simulate 'with tab1:' for a standalone executable script
+        st.header("Prelab")
   
     
-    st.markdown("---")
-    st.subheader("Prelab Quick Check: Op-Amp Comparator MCQs 🧠")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.markdown("---")
+        st.subheader("Prelab Quick Check: Op-Amp Comparator MCQs 🧠")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
 
 
 
 # --- Theory Tab ---
 with tab3:
-    st.header("Theory")
-    st.markdown("""
+    if tab3.open:
+        st.header("Theory")
+        st.markdown("""
     A **comparator** is a circuit that compares an input voltage with a pre-defined reference voltage. The output of the comparator is a digital signal that indicates which of the two voltages is larger. This process is often called **voltage-level detection**.
 
     ### How a Comparator Works
@@ -204,7 +206,10 @@ with tab3:
     """)
 
 # --- Simulation Tab ---
-with tab4:
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     # --- Layout with Columns ---
     # col1 for Function Generator, col2 for Comparator controls, col3 for CRO displays.
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -216,25 +221,27 @@ with tab4:
             "Select Waveform",
             ("Sine wave", "Cosine wave", "Triangular wave", "Square wave"),
             index=0, # Default to Sine wave
-            key="wave_type_radio_comparator" # Unique key for this page's widgets
+            key="wave_type_radio_comparator", # Unique key for this page's widgets
+            persist_state="session"
         )
         # Map string wave type to integer value for compatibility with existing logic.
         wave_type_map = {"Sine wave": 1, "Cosine wave": 2, "Triangular wave": 3, "Square wave": 4}
         selected_wave_type_int = wave_type_map[wave_type]
 
         # Slider for amplitude control.
-        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_comparator")
+        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_comparator", persist_state="session")
 
         st.subheader("Frequency")
         # Slider for frequency value.
-        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_comparator")
+        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_comparator", persist_state="session")
         # Radio buttons for frequency unit (Hz, kHz, MHz).
         current_freq_unit = st.radio(
             "Frequency Unit",
             ("Hz", "kHz", "MHz"),
             index=0, # Default to Hz
             horizontal=True,
-            key="freq_unit_radio_comparator"
+            key="freq_unit_radio_comparator",
+            persist_state="session"
         )
 
         # Helper function to convert frequency value based on selected unit.
@@ -255,7 +262,8 @@ with tab4:
             "Select Comparator Type",
             ("Inverting Comparator", "Non-Inverting Comparator"),
             index=0, # Default to Inverting Comparator
-            key="comparator_type_radio"
+            key="comparator_type_radio",
+            persist_state="session"
         )
         # Map string comparator type to integer value.
         comparator_type_map = {"Inverting Comparator": 1, "Non-Inverting Comparator": 2}
@@ -267,52 +275,45 @@ with tab4:
             value=0.0,
             step=0.1,
             format="%.2f", # Format to 2 decimal places.
-            key="V_ref_input"
+            key="V_ref_input",
+            persist_state="session"
         )
 
+        # Optional non-ideal comparator: finite slew rate and propagation delay.
+        non_ideal = st.checkbox(
+            "Non-ideal comparator (slew rate and delay)",
+            value=False,
+            key="non_ideal_checkbox_comparator",
+            persist_state="session"
+        )
+        slew_rate_V_per_us = None
+        delay_us = 0.0
+        if non_ideal:
+            slew_rate_V_per_us = st.number_input(
+                "Slew Rate (V/µs)",
+                min_value=0.001,
+                value=opamp.SLEW_RATE / 1e6,
+                step=0.1,
+                format="%.3f",
+                key="slew_rate_input_comparator",
+                persist_state="session"
+            )
+            delay_us = st.number_input(
+                "Propagation Delay (µs)",
+                min_value=0.0,
+                value=1.0,
+                step=0.1,
+                format="%.3f",
+                key="delay_input_comparator",
+                persist_state="session"
+            )
+
         
 
 
     # --- Core Simulation Logic ---
     # These functions are largely preserved from your Tkinter code, adapted for Streamlit's flow.
 
-    def generate_waveform(amp, freq, wave_type_val, num_cycles=3):
-        """
-        Generates the input waveform based on amplitude, frequency, and waveform type.
-        """
-        if freq == 0:
-            sampling_rate = 10000 # Default sampling for DC.
-        else:
-            # Adjust sampling rate based on frequency to ensure enough points per cycle.
-            # At least 100 points per cycle, or a minimum of 1000 points overall.
-            sampling_rate = max(100 * freq, 1000)
-
-        # Calculate total duration for the specified number of cycles.
-        total_duration = num_cycles / freq if freq != 0 else 0.01 # Avoid division by zero, set a small default for DC.
-
-        num_points = int(sampling_rate * total_duration)
-        if num_points < 2:
-            num_points = 2
-
-        # Generate time array.
-        t = np.linspace(0, total_duration, num_points, endpoint=False)
-
-        # Generate waveform based on selected type.
-        if freq == 0: # DC voltage.
-            y = np.full_like(t, amp) # Flat line at amplitude.
-        elif wave_type_val == 1: # Sine wave.
-            y = amp * np.sin(2 * np.pi * freq * t)
-        elif wave_type_val == 2: # Cosine wave.
-            y = amp * np.cos(2 * np.pi * freq * t)
-        elif wave_type_val == 3: # Triangular wave.
-            y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5) # width=0.5 for symmetric triangle.
-        elif wave_type_val == 4: # Square wave.
-            y = amp * signal.square(2 * np.pi * freq * t)
-        else:
-            y = np.zeros_like(t) # No waveform selected, return zeros.
-
-        return y, t, amp, total_duration, freq
-
     def get_comparator_name(comp_type_value):
         """Returns the name of the comparator based on its integer value."""
         if comp_type_value == 1:
@@ -321,10 +322,17 @@ with tab4:
             return "Non-Inverting Comparator"
         return "N/A"
 
+    @cache.memoize
     def simulate_comparator_circuit(amp_input, actual_frequency, selected_wave_type_int,
-                                     selected_comparator_type_int, V_ref_val):
+                                     selected_comparator_type_int, V_ref_val,
+                                     slew_rate_V_per_us=None, delay_us=0.0):
         """
         Performs the comparator circuit simulation and calculates output parameters.
+
+        With a slew rate the output is built from the input's crossings of
+        V_ref: after ``delay_us`` each edge ramps to the other rail at
+        ``slew_rate_V_per_us``.  The returned output trace is then the exact
+        piecewise-linear output (its breakpoints), not one value per sample.
         """
         # Generate the input waveform.
         y_input, t, amp_input_actual, total_duration, input_freq = generate_waveform(
@@ -335,29 +343,31 @@ with tab4:
         V_sat_plus = 15.0
         V_sat_minus = -15.0
 
-        y_output = np.zeros_like(y_input)
-        
         # Calculate input time period in seconds.
         input_time_s = 1 / input_freq if input_freq != 0 else 0
 
         comparator_name = get_comparator_name(selected_comparator_type_int)
 
         # --- Comparator Logic ---
-        if selected_comparator_type_int == 1:  # Inverting Comparator
-            # If input voltage is greater than V_ref, output goes to V_sat_minus.
-            y_output[y_input > V_ref_val] = V_sat_minus
-            # If input voltage is less than or equal to V_ref, output goes to V_sat_plus.
-            y_output[y_input <= V_ref_val] = V_sat_plus
-
-        elif selected_comparator_type_int == 2: # Non-Inverting Comparator
-            # If input voltage is greater than V_ref, output goes to V_sat_plus.
-            y_output[y_input > V_ref_val] = V_sat_plus
-            # If input voltage is less than or equal to V_ref, output goes to V_sat_minus.
-            y_output[y_input <= V_ref_val] = V_sat_minus
-        
-        # The output is inherently clipped to V_sat_plus and V_sat_minus by the logic.
-        # An explicit clip here ensures it's strictly within these bounds if any edge cases arise.
-        y_output = np.clip(y_output, V_sat_minus, V_sat_plus)
+        # The output is high while the input is above V_ref (non-inverting)
+        # or at or below it (inverting).
+        inverting = selected_comparator_type_int == 1
+        above = y_input > V_ref_val
+        y_output = np.where(above != inverting, V_sat_plus, V_sat_minus)
+
+        # Edge instants between the samples, and the pulse timing of the
+        # output derived from them.
+        edges = crossings.edges(y_input, t, V_ref_val)
+        if inverting:
+            edges = edges._replace(rising=~edges.rising, initial=not edges.initial)
+        output_trace = (t, y_output)
+        if slew_rate_V_per_us is not None:
+            output_trace = crossings.slewed(edges, t[0], t[-1], V_sat_plus, V_sat_minus,
+                                            slew_rate_V_per_us * 1e6, delay_us * 1e-6)
+            # The output is linear between its breakpoints, so its zero
+            # crossings are exact.
+            edges = crossings.edges(output_trace[1], output_trace[0], 0.0)
+        pulse_timing = crossings.timing(edges)
         
         # For a comparator, the output high and low values are the saturation voltages.
         output_high = V_sat_plus
@@ -368,105 +378,145 @@ with tab4:
 
 
         return y_input, y_output, t, amp_input_actual, total_duration, input_freq, input_time_s, \
-                 V_ref_val, output_high, output_low, comparator_name
+                 V_ref_val, output_high, output_low, comparator_name, output_trace, edges, pulse_timing
 
     # --- CRO Displays ---
     with col3:
         st.header("Circuit Diagram")
         
         if comparator_type == "Inverting Comparator":
-          st.image("images/invertingcomparator.png", caption="Inverting Comparator Circuit", width='stretch')
+          assets.show("images/invertingcomparator.png", caption="Inverting Comparator Circuit", width='stretch')
         elif comparator_type == "Non-Inverting Comparator":
-           st.image("images/noninvertingcomparator.png", caption="Non-Inverting Comparator Circuit", width='stretch')
+           assets.show("images/noninvertingcomparator.png", caption="Non-Inverting Comparator Circuit", width='stretch')
     
         
     st.header("CRO Displays")
-    st.text_input("Your Name",key="p2")
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
      # Create three columns *outside* the col1/col2/col3 definition to span the full width
     plot_col1, plot_col2, plot_col3 = st.columns(3) 
 
     # Perform the simulation based on current widget values.
     y_input, y_output, t, amp_input, total_duration, input_freq, input_time_s, \
-    V_ref_val, output_high, output_low, comparator_name = simulate_comparator_circuit(
+    V_ref_val, output_high, output_low, comparator_name, output_trace, edges, pulse_timing = flow.call("circuit", simulate_comparator_circuit,
             amplitude, actual_frequency, selected_wave_type_int,
-            selected_comparator_type_int, V_ref
+            selected_comparator_type_int, V_ref, slew_rate_V_per_us, delay_us
         )
+    fig_key = simulate_comparator_circuit.cache_key(
+        amplitude, actual_frequency, selected_wave_type_int,
+        selected_comparator_type_int, V_ref, slew_rate_V_per_us, delay_us
+    )
+
+    # Adjust Y-axis limits to include V_ref if it's outside the signal range, with padding.
+    max_plot_amp = max(amp_input * 1.5, abs(V_ref_val) * 1.2)
+    if max_plot_amp == 0: max_plot_amp = 1 # Ensure a minimum range if all values are 0.
+    # Determine combined Y-axis limit.
+    max_combined_amp = max(amp_input * 1.5, abs(V_ref_val) * 1.2, output_high * 1.2)
+    if max_combined_amp == 0: max_combined_amp = 1
 
         # Plotting for CRO Channel 1 (Input Signal).
-    fig1, ax1 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax1.plot(t, y_input, color='lime')
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
+    def setup_input(ax1):
+        scope.trace(ax1, color='lime')
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
         
-        # Plot V_ref line on input graph for better visualization.
-    ax1.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
-    ax1.legend(loc='lower left', fontsize=7, facecolor='darkgray', edgecolor='white')
+            # Plot V_ref line on input graph for better visualization.
+        ax1.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
+        ax1.legend(loc='lower left', fontsize=7, facecolor='darkgray', edgecolor='white')
 
-        # Adjust Y-axis limits to include V_ref if it's outside the signal range, with padding.
-    max_plot_amp = max(amp_input * 1.5, abs(V_ref_val) * 1.2)
-    if max_plot_amp == 0: max_plot_amp = 1 # Ensure a minimum range if all values are 0.
-    ax1.set_ylim(-max_plot_amp, max_plot_amp)
+        ax1.set_ylim(-max_plot_amp, max_plot_amp)
         
-    ax1.set_xlim(0, total_duration)
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
-    ax1.set_xlabel("Time (sec)")
-    ax1.set_ylabel("Voltage (V)")
-    ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
-    ax1.text(0.02, 0.95, f'Amp: {amp_input:.2f} V', transform=ax1.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
+        ax1.set_xlabel("Time (sec)")
+        ax1.set_ylabel("Voltage (V)")
+        ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col1: # Display fig1 in the first plot column  
-                 st.pyplot(fig1) # Display the Matplotlib figure in Streamlit.
+                 scope.show(setup_input, fig_key, [(t, y_input)],
+                            [f'Amp: {amp_input:.2f} V'], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
         # Plotting for CRO Channel 2 (Output Signal).
-    fig2, ax2 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax2.plot(t, y_output, color='cyan')
-    ax2.set_facecolor("black")
-    ax2.axhline(0, color='gray', linewidth=0.5)
-    ax2.axvline(0, color='gray', linewidth=0.5)
+    def setup_output(ax2):
+        scope.trace(ax2, color='cyan')
+        ax2.set_facecolor("black")
+        ax2.axhline(0, color='gray', linewidth=0.5)
+        ax2.axvline(0, color='gray', linewidth=0.5)
         
-        # Set Y-axis limits based on saturation voltages with padding.
-    ax2.set_ylim(output_low * 1.2, output_high * 1.2)
+            # Set Y-axis limits based on saturation voltages with padding.
+        ax2.set_ylim(output_low * 1.2, output_high * 1.2)
         
-    ax2.set_xlim(0, total_duration)
-    ax2.tick_params(axis='x', colors='black')
-    ax2.tick_params(axis='y', colors='black')
-    ax2.set_xlabel("Time (sec)")
-    ax2.set_ylabel("Voltage (V)")
-    ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
-    ax2.text(0.02, 0.95, f'Output High: {output_high:.2f} V', transform=ax2.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
-    ax2.text(0.02, 0.85, f'Output Low: {output_low:.2f} V', transform=ax2.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
+        ax2.set_xlim(0, total_duration)
+        ax2.tick_params(axis='x', colors='black')
+        ax2.tick_params(axis='y', colors='black')
+        ax2.set_xlabel("Time (sec)")
+        ax2.set_ylabel("Voltage (V)")
+        ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
+        scope.readout(ax2, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+        scope.readout(ax2, 0.02, 0.85,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col2: # Display fig1 in the first plot column  
-                   st.pyplot(fig2) # Display the Matplotlib figure in Streamlit.
+                   scope.show(setup_output, fig_key, [output_trace],
+                              [f'Output High: {output_high:.2f} V', f'Output Low: {output_low:.2f} V'], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
         # Plotting for Combined View (Channel 1 & 2).
-    fig_combined, ax_combined = plt.subplots(figsize=(3, 2), dpi=100)
-    ax_combined.plot(t, y_input, color='lime', label='Input (Ch 1)')
-    ax_combined.plot(t, y_output, color='cyan', label='Output (Ch 2)')
-    ax_combined.set_facecolor("black")
-    ax_combined.axhline(0, color='gray', linewidth=0.5)
-    ax_combined.axvline(0, color='gray', linewidth=0.5)
+    def setup_combined(ax_combined):
+        scope.trace(ax_combined, color='lime', label='Input (Ch 1)')
+        scope.trace(ax_combined, color='cyan', label='Output (Ch 2)')
+        ax_combined.set_facecolor("black")
+        ax_combined.axhline(0, color='gray', linewidth=0.5)
+        ax_combined.axvline(0, color='gray', linewidth=0.5)
         
-        # Plot V_ref line on combined graph.
-    ax_combined.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
+            # Plot V_ref line on combined graph.
+        ax_combined.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
 
-        # Determine combined Y-axis limit.
-    max_combined_amp = max(amp_input * 1.5, abs(V_ref_val) * 1.2, output_high * 1.2)
-    if max_combined_amp == 0: max_combined_amp = 1
-    ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
+        ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
         
-    ax_combined.set_xlim(0, total_duration)
-    ax_combined.tick_params(axis='x', colors='black')
-    ax_combined.tick_params(axis='y', colors='black')
-    ax_combined.set_xlabel("Time (sec)")
-    ax_combined.set_ylabel("Voltage (V)")
-    ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
-    ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
+        ax_combined.set_xlim(0, total_duration)
+        ax_combined.tick_params(axis='x', colors='black')
+        ax_combined.tick_params(axis='y', colors='black')
+        ax_combined.set_xlabel("Time (sec)")
+        ax_combined.set_ylabel("Voltage (V)")
+        ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
+        ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
     with plot_col3: # Display fig1 in the first plot column  
-                    st.pyplot(fig_combined) # Display the Matplotlib figure in Streamlit.
+                    scope.show(setup_combined, fig_key, [(t, y_input), output_trace],
+                               [], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
+
+    # --- Edge Timing ---
+    # Measured from the interpolated crossings of V_ref, not the sample grid;
+    # for the non-ideal comparator, from the output's crossings of 0 V.
+    def format_ms(seconds):
+        return f"{seconds * 1000:.4g} ms" if np.isfinite(seconds) else "n/a"
+
+    duty_cycle = pulse_timing.duty_cycle
+    high_width = pulse_timing.high_widths.mean() if len(pulse_timing.high_widths) else np.nan
+    low_width = pulse_timing.low_widths.mean() if len(pulse_timing.low_widths) else np.nan
+    metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+    metric_col1.metric("Output Duty Cycle", f"{duty_cycle * 100:.2f} %" if np.isfinite(duty_cycle) else "n/a")
+    metric_col2.metric("High Pulse Width", format_ms(high_width))
+    metric_col3.metric("Low Pulse Width", format_ms(low_width))
+    metric_col4.metric("Period Jitter (p-p)", f"{pulse_timing.jitter * 1e6:.3f} µs" if np.isfinite(pulse_timing.jitter) else "n/a")
+    if len(edges.times):
+        with st.expander(f"Output edge timestamps ({len(edges.times)})"):
+            import pandas as pd
+            df_edges = flow.node("edge table", (edges,), lambda: pd.DataFrame({
+                "Time (ms)": np.round(edges.times * 1000, 6),
+                "Edge": np.where(edges.rising, "Rising (to +Vsat)", "Falling (to -Vsat)"),
+            }))
+            st.dataframe(df_edges, width='stretch', hide_index=True)
+    elif slew_rate_V_per_us is not None and np.ptp(output_trace[1]) > 0:
+        st.caption("The output cannot slew through 0 V before the input crosses V_ref again: "
+                   "lower the frequency or raise the slew rate.")
+    else:
+        st.caption("The input never crosses V_ref, so the output stays at one rail.")
+    if slew_rate_V_per_us is not None:
+        swing_time_us = (output_high - output_low) / slew_rate_V_per_us
+        st.caption(f"A full swing between the rails takes {swing_time_us:.3g} µs at {slew_rate_V_per_us:g} V/µs, "
+                   f"after a propagation delay of {delay_us:g} µs.")
 
     # --- Dynamic Parameters Table ---
     st.header("Simulation Results")
@@ -485,76 +535,88 @@ with tab4:
             "Input Time Period (ms)": f"{input_time_s:.3f}",
             "Reference Voltage (V)": f"{V_ref_val:.2f}",
             "Output High (V)": f"{output_high:.2f}",
-            "Output Low (V)": f"{output_low:.2f}"
+            "Output Low (V)": f"{output_low:.2f}",
+            "Duty Cycle (%)": f"{duty_cycle * 100:.2f}" if np.isfinite(duty_cycle) else "n/a",
+            "Slew Rate (V/µs)": f"{slew_rate_V_per_us:.3f}" if slew_rate_V_per_us is not None else "ideal",
+            "Delay (µs)": f"{delay_us:.3f}"
         }
         st.session_state.simulation_history_comparator.append(new_entry)
 
     # Display the history as a Pandas DataFrame.
     if st.session_state.simulation_history_comparator:
-        df_history = pd.DataFrame(st.session_state.simulation_history_comparator)
+        import pandas as pd
+        history = st.session_state.simulation_history_comparator
+        df_history = flow.node("results table", (history, len(history)), lambda: pd.DataFrame(history))
         st.dataframe(df_history, width='stretch') # use_container_width makes the table responsive.
 
     # Button to clear the table history.
     if st.button("Clear Table History", key="clear_table_button_comparator"):
         st.session_state.simulation_history_comparator = [] # Reset the history list.
         st.rerun() # Rerun the app to immediately reflect the cleared table.
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 # --- Postlab Tab ---
 with tab5:
-    st.header("Postlab")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
 
 # --- Feedback Tab ---
 with tab6:
-    st.header("Feedback")
-    st.markdown("""
+    if tab6.open:
+        st.header("Feedback")
+        st.markdown("""
     We value your feedback to improve this simulator. Please let us know your thoughts.
     """)
-    st.text_input("Your Name")
-    st.text_input("Registration number/Faculty ID")
-    st.slider("How would you rate this simulator?(best -5)", 1, 5)
+        st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+        st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+        st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
    
-    st.text_input("1.  What did you find most useful about this simulator?")
-    st.text_input("2.  Were there any features that were confusing or difficult to use?")
-    st.text_input("3.  What new features would you like to see added in the future?")
+        st.text_input("1.  What did you find most useful about this simulator?", key=sections.page_key(__file__, "feedback_useful"), persist_state="session")
+        st.text_input("2.  Were there any features that were confusing or difficult to use?", key=sections.page_key(__file__, "feedback_confusing"), persist_state="session")
+        st.text_input("3.  What new features would you like to see added in the future?", key=sections.page_key(__file__, "feedback_wishes"), persist_state="session")
    
-    st.text_area("Any other comments or suggestions.", height=200, key="feedback_text")
-    if st.button("Submit Feedback"):
-      st.success("Thank you for your feedback!")
+        st.text_area("Any other comments or suggestions.", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+        if st.button("Submit Feedback"):
+          st.success("Thank you for your feedback!")
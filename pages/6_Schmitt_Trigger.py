@@ -7,16 +7,15 @@ Created on Thu Jul  3 01:31:36 2025
 
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
+from labsim.waveforms import generate_waveform
+from labsim import assets, cache, dataflow, hysteresis, scope, sections
 
 st.set_page_config(layout="wide", page_title="Schmitt Trigger")
 
 st.title("Schmitt Trigger Simulator")
 
 # Create the tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 mcq_questions = [
     {
@@ -118,9 +117,10 @@ mcq_questions1 = [
 
 
 with tab1:
+    if tab1.open:
 
     
-    st.markdown("""
+        st.markdown("""
     **Objective:** To understand the operation of an operational amplifier (op-amp) configured as a Schmitt Trigger.
 
     **Pre-requisites:**
@@ -133,61 +133,60 @@ with tab1:
 
 # --- Prelab Tab ---
 with tab2:
-    st.header("Prelab")
+    if tab2.open:
+        st.header("Prelab")
    
-    st.subheader("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.subheader("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
 
 # --- Theory Tab ---
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
 
 # Assume the rest of your app's code is here
 with tab3:
-# Using a raw string for markdown to correctly render LaTeX and prevent backslash issues
-    #with st.expander("Show Theory Tab Content"):
-    st.header("Theory")
-    st.markdown(r"""
+    if tab3.open:
+    # Using a raw string for markdown to correctly render LaTeX and prevent backslash issues
+        #with st.expander("Show Theory Tab Content"):
+        st.header("Theory")
+        st.markdown(r"""
     A **Schmitt Trigger** is a comparator with **positive feedback**. This feedback creates two different threshold voltages for the input: an **Upper Threshold Point ($V_{UTP}$)** and a **Lower Threshold Point ($V_{LTP}$)**. The output state of the Schmitt Trigger depends not only on the current input voltage but also on the previous output state. This two-threshold behavior is known as **hysteresis**.
 
     ### How Hysteresis Works
@@ -201,8 +200,8 @@ with tab3:
     In a Schmitt Trigger, the input signal is applied to the inverting (-) terminal, and the positive feedback loop is created by connecting a resistor (**$R_1$**) from the output to the non-inverting input, and another resistor (**$R_2$**) from the non-inverting input to ground.
 
     """)
-    st.image("images/schmitttrigger.png", caption="Schmitt Trigger Circuit", width='stretch')
-    st.markdown(r"""
+        assets.show("images/schmitttrigger.png", caption="Schmitt Trigger Circuit", width='stretch')
+        st.markdown(r"""
 
     The threshold voltages are determined by the resistance values ($R_1$ and $R_2$) and the op-amp's saturation voltages ($V_{sat+}$ and $V_{sat-}$):
 
@@ -218,7 +217,10 @@ with tab3:
     """)
 
 # --- Simulation Tab ---
-with tab4:
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     # --- Layout with Columns ---
     # col1 for Function Generator, col2 for Schmitt Trigger controls, col3 for CRO displays.
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -230,25 +232,27 @@ with tab4:
             "Select Waveform",
             ("Sine wave", "Cosine wave", "Triangular wave", "Square wave"),
             index=0, # Default to Sine wave
-            key="wave_type_radio_schmitt" # Unique key for this page's widgets
+            key="wave_type_radio_schmitt", # Unique key for this page's widgets
+            persist_state="session"
         )
         # Map string wave type to integer value for compatibility with existing logic.
         wave_type_map = {"Sine wave": 1, "Cosine wave": 2, "Triangular wave": 3, "Square wave": 4}
         selected_wave_type_int = wave_type_map[wave_type]
 
         # Slider for amplitude control.
-        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_schmitt")
+        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_schmitt", persist_state="session")
 
         st.subheader("Frequency")
         # Slider for frequency value.
-        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_schmitt")
+        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_schmitt", persist_state="session")
         # Radio buttons for frequency unit (Hz, kHz, MHz).
         current_freq_unit = st.radio(
             "Frequency Unit",
             ("Hz", "kHz", "MHz"),
             index=0, # Default to Hz
             horizontal=True,
-            key="freq_unit_radio_schmitt"
+            key="freq_unit_radio_schmitt",
+            persist_state="session"
         )
 
         # Helper function to convert frequency value based on selected unit.
@@ -274,7 +278,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.1f",
-            key="R1_input_schmitt"
+            key="R1_input_schmitt",
+            persist_state="session"
         )
         # Number input for Resistance R2 (resistor to ground from non-inverting input).
         R2_val_kohm = st.number_input(
@@ -283,7 +288,8 @@ with tab4:
             value=0.5,
             step=0.1,
             format="%.1f",
-            key="R2_input_schmitt"
+            key="R2_input_schmitt",
+            persist_state="session"
         )
 
         st.markdown("---") # Horizontal line for visual separation.
@@ -291,43 +297,7 @@ with tab4:
 
 
     # --- Core Simulation Logic ---
-    def generate_waveform(amp, freq, wave_type_val, num_cycles=3):
-        """
-        Generates the input waveform based on amplitude, frequency, and waveform type.
-        """
-        # Adjust sampling rate based on frequency to ensure enough points per cycle.
-        # At least 100 points per cycle, or a minimum of 1000 points overall.
-        if freq == 0:
-            sampling_rate = 10000 # Default sampling for DC.
-        else:
-            sampling_rate = max(100 * freq, 1000)
-
-        # Calculate total duration for the specified number of cycles.
-        total_duration = num_cycles / freq if freq != 0 else 0.01 # Avoid division by zero, set a small default for DC.
-
-        num_points = int(sampling_rate * total_duration)
-        if num_points < 2:
-            num_points = 2
-
-        # Generate time array.
-        t = np.linspace(0, total_duration, num_points, endpoint=False)
-
-        # Generate waveform based on selected type.
-        if freq == 0: # DC voltage.
-            y = np.full_like(t, amp) # Flat line at amplitude.
-        elif wave_type_val == 1: # Sine wave.
-            y = amp * np.sin(2 * np.pi * freq * t)
-        elif wave_type_val == 2: # Cosine wave.
-            y = amp * np.cos(2 * np.pi * freq * t)
-        elif wave_type_val == 3: # Triangular wave.
-            y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5) # width=0.5 for symmetric triangle.
-        elif wave_type_val == 4: # Square wave.
-            y = amp * signal.square(2 * np.pi * freq * t)
-        else:
-            y = np.zeros_like(t) # No waveform selected, return zeros.
-
-        return y, t, amp, total_duration, freq
-
+    @cache.memoize
     def simulate_schmitt_trigger(amp_input, actual_frequency, selected_wave_type_int,
                                  R1_val_kohm, R2_val_kohm):
         """
@@ -349,7 +319,7 @@ with tab4:
         # Calculate Upper Threshold Point (V_UTP) and Lower Threshold Point (V_LTP).
         # These are for a non-inverting Schmitt Trigger (positive feedback).
         if (R1_val + R2_val) == 0:
-            st.error("Sum of R1 and R2 cannot be zero. Please check resistance values.")
+            cache.error("Sum of R1 and R2 cannot be zero. Please check resistance values.")
             V_UTP = 0
             V_LTP = 0
             y_output = np.zeros_like(y_input)
@@ -357,28 +327,10 @@ with tab4:
             V_UTP = (R2_val / (R1_val + R2_val)) * V_sat_plus
             V_LTP = (R2_val / (R1_val + R2_val)) * V_sat_minus
 
-            y_output = np.zeros_like(y_input)
+            # Start high unless the input starts above UTP, then switch low above
+            # UTP and high again below LTP.
+            y_output = hysteresis.schmitt(y_input, V_UTP, V_LTP, V_sat_plus, V_sat_minus)
 
-            if len(y_input) > 0:
-                if y_input[0] > V_UTP:
-                    y_output[0] = V_sat_minus # Start low if input is above UTP
-                elif y_input[0] < V_LTP:
-                    y_output[0] = V_sat_plus # Start high if input is below LTP
-                else:
-                    y_output[0] = V_sat_plus
-
-            for i in range(1, len(y_input)):
-                if y_output[i-1] == V_sat_plus:
-                    if y_input[i] > V_UTP:
-                        y_output[i] = V_sat_minus
-                    else:
-                        y_output[i] = y_output[i-1]
-                elif y_output[i-1] == V_sat_minus:
-                    if y_input[i] < V_LTP:
-                        y_output[i] = V_sat_plus
-                    else:
-                        y_output[i] = y_output[i-1]
-            
             y_output = np.clip(y_output, V_sat_minus, V_sat_plus)
 
         return y_input, y_output, t, amp_input_actual, total_duration, input_freq, \
@@ -388,96 +340,104 @@ with tab4:
     with col3:
         st.header(" Circuit Diagram")
         
-        st.image("images/schmitttrigger.png", caption="Schmitt Trigger Circuit", width='stretch')   
+        assets.show("images/schmitttrigger.png", caption="Schmitt Trigger Circuit", width='stretch')   
         
     st.header("CRO Displays")
-    st.text_input("Your Name",key="p2")
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
     plot_col1, plot_col2, plot_col3 = st.columns(3) 
 
         # Perform the simulation based on current widget values.
     y_input, y_output, t, amp_input, total_duration, input_freq, \
-        V_UTP, V_LTP, V_sat_plus, V_sat_minus, R1_val_kohm, R2_val_kohm = simulate_schmitt_trigger(
+        V_UTP, V_LTP, V_sat_plus, V_sat_minus, R1_val_kohm, R2_val_kohm = flow.call("circuit", simulate_schmitt_trigger,
             amplitude, actual_frequency, selected_wave_type_int,
             R1_val_kohm, R2_val_kohm
         )
+    fig_key = simulate_schmitt_trigger.cache_key(
+        amplitude, actual_frequency, selected_wave_type_int,
+        R1_val_kohm, R2_val_kohm
+    )
+
+    # Adjust Y-axis limits to include input amplitude, UTP, and LTP, with padding.
+    max_plot_amp = max(amp_input * 1.5, abs(V_UTP) * 1.2, abs(V_LTP) * 1.2)
+    if max_plot_amp == 0: max_plot_amp = 1 # Ensure a minimum range if all values are 0.
+    # Determine combined Y-axis limit.
+    max_combined_amp = max(amp_input * 1.5, abs(V_UTP) * 1.2, abs(V_LTP) * 1.2, V_sat_plus * 1.2)
+    if max_combined_amp == 0: max_combined_amp = 1
 
         # Plotting for CRO Channel 1 (Input Signal).
-    fig1, ax1 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax1.plot(t, y_input, color='lime')
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
+    def setup_input(ax1):
+        scope.trace(ax1, color='lime')
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
         
-        # Plot UTP and LTP lines on input graph for better visualization.
-    ax1.axhline(V_UTP, color='red', linestyle='--', linewidth=1, label=f'V_UTP={V_UTP:.2f}V')
-    ax1.axhline(V_LTP, color='blue', linestyle='--', linewidth=1, label=f'V_LTP={V_LTP:.2f}V')
-    ax1.legend(loc='lower left', fontsize=7, facecolor='darkgray', edgecolor='white')
+            # Plot UTP and LTP lines on input graph for better visualization.
+        ax1.axhline(V_UTP, color='red', linestyle='--', linewidth=1, label=f'V_UTP={V_UTP:.2f}V')
+        ax1.axhline(V_LTP, color='blue', linestyle='--', linewidth=1, label=f'V_LTP={V_LTP:.2f}V')
+        ax1.legend(loc='lower left', fontsize=7, facecolor='darkgray', edgecolor='white')
 
-        # Adjust Y-axis limits to include input amplitude, UTP, and LTP, with padding.
-    max_plot_amp = max(amp_input * 1.5, abs(V_UTP) * 1.2, abs(V_LTP) * 1.2)
-    if max_plot_amp == 0: max_plot_amp = 1 # Ensure a minimum range if all values are 0.
-    ax1.set_ylim(-max_plot_amp, max_plot_amp)
+        ax1.set_ylim(-max_plot_amp, max_plot_amp)
         
-    ax1.set_xlim(0, total_duration)
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
-    ax1.set_xlabel("Time (sec)")
-    ax1.set_ylabel("Voltage (V)")
-    ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
-    ax1.text(0.02, 0.95, f'Amp: {amp_input:.2f} V', transform=ax1.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
+        ax1.set_xlabel("Time (sec)")
+        ax1.set_ylabel("Voltage (V)")
+        ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col1:
-                  st.pyplot(fig1) # Display the Matplotlib figure in Streamlit.
+                  scope.show(setup_input, fig_key, [(t, y_input)],
+                             [f'Amp: {amp_input:.2f} V'], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
         # Plotting for CRO Channel 2 (Output Signal).
-    fig2, ax2 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax2.plot(t, y_output, color='cyan')
-    ax2.set_facecolor("black")
-    ax2.axhline(0, color='gray', linewidth=0.5)
-    ax2.axvline(0, color='gray', linewidth=0.5)
+    def setup_output(ax2):
+        scope.trace(ax2, color='cyan')
+        ax2.set_facecolor("black")
+        ax2.axhline(0, color='gray', linewidth=0.5)
+        ax2.axvline(0, color='gray', linewidth=0.5)
         
-        # Set Y-axis limits based on saturation voltages with padding.
-    ax2.set_ylim(V_sat_minus * 1.2, V_sat_plus * 1.2)
+            # Set Y-axis limits based on saturation voltages with padding.
+        ax2.set_ylim(V_sat_minus * 1.2, V_sat_plus * 1.2)
         
-    ax2.set_xlim(0, total_duration)
-    ax2.tick_params(axis='x', colors='black')
-    ax2.tick_params(axis='y', colors='black')
-    ax2.set_xlabel("Time (sec)")
-    ax2.set_ylabel("Voltage (V)")
-    ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
-    ax2.text(0.02, 0.95, f'Output High: {V_sat_plus:.2f} V', transform=ax2.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
-    ax2.text(0.02, 0.85, f'Output Low: {V_sat_minus:.2f} V', transform=ax2.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
+        ax2.set_xlim(0, total_duration)
+        ax2.tick_params(axis='x', colors='black')
+        ax2.tick_params(axis='y', colors='black')
+        ax2.set_xlabel("Time (sec)")
+        ax2.set_ylabel("Voltage (V)")
+        ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
+        scope.readout(ax2, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+        scope.readout(ax2, 0.02, 0.85,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col2:
-        st.pyplot(fig2) # Display the Matplotlib figure in Streamlit.
+        scope.show(setup_output, fig_key, [(t, y_output)],
+                   [f'Output High: {V_sat_plus:.2f} V', f'Output Low: {V_sat_minus:.2f} V'], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
         # Plotting for Combined View (Channel 1 & 2).
-    fig_combined, ax_combined = plt.subplots(figsize=(3, 2), dpi=100)
-    ax_combined.plot(t, y_input, color='lime', label='Input (Ch 1)')
-    ax_combined.plot(t, y_output, color='cyan', label='Output (Ch 2)')
-    ax_combined.set_facecolor("black")
-    ax_combined.axhline(0, color='gray', linewidth=0.5)
-    ax_combined.axvline(0, color='gray', linewidth=0.5)
+    def setup_combined(ax_combined):
+        scope.trace(ax_combined, color='lime', label='Input (Ch 1)')
+        scope.trace(ax_combined, color='cyan', label='Output (Ch 2)')
+        ax_combined.set_facecolor("black")
+        ax_combined.axhline(0, color='gray', linewidth=0.5)
+        ax_combined.axvline(0, color='gray', linewidth=0.5)
         
-        # Plot UTP and LTP lines on combined graph.
-    ax_combined.axhline(V_UTP, color='red', linestyle='--', linewidth=1, label=f'V_UTP ({V_UTP:.2f}V)')
-    ax_combined.axhline(V_LTP, color='blue', linestyle='--', linewidth=1, label=f'V_LTP ({V_LTP:.2f}V)')
+            # Plot UTP and LTP lines on combined graph.
+        ax_combined.axhline(V_UTP, color='red', linestyle='--', linewidth=1, label=f'V_UTP ({V_UTP:.2f}V)')
+        ax_combined.axhline(V_LTP, color='blue', linestyle='--', linewidth=1, label=f'V_LTP ({V_LTP:.2f}V)')
 
-        # Determine combined Y-axis limit.
-    max_combined_amp = max(amp_input * 1.5, abs(V_UTP) * 1.2, abs(V_LTP) * 1.2, V_sat_plus * 1.2)
-    if max_combined_amp == 0: max_combined_amp = 1
-    ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
+        ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
         
-    ax_combined.set_xlim(0, total_duration)
-    ax_combined.tick_params(axis='x', colors='black')
-    ax_combined.tick_params(axis='y', colors='black')
-    ax_combined.set_xlabel("Time (sec)")
-    ax_combined.set_ylabel("Voltage (V)")
-    ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
-    ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
+        ax_combined.set_xlim(0, total_duration)
+        ax_combined.tick_params(axis='x', colors='black')
+        ax_combined.tick_params(axis='y', colors='black')
+        ax_combined.set_xlabel("Time (sec)")
+        ax_combined.set_ylabel("Voltage (V)")
+        ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
+        ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
     with plot_col3:    
-           st.pyplot(fig_combined) # Display the Matplotlib figure in Streamlit.
+           scope.show(setup_combined, fig_key, [(t, y_input), (t, y_output)],
+                      [], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
     # --- Dynamic Parameters Table ---
     st.header("Simulation Results")
@@ -527,72 +487,81 @@ with tab4:
 
 # Display the history as a Pandas DataFrame.
     if st.session_state.simulation_history_schmitt:
-     df_history = pd.DataFrame(st.session_state.simulation_history_schmitt)
+     import pandas as pd
+     history = st.session_state.simulation_history_schmitt
+     df_history = flow.node("results table", (history, len(history)), lambda: pd.DataFrame(history))
     #st.dataframe(df_history, width='stretch', hide_index=True) # use_container_width makes the table responsive.
 
 # Button to clear the table history.
     if st.button("Clear Table History", key="clear_table_button_schmitt"):
       st.session_state.simulation_history_schmitt = [] # Reset the history list.
       st.rerun() # Rerun the app to immediately reflect the cleared table..
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 # --- Postlab Tab ---
 with tab5:
-    st.header("Postlab")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
     
 
 # --- Feedback Tab ---
 with tab6:
+    if tab6.open:
     
-   st.header("Feedback")
-   st.markdown("""
+       st.header("Feedback")
+       st.markdown("""
    We value your feedback to improve this simulator. Please let us know your thoughts.
    """)
-   st.text_input("Your Name")
-   st.text_input("Registration number/Faculty ID")
-   st.slider("How would you rate this simulator?(best -5)", 1, 5)
+       st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+       st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+       st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
   
-   st.text_input("1.  What did you find most useful about this simulator?")
-   st.text_input("2.  Were there any features that were confusing or difficult to use?")
-   st.text_input("3.  What new features would you like to see added in the future?")
+       st.text_input("1.  What did you find most useful about this simulator?", key=sections.page_key(__file__, "feedback_useful"), persist_state="session")
+       st.text_input("2.  Were there any features that were confusing or difficult to use?", key=sections.page_key(__file__, "feedback_confusing"), persist_state="session")
+       st.text_input("3.  What new features would you like to see added in the future?", key=sections.page_key(__file__, "feedback_wishes"), persist_state="session")
   
-   st.text_area("Any other comments or suggestions.", height=200, key="feedback_text")
-   if st.button("Submit Feedback"):
-     st.success("Thank you for your feedback!")
+       st.text_area("Any other comments or suggestions.", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+       if st.button("Submit Feedback"):
+         st.success("Thank you for your feedback!")
@@ -7,16 +7,15 @@ Created on Thu Jul  3 01:35:34 2025
 
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
+from labsim.waveforms import generate_waveform
+from labsim import assets, cache, dataflow, scope, sections
 
 st.set_page_config(layout="wide", page_title="Active Wave Shaping Circuit")
 
 st.title("Active Wave Shaping Circuit Simulator")
 
 # Create the tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 
 mcq_questions = [
     {
@@ -118,7 +117,8 @@ mcq_questions1 = [
 
 # --- Prelab Tab ---
 with tab1:
-    st.markdown("""
+    if tab1.open:
+        st.markdown("""
     **Objective:** To understand the operation of active clipper and clamper circuits using op-amps.
 
     **Pre-requisites:**
@@ -129,52 +129,54 @@ with tab1:
     """)
 
 with tab2:
-    st.header("Prelab")
+    if tab2.open:
+        st.header("Prelab")
   
-    st.subheader("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.subheader("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
 
 # --- Theory Tab ---
 with tab3:
-    st.header("Theory")
-    st.markdown("""
+    if tab3.open:
+        st.header("Theory")
+        st.markdown("""
     Active wave shaping circuits use **operational amplifiers** in conjunction with diodes and other passive components to modify the shape of an input signal. The op-amp provides a high input impedance and a low output impedance, which makes the circuit's performance independent of the load.
 
     ### Clippers (Limiters)
@@ -195,7 +197,10 @@ with tab3:
     """)
 
 # --- Simulation Tab ---
-with tab4:
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     # --- Layout with Columns ---
     # col1 for Function Generator, col2 for Wave Shaping controls, col3 for CRO displays.
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -207,25 +212,27 @@ with tab4:
             "Select Waveform",
             ("Sine wave", "Cosine wave", "Triangular wave", "Square wave"),
             index=0, # Default to Sine wave
-            key="wave_type_radio_shaping" # Unique key for this page's widgets
+            key="wave_type_radio_shaping", # Unique key for this page's widgets
+            persist_state="session"
         )
         # Map string wave type to integer value for compatibility with existing logic.
         wave_type_map = {"Sine wave": 1, "Cosine wave": 2, "Triangular wave": 3, "Square wave": 4}
         selected_wave_type_int = wave_type_map[wave_type]
 
         # Slider for amplitude control.
-        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_shaping")
+        amplitude = st.slider("Amplitude (V)", 0.0, 5.0, 1.0, 0.001, key="amplitude_slider_shaping", persist_state="session")
 
         st.subheader("Frequency")
         # Slider for frequency value.
-        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_shaping")
+        freq_val = st.slider("Frequency Value", 0.0, 1100.0, 100.0, 0.001, key="frequency_slider_shaping", persist_state="session")
         # Radio buttons for frequency unit (Hz, kHz, MHz).
         current_freq_unit = st.radio(
             "Frequency Unit",
             ("Hz", "kHz", "MHz"),
             index=0, # Default to Hz
             horizontal=True,
-            key="freq_unit_radio_shaping"
+            key="freq_unit_radio_shaping",
+            persist_state="session"
         )
 
         # Helper function to convert frequency value based on selected unit.
@@ -246,7 +253,8 @@ with tab4:
             "Select Circuit Type",
             ("Positive Clipper", "Negative Clipper", "Positive Clamper", "Negative Clamper"),
             index=0, # Default to Positive Clipper
-            key="shaping_type_radio"
+            key="shaping_type_radio",
+            persist_state="session"
         )
         # Map string shaping type to integer value.
         shaping_type_map = {
@@ -263,49 +271,13 @@ with tab4:
             value=0.0,
             step=0.1,
             format="%.2f", # Format to 2 decimal places.
-            key="V_ref_input_shaping"
+            key="V_ref_input_shaping",
+            persist_state="session"
         )
 
       
 
     # --- Core Simulation Logic ---
-    def generate_waveform(amp, freq, wave_type_val, num_cycles=3):
-        """
-        Generates the input waveform based on amplitude, frequency, and waveform type.
-        """
-        if freq == 0:
-            sampling_rate = 10000 # Default sampling for DC.
-        else:
-            # Adjust sampling rate based on frequency to ensure enough points per cycle.
-            # At least 100 points per cycle, or a minimum of 1000 points overall.
-            sampling_rate = max(100 * freq, 1000)
-
-        # Calculate total duration for the specified number of cycles.
-        total_duration = num_cycles / freq if freq != 0 else 0.01 # Avoid division by zero, set a small default for DC.
-
-        num_points = int(sampling_rate * total_duration)
-        if num_points < 2:
-            num_points = 2
-
-        # Generate time array.
-        t = np.linspace(0, total_duration, num_points, endpoint=False)
-
-        # Generate waveform based on selected type.
-        if freq == 0: # DC voltage.
-            y = np.full_like(t, amp) # Flat line at amplitude.
-        elif wave_type_val == 1: # Sine wave.
-            y = amp * np.sin(2 * np.pi * freq * t)
-        elif wave_type_val == 2: # Cosine wave.
-            y = amp * np.cos(2 * np.pi * freq * t)
-        elif wave_type_val == 3: # Triangular wave.
-            y = amp * signal.sawtooth(2 * np.pi * freq * t, width=0.5) # width=0.5 for symmetric triangle.
-        elif wave_type_val == 4: # Square wave.
-            y = amp * signal.square(2 * np.pi * freq * t)
-        else:
-            y = np.zeros_like(t) # No waveform selected, return zeros.
-
-        return y, t, amp, total_duration, freq
-
     def get_shaping_circuit_name(shaping_type_value):
         """Returns the name of the wave shaping circuit based on its integer value."""
         if shaping_type_value == 1:
@@ -318,6 +290,7 @@ with tab4:
             return "Negative Clamper"
         return "N/A"
 
+    @cache.memoize
     def simulate_wave_shaping_circuit(amp_input, actual_frequency, selected_wave_type_int,
                                       selected_shaping_type_int, V_ref_val):
         """
@@ -382,102 +355,110 @@ with tab4:
          st.header("Circuit Diagram")
         
          if shaping_type == "Positive Clipper":
-          st.image("images/postiveclipper.png", caption="Positive Clipper Circuit", width='stretch')
+          assets.show("images/postiveclipper.png", caption="Positive Clipper Circuit", width='stretch')
          elif shaping_type== "Negative Clipper":
-          st.image("images/negativeclipper.png", caption="Negative Clipper Circuit", width='stretch')
+          assets.show("images/negativeclipper.png", caption="Negative Clipper Circuit", width='stretch')
          elif shaping_type== "Positive Clamper":
-          st.image("images/positiveclamper.png", caption="Positive Clamper Circuit", width='stretch')
+          assets.show("images/positiveclamper.png", caption="Positive Clamper Circuit", width='stretch')
          elif shaping_type== "Negative Clamper":
-          st.image("images/negativeclamper.png", caption="Negative Clamper Circuit", width='stretch')
+          assets.show("images/negativeclamper.png", caption="Negative Clamper Circuit", width='stretch')
         
     st.header("CRO Displays")
     plot_col1, plot_col2, plot_col3 = st.columns(3) 
-    st.text_input("Your Name",key="p2")
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
         # Perform the simulation based on current widget values.
     y_input, y_output, t, amp_input, total_duration, input_freq, input_time_s, \
-    V_ref_val, output_high, output_low, shaping_circuit_name = simulate_wave_shaping_circuit(
+    V_ref_val, output_high, output_low, shaping_circuit_name = flow.call("circuit", simulate_wave_shaping_circuit,
             amplitude, actual_frequency, selected_wave_type_int,
             selected_shaping_type_int, V_ref
         )
-
-        # Plotting for CRO Channel 1 (Input Signal).
-    fig1, ax1 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax1.plot(t, y_input, color='lime')
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
-        
-        # Plot V_ref line on input graph for better visualization.
-    ax1.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
-    ax1.legend(loc='lower left', fontsize=7, facecolor='darkgray', edgecolor='white')
+    fig_key = simulate_wave_shaping_circuit.cache_key(
+        amplitude, actual_frequency, selected_wave_type_int,
+        selected_shaping_type_int, V_ref
+    )
 
         # Adjust Y-axis limits to include input amplitude and V_ref, with padding.
     max_plot_amp_input = max(amp_input * 1.5, abs(V_ref_val) * 1.2)
     if max_plot_amp_input == 0: max_plot_amp_input = 1 # Ensure a minimum range if all values are 0.
-    ax1.set_ylim(-max_plot_amp_input, max_plot_amp_input)
+        # Set Y-axis limits based on the output signal's range, with padding.
+        # Ensure a minimum range even if output is flat.
+    max_plot_amp_output = max(abs(output_high), abs(output_low)) * 1.2
+    if max_plot_amp_output == 0: max_plot_amp_output = 1
+
+        # Plotting for CRO Channel 1 (Input Signal).
+    def setup_input(ax1):
+        scope.trace(ax1, color='lime')
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
+        
+            # Plot V_ref line on input graph for better visualization.
+        ax1.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
+        ax1.legend(loc='lower left', fontsize=7, facecolor='darkgray', edgecolor='white')
+
+        ax1.set_ylim(-max_plot_amp_input, max_plot_amp_input)
          
-    ax1.set_xlim(0, total_duration)
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
-    ax1.set_xlabel("Time (sec)")
-    ax1.set_ylabel("Voltage (V)")
-    ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
-    ax1.text(0.02, 0.95, f'Amp: {amp_input:.2f} V', transform=ax1.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
+        ax1.set_xlabel("Time (sec)")
+        ax1.set_ylabel("Voltage (V)")
+        ax1.set_title("Ch 1: Input Signal", color='black', fontsize=10)
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col1:    
-        st.pyplot(fig1) # Display the Matplotlib figure in Streamlit.
+        scope.show(setup_input, fig_key, [(t, y_input)],
+                   [f'Amp: {amp_input:.2f} V'], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
         # Plotting for CRO Channel 2 (Output Signal).
-    fig2, ax2 = plt.subplots(figsize=(3, 2), dpi=100)
-    ax2.plot(t, y_output, color='cyan')
-    ax2.set_facecolor("black")
-    ax2.axhline(0, color='gray', linewidth=0.5)
-    ax2.axvline(0, color='gray', linewidth=0.5)
+    def setup_output(ax2):
+        scope.trace(ax2, color='cyan')
+        ax2.set_facecolor("black")
+        ax2.axhline(0, color='gray', linewidth=0.5)
+        ax2.axvline(0, color='gray', linewidth=0.5)
         
-        # Set Y-axis limits based on the output signal's range, with padding.
-        # Ensure a minimum range even if output is flat.
-    max_plot_amp_output = max(abs(output_high), abs(output_low)) * 1.2
-    if max_plot_amp_output == 0: max_plot_amp_output = 1
-    ax2.set_ylim(-max_plot_amp_output, max_plot_amp_output)
+        ax2.set_ylim(-max_plot_amp_output, max_plot_amp_output)
         
-    ax2.set_xlim(0, total_duration)
-    ax2.tick_params(axis='x', colors='black')
-    ax2.tick_params(axis='y', colors='black')
-    ax2.set_xlabel("Time (sec)")
-    ax2.set_ylabel("Voltage (V)")
-    ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
-    ax2.text(0.02, 0.95, f'Output High: {output_high:.2f} V', transform=ax2.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
-    ax2.text(0.02, 0.85, f'Output Low: {output_low:.2f} V', transform=ax2.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
+        ax2.set_xlim(0, total_duration)
+        ax2.tick_params(axis='x', colors='black')
+        ax2.tick_params(axis='y', colors='black')
+        ax2.set_xlabel("Time (sec)")
+        ax2.set_ylabel("Voltage (V)")
+        ax2.set_title("Ch 2: Output Signal", color='black', fontsize=10)
+        scope.readout(ax2, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+        scope.readout(ax2, 0.02, 0.85,
+                      fontsize=8, color='white', verticalalignment='top')
     with plot_col2:     
-        st.pyplot(fig2) # Display the Matplotlib figure in Streamlit.
+        scope.show(setup_output, fig_key, [(t, y_output)],
+                   [f'Output High: {output_high:.2f} V', f'Output Low: {output_low:.2f} V'], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
         # Plotting for Combined View (Channel 1 & 2).
-    fig_combined, ax_combined = plt.subplots(figsize=(3, 2), dpi=100)
-    ax_combined.plot(t, y_input, color='lime', label='Input (Ch 1)')
-    ax_combined.plot(t, y_output, color='cyan', label='Output (Ch 2)')
-    ax_combined.set_facecolor("black")
-    ax_combined.axhline(0, color='gray', linewidth=0.5)
-    ax_combined.axvline(0, color='gray', linewidth=0.5)
+    def setup_combined(ax_combined):
+        scope.trace(ax_combined, color='lime', label='Input (Ch 1)')
+        scope.trace(ax_combined, color='cyan', label='Output (Ch 2)')
+        ax_combined.set_facecolor("black")
+        ax_combined.axhline(0, color='gray', linewidth=0.5)
+        ax_combined.axvline(0, color='gray', linewidth=0.5)
         
-        # Plot V_ref line on combined graph.
-    ax_combined.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
+            # Plot V_ref line on combined graph.
+        ax_combined.axhline(V_ref_val, color='red', linestyle='--', linewidth=1, label=f'V_ref={V_ref_val:.2f}V')
 
-        # Determine combined Y-axis limit.
-    max_combined_amp = max(max_plot_amp_input, max_plot_amp_output)
-    if max_combined_amp == 0: max_combined_amp = 1
-    ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
+            # Determine combined Y-axis limit.
+        max_combined_amp = max(max_plot_amp_input, max_plot_amp_output)
+        if max_combined_amp == 0: max_combined_amp = 1
+        ax_combined.set_ylim(-max_combined_amp, max_combined_amp)
         
-    ax_combined.set_xlim(0, total_duration)
-    ax_combined.tick_params(axis='x', colors='black')
-    ax_combined.tick_params(axis='y', colors='black')
-    ax_combined.set_xlabel("Time (sec)")
-    ax_combined.set_ylabel("Voltage (V)")
-    ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
-    ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
+        ax_combined.set_xlim(0, total_duration)
+        ax_combined.tick_params(axis='x', colors='black')
+        ax_combined.tick_params(axis='y', colors='black')
+        ax_combined.set_xlabel("Time (sec)")
+        ax_combined.set_ylabel("Voltage (V)")
+        ax_combined.set_title("Combined View (Ch 1 & Ch 2)", color='black', fontsize=10)
+        ax_combined.legend(loc='upper right', fontsize=8, facecolor='darkgray', edgecolor='white')
     with plot_col3:     
-        st.pyplot(fig_combined) # Display the Matplotlib figure in Streamlit.
+        scope.show(setup_combined, fig_key, [(t, y_input), (t, y_output)],
+                   [], figsize=(3, 2), dpi=100, flow=flow) # Display the rendered figure in Streamlit.
 
     # --- Dynamic Parameters Table ---
     st.header("Simulation Results")
@@ -502,70 +483,79 @@ with tab4:
 
     # Display the history as a Pandas DataFrame.
     if st.session_state.simulation_history_shaping:
-        df_history = pd.DataFrame(st.session_state.simulation_history_shaping)
+        import pandas as pd
+        history = st.session_state.simulation_history_shaping
+        df_history = flow.node("results table", (history, len(history)), lambda: pd.DataFrame(history))
         st.dataframe(df_history, width='stretch') # use_container_width makes the table responsive.
 
     # Button to clear the table history.
     if st.button("Clear Table History", key="clear_table_button_shaping"):
         st.session_state.simulation_history_shaping = [] # Reset the history list.
         st.rerun() # Rerun the app to immediately reflect the cleared table.
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 # --- Postlab Tab ---
 with tab5:
-    st.header("Postlab")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
 
 # --- Feedback Tab ---
 with tab6:
-   st.header("Feedback")
-   st.markdown("""
+    if tab6.open:
+       st.header("Feedback")
+       st.markdown("""
    We value your feedback to improve this simulator. Please let us know your thoughts.
    """)
-   st.text_input("Your Name")
-   st.text_input("Registration number/Faculty ID")
-   st.slider("How would you rate this simulator?(best -5)", 1, 5)
+       st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+       st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+       st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
   
-   st.text_input("1.  What did you find most useful about this simulator?")
-   st.text_input("2.  Were there any features that were confusing or difficult to use?")
-   st.text_input("3.  What new features would you like to see added in the future?")
+       st.text_input("1.  What did you find most useful about this simulator?", key=sections.page_key(__file__, "feedback_useful"), persist_state="session")
+       st.text_input("2.  Were there any features that were confusing or difficult to use?", key=sections.page_key(__file__, "feedback_confusing"), persist_state="session")
+       st.text_input("3.  What new features would you like to see added in the future?", key=sections.page_key(__file__, "feedback_wishes"), persist_state="session")
   
-   st.text_area("Any other comments or suggestions.", height=200, key="feedback_text")
-   if st.button("Submit Feedback"):
-     st.success("Thank you for your feedback!")
+       st.text_area("Any other comments or suggestions.", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+       if st.button("Submit Feedback"):
+         st.success("Thank you for your feedback!")
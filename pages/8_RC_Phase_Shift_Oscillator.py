@@ -8,16 +8,14 @@ Created on Thu Jul  3 01:38:39 2025
 # pages/7_RC_Phase_Shift_Oscillator.py
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import pandas as pd
+from labsim import assets, cache, dataflow, oscillators, scope, sections
 
 st.set_page_config(layout="wide", page_title="RC Phase Shift Oscillator")
 
 st.title("RC Phase Shift Oscillator Simulator")
 
 # Create the tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Objective", "Prelab", "Theory", "Simulation", "Postlab", "Feedback"])
+tab1, tab2, tab3, tab4, tab5, tab6 = sections.lab_tabs(__file__)
 mcq_questions = [
     {
         "question":("The primary purpose of the op-amp in an RC phase shift oscillator is:"),
@@ -122,8 +120,9 @@ mcq_questions1 = [
 # --- Prelab Tab ---
 
 with tab1:
+    if tab1.open:
     
-    st.markdown("""
+        st.markdown("""
     **Objective:** To understand the operation of an RC phase shift oscillator and verify the conditions for sustained oscillation.
 
     **Pre-requisites:**
@@ -135,53 +134,55 @@ with tab1:
 
 
 with tab2:
-    st.header("Prelab")
+    if tab2.open:
+        st.header("Prelab")
     
     
-    st.subheader("Multiple Choice Questions (MCQ)")
-    st.text_input("Your Name",key="p1")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions):
-       question_number = i + 1  # Calculates the question number starting from 1
-     # Display the question with the number prepended
-       question_prompt = f"**Question {question_number}**: {mcq['question']}"
+        st.subheader("Multiple Choice Questions (MCQ)")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p1"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions):
+           question_number = i + 1  # Calculates the question number starting from 1
+         # Display the question with the number prepended
+           question_prompt = f"**Question {question_number}**: {mcq['question']}"
        
-       # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-       user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcqp_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq1"):
-       st.subheader("Results")
-       # Initialize score variables
-       correct_count = 0
-       total_questions = len(mcq_questions)
+           # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+           user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcqp_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq1"):
+           st.subheader("Results")
+           # Initialize score variables
+           correct_count = 0
+           total_questions = len(mcq_questions)
        
-       all_correct = True
-       for i, mcq in enumerate(mcq_questions):
-           correct_answer = mcq["options"][mcq["correct_option_index"]]
-           if user_answers[i] == correct_answer:
-               st.success(f"**Question {i+1}: Correct!** ✅")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               correct_count += 1  # Increment the score
-           else:
-               st.error(f"**Question {i+1}: Incorrect.** ❌")
-               st.markdown(f"**Correct Answer:** {correct_answer}")
-               st.markdown(f"**Explanation:** {mcq['explanation']}")
-               all_correct = False
-       # Display the final score immediately after the per-question results
-       st.markdown("---")
-       st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-       st.markdown("---")
+           all_correct = True
+           for i, mcq in enumerate(mcq_questions):
+               correct_answer = mcq["options"][mcq["correct_option_index"]]
+               if user_answers[i] == correct_answer:
+                   st.success(f"**Question {i+1}: Correct!** ✅")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   correct_count += 1  # Increment the score
+               else:
+                   st.error(f"**Question {i+1}: Incorrect.** ❌")
+                   st.markdown(f"**Correct Answer:** {correct_answer}")
+                   st.markdown(f"**Explanation:** {mcq['explanation']}")
+                   all_correct = False
+           # Display the final score immediately after the per-question results
+           st.markdown("---")
+           st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+           st.markdown("---")
        
-       if all_correct:
-           st.balloons()
-           st.info("You've answered all questions correctly! . 🎉")
-       else:
-           st.warning("Please review the theory and try again. 🤔")
+           if all_correct:
+               st.balloons()
+               st.info("You've answered all questions correctly! . 🎉")
+           else:
+               st.warning("Please review the theory and try again. 🤔")
 
 # --- Theory Tab ---
 with tab3:
-    st.header("Theory")
-    st.markdown(r"""
+    if tab3.open:
+        st.header("Theory")
+        st.markdown(r"""
     An **RC phase shift oscillator** is a type of electronic oscillator that generates a sine wave output. It is composed of a three-stage RC ladder network and an inverting amplifier (typically an op-amp).
 
     ### Principle of Operation
@@ -206,7 +207,24 @@ with tab3:
     """)
 
 # --- Simulation Tab ---
-with tab4:
+@cache.memoize
+def simulate_startup(R_kohm, C_uF, gain):
+    t, y, f_simulated, settled = oscillators.phase_shift_startup(R_kohm * 1000, C_uF * 1e-6, gain)
+    rms, _ = oscillators.cycle_envelope(y)
+    return {
+        "t_time": t,
+        "y_signal": y,
+        "f_simulated": f_simulated,
+        "settled": settled,
+        "cycles": len(rms),
+        "output_amplitude": float(np.abs(y[-len(y) // 10:]).max()),
+        "total_duration": t[-1],
+    }
+
+# Widgets in here rerun only this fragment, not the other tabs.
+@st.fragment
+def simulation_tab():
+    flow = dataflow.page_flow(__file__)
     # --- Layout with Columns ---
     col1, col2, col3 = st.columns([1, 1, 2])
 
@@ -220,7 +238,8 @@ with tab4:
             value=10.0,
             step=0.1,
             format="%.2f",
-            key="R_input_oscillator"
+            key="R_input_oscillator",
+            persist_state="session"
         )
         
         # Number input for Capacitance (C) in µF.
@@ -230,7 +249,8 @@ with tab4:
             value=0.1,
             step=0.001,
             format="%.3f",
-            key="C_input_oscillator"
+            key="C_input_oscillator",
+            persist_state="session"
         )
         
         # Number input for Desired Signal Frequency.
@@ -240,8 +260,27 @@ with tab4:
             value=100.0,
             step=1.0,
             format="%.1f",
-            key="f_desired_input_oscillator"
+            key="f_desired_input_oscillator",
+            persist_state="session"
+        )
+
+        startup = st.checkbox(
+            "Simulate start-up transient",
+            value=False,
+            key="startup_checkbox_oscillator",
+            persist_state="session"
         )
+        if startup:
+            gain = st.number_input(
+                "Amplifier Gain (RF/R1)",
+                min_value=1.0,
+                max_value=300.0,
+                value=30.0,
+                step=0.5,
+                format="%.1f",
+                key="gain_input_oscillator",
+                persist_state="session"
+            )
         
       
 
@@ -258,10 +297,10 @@ with tab4:
             try:
                 f_observed = 1 / (2 * np.pi * R_ohms * C_farads * np.sqrt(6))
             except ZeroDivisionError:
-                st.error("R or C cannot be zero for frequency calculation.")
+                cache.error("R or C cannot be zero for frequency calculation.")
                 f_observed = 0.0
         else:
-            st.warning("Resistance (R) and Capacitance (C) must be positive for oscillation.")
+            cache.warning("Resistance (R) and Capacitance (C) must be positive for oscillation.")
             f_observed = 0.0
             
         if f_desired > 0 and C_farads > 0:
@@ -269,7 +308,7 @@ with tab4:
                 R_calc_ohms_for_desired = 1 / (2 * np.pi * f_desired * C_farads * np.sqrt(6))
                 R_calculated_kohm_for_desired = R_calc_ohms_for_desired / 1000
             except ZeroDivisionError:
-                st.error("Desired frequency or capacitance cannot be zero for R calculation.")
+                cache.error("Desired frequency or capacitance cannot be zero for R calculation.")
                 R_calculated_kohm_for_desired = 0.0
         else:
             R_calculated_kohm_for_desired = 0.0
@@ -311,7 +350,7 @@ with tab4:
     with col2:    
             st.header("Calculated Values")
     # 3. RUN THE CALCULATION (Crucial step - must be after inputs, but before outputs)
-            sim_results = calculate_oscillation_parameters(R_kohm, C_uF, f_desired)
+            sim_results = flow.call("circuit", calculate_oscillation_parameters, R_kohm, C_uF, f_desired)
     # st.metric requires: label, value (formatted as a string if you want decimals)
             st.metric(
               label="Calculated Frequency (f)",
@@ -323,40 +362,71 @@ with tab4:
               label="Required R (for Desired Freq)",
               value=f"{sim_results['R_calculated_kohm_for_desired']:.2f} kΩ"
              )
+            if startup:
+                startup_results = flow.call("start-up", simulate_startup, R_kohm, C_uF, gain)
+                f_formula = sim_results["f_output"]
+                f_simulated = startup_results["f_simulated"]
+                st.metric(
+                  label="Simulated Frequency (f)",
+                  value=f"{f_simulated:.2f} Hz",
+                  delta=f"{(f_simulated - f_formula) / f_formula * 100:+.2f} % vs formula" if f_formula and f_simulated else None,
+                  delta_color="off"
+                 )
           
 
     # --- CRO Display and Simulation Results ---
     with col3:
         st.header("Circuit Diagram")
         
-        st.image("images/RCphaseshiftoscillator.png", caption="RC Phaseshift Oscillator Circuit", width='stretch')
+        assets.show("images/RCphaseshiftoscillator.png", caption="RC Phaseshift Oscillator Circuit", width='stretch')
         
     st.subheader("CRO Display")
-    st.text_input("Your Name",key="p2")
-    sim_results = calculate_oscillation_parameters(R_kohm, C_uF, f_desired)
+    st.text_input("Your Name",key=sections.page_key(__file__, "p2"), persist_state="session")
+    sim_results = flow.call("circuit", calculate_oscillation_parameters, R_kohm, C_uF, f_desired)
+    fig_key = (R_kohm, C_uF, f_desired)
+    # Set Y-axis limits based on the output amplitude, with some padding.
+    plot_ylim = sim_results["output_amplitude"] * 1.5 if sim_results["output_amplitude"] != 0 else 1.0
+    total_duration = sim_results["total_duration"]
+    trace_t, trace_y = sim_results["t_time"], sim_results["y_signal"]
+    readouts = [f'Amp: {sim_results["output_amplitude"]:.2f} V', f'Freq: {sim_results["f_output"]:.2f} Hz']
+    if startup:
+        fig_key = (R_kohm, C_uF, gain, "start-up")
+        plot_ylim = max(startup_results["output_amplitude"] * 1.2, oscillators.SEED * 10)
+        total_duration = startup_results["total_duration"]
+        trace_t, trace_y = startup_results["t_time"], startup_results["y_signal"]
+        readouts = [f'Amp: {startup_results["output_amplitude"]:.2f} V',
+                    f'Freq: {startup_results["f_simulated"]:.2f} Hz (simulated)']
+        if startup_results["settled"]:
+            st.caption(f"From a {oscillators.SEED * 1e3:.0f} mV noise seed the amplitude settled after "
+                       f"{startup_results['cycles']} cycles.")
+        elif gain < 29:
+            st.caption(f"With a gain of {gain:.1f} (below 29) the loop loses more than it gains each "
+                       f"cycle: the oscillation dies out after {startup_results['cycles']} cycles.")
+        else:
+            st.caption(f"The amplitude had not settled after {oscillators.MAX_CYCLES} cycles.")
 
         # Plotting for Output Signal (CH1)
-    fig1, ax1 = plt.subplots(figsize=(6, 3), dpi=100)
-    ax1.plot(sim_results["t_time"], sim_results["y_signal"], color='red')
-    ax1.set_title("Oscillator Output Signal")
-    ax1.set_xlabel("Time (sec)")
-    ax1.set_ylabel("Amplitude (V)")
-    ax1.grid(True)
-    ax1.set_facecolor("black")
-    ax1.axhline(0, color='gray', linewidth=0.5)
-    ax1.axvline(0, color='gray', linewidth=0.5)
+    def setup_output(ax1):
+        scope.trace(ax1, color='red')
+        ax1.set_title("Oscillator Output Signal")
+        ax1.set_xlabel("Time (sec)")
+        ax1.set_ylabel("Amplitude (V)")
+        ax1.grid(True)
+        ax1.set_facecolor("black")
+        ax1.axhline(0, color='gray', linewidth=0.5)
+        ax1.axvline(0, color='gray', linewidth=0.5)
         
-    plot_ylim = sim_results["output_amplitude"] * 1.5 if sim_results["output_amplitude"] != 0 else 1.0
-    ax1.set_ylim(-plot_ylim, plot_ylim)
-    ax1.set_xlim(0, sim_results["total_duration"])
-    ax1.tick_params(axis='x', colors='black')
-    ax1.tick_params(axis='y', colors='black')
+        ax1.set_ylim(-plot_ylim, plot_ylim)
+        ax1.set_xlim(0, total_duration)
+        ax1.tick_params(axis='x', colors='black')
+        ax1.tick_params(axis='y', colors='black')
         
-    ax1.text(0.02, 0.95, f'Amp: {sim_results["output_amplitude"]:.2f} V', transform=ax1.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
-    ax1.text(0.02, 0.85, f'Freq: {sim_results["f_output"]:.2f} Hz', transform=ax1.transAxes,
-                  fontsize=8, color='white', verticalalignment='top')
-    st.pyplot(fig1)
+        scope.readout(ax1, 0.02, 0.95,
+                      fontsize=8, color='white', verticalalignment='top')
+        scope.readout(ax1, 0.02, 0.85,
+                      fontsize=8, color='white', verticalalignment='top')
+    scope.show(setup_output, fig_key, [(trace_t, trace_y)],
+               readouts, figsize=(6, 3), dpi=100, flow=flow)
 
     
 
@@ -414,63 +484,70 @@ with tab4:
     if st.button("Clear Table History", key="clear_table_button_oscillator"):
         st.session_state.oscillator_history = []
         st.rerun()
+    flow.report()
+
+with tab4:
+    if tab4.open:
+        simulation_tab()
 
 # --- Postlab Tab ---
 with tab5:
-    st.header("Postlab")
-    st.text_input("Your Name",key="p3")
-    user_answers = {}
-    for i, mcq in enumerate(mcq_questions1):
-        question_number = i + 1  # Calculates the question number starting from 1
-      # Display the question with the number prepended
-        question_prompt = f"**Question {question_number}**: {mcq['question']}"
+    if tab5.open:
+        st.header("Postlab")
+        st.text_input("Your Name",key=sections.page_key(__file__, "p3"), persist_state="session")
+        user_answers = {}
+        for i, mcq in enumerate(mcq_questions1):
+            question_number = i + 1  # Calculates the question number starting from 1
+          # Display the question with the number prepended
+            question_prompt = f"**Question {question_number}**: {mcq['question']}"
         
-        # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
-        user_answers[i] = st.radio(question_prompt, mcq["options"], key=f"mcq_{i}")
-
-    if st.button("Submit Answers", key="submit_mcq"):
-        st.subheader("Results")
-        # Initialize score variables
-        correct_count = 0
-        total_questions = len(mcq_questions1)
+            # *** FIX HERE: Use question_prompt instead of mcq["question"] ***
+            user_answers[i] = st.radio(question_prompt, mcq["options"], key=sections.page_key(__file__, f"mcq_{i}"), persist_state="session")
+
+        if st.button("Submit Answers", key="submit_mcq"):
+            st.subheader("Results")
+            # Initialize score variables
+            correct_count = 0
+            total_questions = len(mcq_questions1)
         
-        all_correct = True
-        for i, mcq in enumerate(mcq_questions1):
-            correct_answer = mcq["options"][mcq["correct_option_index"]]
-            if user_answers[i] == correct_answer:
-                st.success(f"**Question {i+1}: Correct!** ✅")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                correct_count += 1  # Increment the score
-            else:
-                st.error(f"**Question {i+1}: Incorrect.** ❌")
-                st.markdown(f"**Correct Answer:** {correct_answer}")
-                st.markdown(f"**Explanation:** {mcq['explanation']}")
-                all_correct = False
-        # Display the final score immediately after the per-question results
-        st.markdown("---")
-        st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
-        st.markdown("---")
+            all_correct = True
+            for i, mcq in enumerate(mcq_questions1):
+                correct_answer = mcq["options"][mcq["correct_option_index"]]
+                if user_answers[i] == correct_answer:
+                    st.success(f"**Question {i+1}: Correct!** ✅")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    correct_count += 1  # Increment the score
+                else:
+                    st.error(f"**Question {i+1}: Incorrect.** ❌")
+                    st.markdown(f"**Correct Answer:** {correct_answer}")
+                    st.markdown(f"**Explanation:** {mcq['explanation']}")
+                    all_correct = False
+            # Display the final score immediately after the per-question results
+            st.markdown("---")
+            st.subheader(f"📊 Final Score: {correct_count} / {total_questions}")
+            st.markdown("---")
         
-        if all_correct:
-            st.balloons()
-            st.info("You've answered all questions correctly! . 🎉")
-        else:
-            st.warning("Please review the theory and try again. 🤔")
+            if all_correct:
+                st.balloons()
+                st.info("You've answered all questions correctly! . 🎉")
+            else:
+                st.warning("Please review the theory and try again. 🤔")
 
 # --- Feedback Tab ---
 with tab6:
-    st.header("Feedback")
-    st.markdown("""
+    if tab6.open:
+        st.header("Feedback")
+        st.markdown("""
     We value your feedback to improve this simulator. Please let us know your thoughts.
     """)
-    st.text_input("Your Name")
-    st.text_input("Registration number/Faculty ID")
-    st.slider("How would you rate this simulator?(best -5)", 1, 5)
+        st.text_input("Your Name", key=sections.page_key(__file__, "feedback_name"), persist_state="session")
+        st.text_input("Registration number/Faculty ID", key=sections.page_key(__file__, "feedback_id"), persist_state="session")
+        st.slider("How would you rate this simulator?(best -5)", 1, 5, key=sections.page_key(__file__, "feedback_rating"), persist_state="session")
    
-    st.text_input("1.  What did you find most useful about this simulator?")
-    st.text_input("2.  Were there any features that were confusing or difficult to use?")
-    st.text_input("3.  What new features would you like to see added in the future?")
+        st.text_input("1.  What did you find most useful about this simulator?", key=sections.page_key(__file__, "feedback_useful"), persist_state="session")
+        st.text_input("2.  Were there any features that were confusing or difficult to use?", key=sections.page_key(__file__, "feedback_confusing"), persist_state="session")
+        st.text_input("3.  What new features would you like to see added in the future?", key=sections.page_key(__file__, "feedback_wishes"), persist_state="session")
    
-    st.text_area("Any other comments or suggestions.", height=200, key="feedback_text")
-    if st.button("Submit Feedback"):
-      st.success("Thank you for your feedback!")
\ No newline at end of file
+        st.text_area("Any other comments or suggestions.", height=200, key=sections.page_key(__file__, "feedback_text"), persist_state="session")
+        if st.button("Submit Feedback"):
+          st.success("Thank you for your feedback!")
\ No newline at end of file
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Makes ``labsim`` importable when pytest is run from any directory."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
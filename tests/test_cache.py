@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Keys, arguments and messages of ``cache.memoize``."""
+
+import numpy as np
+import pytest
+
+from labsim import cache, dataflow
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear_cache()
+    yield
+    cache.clear_cache()
+
+
+def test_runs_on_the_arguments_as_given():
+    @cache.memoize
+    def echo(x, scale=1.0):
+        return x * scale
+
+    assert echo(123.4) == 123.4
+    assert echo(1005.0, scale=0.00015) == 1005.0 * 0.00015
+
+
+def test_float_noise_shares_an_entry():
+    @cache.memoize
+    def echo(x):
+        return np.array([x])
+
+    echo(0.1 + 0.2)
+    echo(0.3)
+    echo(0.301)
+    info = echo.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+    assert not echo(0.3).flags.writeable
+
+
+def test_one_slider_step_shares_a_key():
+    @cache.memoize
+    def echo(x):
+        return x
+
+    assert echo.cache_key(100.0) == echo.cache_key(100.0004)
+    assert echo.cache_key(100.0) != echo.cache_key(100.001)
+    assert echo.cache_key(0.0001) != echo.cache_key(0.0004)
+    assert echo(100.0004) == 100.0004
+    assert echo(100.0) == 100.0004
+
+
+def test_hits_inside_a_flow_node_keep_their_messages():
+    @cache.memoize
+    def simulate(x):
+        cache.warning("clipped")
+        return x
+
+    flow = dataflow.Flow()
+    for label in ("first", "second", "second"):
+        flow.begin()
+        result, messages = cache.record(flow.node, "sim", (1.0, label), lambda: simulate(1.0))
+        assert messages == (("warning", "clipped"),)
+    assert simulate.cache_info().hits == 1
+    assert flow.recomputed() == []
+
+
+def test_lru_bounds():
+    store = cache.LRUCache(maxsize=2, maxbytes=100)
+    store.put("a", 1, 10)
+    store.put("b", 2, 10)
+    store.get("a")
+    store.put("c", 3, 10)
+    assert store.get("b", None) is None and store.get("a") == 1
+    store.put("d", 4, 95)
+    assert store.info().currsize == 1
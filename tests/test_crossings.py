@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Sub-sample accuracy of ``crossings.edges`` and the derived timing."""
+
+import numpy as np
+
+from labsim import crossings
+
+
+def test_edges_sub_sample():
+    freq, points = 50.0, 40  # 40 samples per cycle
+    t = np.linspace(0, 0.1, 5 * points, endpoint=False)
+    dt = t[1] - t[0]
+    found = crossings.edges(np.sin(2 * np.pi * freq * t + 0.3), t, level=0.5)
+    # sin(phi) = 0.5 at phi = pi/6 (rising) and 5 pi/6 (falling).
+    phase = np.where(found.rising, np.pi / 6, 5 * np.pi / 6) - 0.3
+    cycles = np.floor(found.times * freq - phase / (2 * np.pi) + 0.5)
+    exact = (phase / (2 * np.pi) + cycles) / freq
+    assert len(found.times) == 10
+    # Thresholding the samples would be off by up to a whole sample.
+    assert np.abs(found.times - exact).max() < 0.02 * dt
+
+
+def test_timing_of_pwm():
+    t = np.linspace(0, 1, 20000, endpoint=False)
+    # Sawtooth against 0.3: high 70 % of each 10 Hz cycle.
+    saw = (t * 10) % 1
+    found = crossings.edges(saw, t, level=0.3)
+    timing = crossings.timing(found)
+    assert np.isclose(timing.duty_cycle, 0.7, atol=1e-3)
+    assert np.isclose(timing.frequency, 10.0, rtol=1e-6)
+    assert timing.jitter < 1e-9
+    np.testing.assert_allclose(timing.high_widths, 0.07, atol=1e-4)
+
+
+def test_band_ignores_noise():
+    rng = np.random.default_rng(1)
+    t = np.linspace(0, 1, 50000, endpoint=False)
+    y = np.cos(2 * np.pi * 5 * t) + rng.normal(0, 0.02, len(t))
+    assert len(crossings.edges(y, t).times) > 10
+    found = crossings.edges(y, t, band=0.3)
+    assert len(found.times) == 10
+    np.testing.assert_array_equal(found.rising, np.arange(10) % 2 == 1)
+
+
+def test_slewed_ramps():
+    found = crossings.Edges(np.array([1.0, 2.0]), np.array([True, False]), False)
+    times, values = crossings.slewed(found, 0.0, 4.0, 10.0, -10.0, slew_rate=40.0, delay=0.1)
+    np.testing.assert_allclose(times, [0.0, 1.1, 1.6, 2.1, 2.6, 4.0])
+    np.testing.assert_allclose(values, [-10, -10, 10, 10, -10, -10])
+
+
+def test_slewed_stops_at_the_window():
+    found = crossings.Edges(np.array([1.0, 3.8]), np.array([True, False]), False)
+    times, values = crossings.slewed(found, 0.0, 4.0, 10.0, -10.0, slew_rate=40.0, delay=0.1)
+    # The last ramp starts at 3.9 and is cut off at 4.0, 4 V down from 10 V.
+    np.testing.assert_allclose(times, [0.0, 1.1, 1.6, 3.9, 4.0])
+    np.testing.assert_allclose(values, [-10, -10, 10, 10, 6])
+    times, _ = crossings.slewed(found, 0.0, 1.3, 10.0, -10.0, slew_rate=40.0, delay=0.1)
+    assert times[-1] == 1.3
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Periodic steady state and chunking of the filter kernels."""
+
+import numpy as np
+import pytest
+
+from labsim import filters, waveforms
+
+pytest.importorskip("scipy")
+
+
+def square(freq=100.0, points=3000, cycles=3, amp=1.0):
+    """``cycles`` identical periods of a square wave, and the sample spacing."""
+    per_cycle = points // cycles
+    t = waveforms.time_base(per_cycle, 1 / freq)
+    return np.tile(waveforms.square(t, freq, amp), cycles), t[1] - t[0]
+
+
+@pytest.mark.parametrize("filter_type", [filters.LOWPASS, filters.HIGHPASS])
+@pytest.mark.parametrize("fc", [10.0, 159.0, 1e4])
+def test_filter_periodic_repeats(filter_type, fc):
+    x, dt = square()
+    sos = filters.first_order_sos(filter_type, fc, 2.0, 1 / dt)
+    y = filters.filter_periodic(sos, x)
+    # The window after it, filtered on from the end state, is the same.
+    section = filters.SOSFilter(sos, filters.periodic_steady_state(sos, x))
+    section.advance(x)
+    np.testing.assert_allclose(section.run(x), y, rtol=0, atol=1e-9)
+    # A capture of three cycles is three copies of one.
+    cycle = len(x) // 3
+    np.testing.assert_allclose(y[cycle:2 * cycle], y[:cycle], rtol=0, atol=1e-9)
+
+
+# Square waves with the cutoff far above the page's sample rate (100 per cycle).
+@pytest.mark.parametrize("freq, fc", [(100.0, 15.9e3), (10.0, 1.59e3), (1e3, 1e3), (10.0, 0.1)])
+def test_lowpass_square_stays_within_gain(freq, fc):
+    x, dt = square(freq=freq, points=300)
+    gain = 2.0
+    y = filters.filter_periodic(filters.first_order_sos(filters.LOWPASS, fc, gain, 1 / dt), x)
+    assert np.abs(y).max() <= gain * np.abs(x).max() + 1e-12
+
+
+@pytest.mark.parametrize("filter_type", [filters.LOWPASS, filters.HIGHPASS])
+def test_sections_match_analog_response(filter_type):
+    # A sine well sampled: amplitude and phase of the analog filter.
+    freq, fc, points = 50.0, 80.0, 4000
+    t = waveforms.time_base(points, 1 / freq)
+    x = waveforms.sine(t, freq)
+    y = filters.filter_periodic(filters.first_order_sos(filter_type, fc, 3.0, points * freq), x)
+    magnitude_db, phase = filters.frequency_response(filter_type, fc, 3.0, [freq])
+    expected = 10 ** (magnitude_db[0] / 20) * np.sin(2 * np.pi * freq * t + np.radians(phase[0]))
+    np.testing.assert_allclose(y, expected, rtol=0, atol=1e-5)
+
+
+def test_chunks_do_not_change_output():
+    x, dt = square(points=5000)
+    sos = filters.first_order_sos(filters.LOWPASS, 300.0, 1.0, 1 / dt)
+    whole = filters.filter_periodic(sos, x)
+    np.testing.assert_allclose(filters.filter_periodic(sos, x, chunk_size=777), whole, rtol=0, atol=1e-12)
+
+
+def test_lag_periodic_repeats():
+    x, dt = square()
+    tau = 50.0  # many windows long
+    y = filters.lag_periodic(x, dt, tau, gain=-3.0)
+    end = filters.lag(x, dt, tau, -3.0, y0=y[0])
+    np.testing.assert_allclose(end, y, rtol=0, atol=1e-12)
+    a = np.exp(-dt / tau)
+    assert np.isclose(a * y[-1] + (1 - a) * -3.0 * x[-1], y[0], rtol=0, atol=1e-12)
+
+
+def test_frequency_response_corner():
+    magnitude_db, phase = filters.frequency_response(filters.LOWPASS, 1e3, 2.0, [1e3])
+    assert np.isclose(magnitude_db[0], 20 * np.log10(2 / np.sqrt(2)))
+    assert np.isclose(phase[0], -45.0)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""``schmitt`` against the per-sample loop it replaces."""
+
+import numpy as np
+import pytest
+
+from labsim.hysteresis import schmitt, schmitt_reference
+
+
+@pytest.mark.parametrize("v_utp, v_ltp", [(1.0, -1.0), (0.5, 0.5), (0.0, -2.0), (-1.0, 1.0)])
+def test_matches_reference(v_utp, v_ltp):
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 1, 5000, endpoint=False)
+    y = 3 * np.sin(2 * np.pi * 5 * t) + rng.normal(0, 0.5, len(t))
+    y[::97] = v_utp  # samples exactly on a threshold
+    y[::89] = v_ltp
+    expected = schmitt_reference(y, v_utp, v_ltp, 12.0, -12.0)
+    np.testing.assert_array_equal(schmitt(y, v_utp, v_ltp, 12.0, -12.0), expected)
+
+
+@pytest.mark.parametrize("first", [2.0, -2.0, 0.0, np.nan])
+def test_initial_state(first):
+    y = np.array([first, 0.0, 0.0])
+    np.testing.assert_array_equal(schmitt(y, 1.0, -1.0, 5.0, -5.0),
+                                  schmitt_reference(y, 1.0, -1.0, 5.0, -5.0))
+
+
+def test_nan_keeps_state():
+    y = np.array([2.0, np.nan, -2.0, np.nan, 0.0])
+    np.testing.assert_array_equal(schmitt(y, 1.0, -1.0, 5.0, -5.0), [-5.0, -5.0, 5.0, 5.0, 5.0])
+
+
+def test_empty():
+    assert len(schmitt(np.empty(0), 1.0, -1.0, 5.0, -5.0)) == 0
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Segment-wise ``transient`` against the per-sample loop ``transient_reference``."""
+
+import numpy as np
+import pytest
+
+from labsim import opamp, waveforms
+
+# waveform, amplitude (V), frequency (Hz), ideal gain, noise gain
+CASES = [
+    (waveforms.sine, 0.5, 1e3, -10.0, 11.0),
+    (waveforms.sine, 3.0, 1e3, -10.0, 11.0),
+    (waveforms.square, 2.0, 10e3, -10.0, 11.0),
+    (waveforms.sine, 5.0, 100e3, 1.0, 1.0),
+    (waveforms.triangle, 1.0, 1e6, -10.0, 11.0),
+]
+
+
+def capture(wave, amp, freq, points=6000, cycles=3):
+    t = waveforms.time_base(points, cycles / freq)
+    return wave(t, freq, amp), t[1] - t[0]
+
+
+@pytest.mark.parametrize("wave, amp, freq, gain, noise_gain", CASES)
+def test_transient_matches_reference(wave, amp, freq, gain, noise_gain):
+    x, dt = capture(wave, amp, freq)
+    dc_gain, bandwidth = opamp.closed_loop(gain, noise_gain)
+    reference = opamp.transient_reference(x, dt, dc_gain, bandwidth)
+    np.testing.assert_allclose(opamp.transient(x, dt, dc_gain, bandwidth), reference, rtol=0, atol=1e-9)
+
+
+# Slew-dominated windows (the last two cases) can take more than MAX_PASSES
+# passes to repeat exactly; the linear and clipping ones settle at once.
+@pytest.mark.parametrize("wave, amp, freq, gain, noise_gain", CASES[:3])
+def test_transient_periodic_repeats(wave, amp, freq, gain, noise_gain):
+    x, dt = capture(wave, amp, freq)
+    dc_gain, bandwidth = opamp.closed_loop(gain, noise_gain)
+    y = opamp.transient_periodic(x, dt, dc_gain, bandwidth)
+    # One more window started from the end state gives the same samples.
+    step = opamp._Step(dt, bandwidth, opamp.SLEW_RATE, opamp.RAIL)
+    again = opamp.transient(x, dt, dc_gain, bandwidth, y0=step(y[-1], dc_gain * x[-1]))
+    np.testing.assert_allclose(again, y, rtol=0, atol=1e-6)
+
+
+def test_rails():
+    x, dt = capture(waveforms.sine, 3.0, 1e3)
+    dc_gain, bandwidth = opamp.closed_loop(-10.0, 11.0)
+    y = opamp.transient(x, dt, dc_gain, bandwidth)
+    assert np.abs(y).max() <= opamp.RAIL
+    assert np.isclose(np.abs(y).max(), opamp.RAIL)
+
+
+def test_phase_shift():
+    t = waveforms.time_base(1000, 2e-3)
+    x = np.sin(2 * np.pi * 1e3 * t)
+    assert opamp.phase_shift(x, -x, t, 1e3) == 180.0
+    assert np.isclose(opamp.phase_shift(x, np.cos(2 * np.pi * 1e3 * t), t, 1e3), 90.0)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Start-up transients of ``labsim.oscillators``: early stop and settled amplitude."""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from labsim import oscillators
+
+pytest.importorskip("scipy")
+
+R, C = 10e3, 0.1e-6
+FORMULA = 1 / (2 * np.pi * R * C)
+
+
+@pytest.mark.parametrize("stabilizer, gain", [("diodes", 3.1), ("diodes", 29.0), ("diodes", 50.0),
+                                              ("none", 5.0), ("none", 50.0),
+                                              ("lamp", 3.5), ("lamp", 5.0), ("lamp", 29.0)])
+def test_wien_settles_early(stabilizer, gain):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        t, y, frequency, settled = oscillators.wien_startup(R, C, gain, stabilizer)
+    assert settled
+    assert len(y) < 100 * oscillators.STEPS_PER_CYCLE
+    assert 0 < frequency <= 1.01 * FORMULA
+
+
+@pytest.mark.parametrize("gain", [3.5, 5.0])
+def test_lamp_amplitude(gain):
+    t, y, _, settled = oscillators.wien_startup(R, C, gain, "lamp")
+    rms, _ = oscillators.cycle_envelope(y)
+    expected = np.sqrt(oscillators.LAMP_POWER * (gain - 3) / 2)
+    assert settled
+    assert abs(rms[-1] / expected - 1) < 0.02
+
+
+def test_lamp_has_no_limit_cycle():
+    saved = oscillators.SETTLED_TOLERANCE
+    oscillators.SETTLED_TOLERANCE = 0.0  # never stop early
+    try:
+        _, y, _, _ = oscillators.wien_startup(R, C, 5.0, "lamp", max_cycles=300)
+    finally:
+        oscillators.SETTLED_TOLERANCE = saved
+    rms, _ = oscillators.cycle_envelope(y)
+    assert np.ptp(rms[-100:]) < 1e-3 * rms[-1]
+
+
+def test_wien_below_critical_gain_dies_out():
+    _, y, _, settled = oscillators.wien_startup(R, C, 2.9, "diodes")
+    assert not settled
+    assert np.abs(y[-oscillators.STEPS_PER_CYCLE:]).max() < oscillators.DECAYED * oscillators.SEED
+
+
+def test_wien_frequency_at_small_amplitude():
+    _, _, frequency, settled = oscillators.wien_startup(R, C, 3.05, "diodes")
+    assert settled
+    assert abs(frequency / FORMULA - 1) < 0.01
+
+
+def test_phase_shift_frequency():
+    _, _, frequency, settled = oscillators.phase_shift_startup(R, C, 29.5)
+    assert settled
+    assert abs(frequency * 2 * np.pi * R * C * np.sqrt(6) - 1) < 0.01
+
+
+def test_cycle_envelope_of_a_sine():
+    n = np.arange(20000)
+    rms, periods = oscillators.cycle_envelope(2 * np.sin(2 * np.pi * n / 203.7 + 0.4))
+    np.testing.assert_allclose(rms, np.sqrt(2), rtol=1e-5)
+    np.testing.assert_allclose(periods, 203.7, rtol=1e-6)
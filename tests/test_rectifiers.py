@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Diode solver, smoothing capacitor and meter of ``labsim.rectifiers``."""
+
+import numpy as np
+import pytest
+
+from labsim import rectifiers
+
+
+def diode_reference(E, R):
+    from scipy.optimize import brentq
+
+    nvt = rectifiers.N * rectifiers.VT
+    return brentq(lambda v: rectifiers.IS * np.expm1(v / nvt) - (E - v) / R,
+                  min(E, 0.0) - 1, nvt * np.log1p(max(E, 0.0) / (R * rectifiers.IS)), xtol=1e-15)
+
+
+def test_diode_matches_brentq():
+    pytest.importorskip("scipy")
+    E = np.concatenate([-np.logspace(-3, 6, 30), [0.0], np.logspace(-6, 6, 60)])
+    R = np.where(np.arange(len(E)) % 2, rectifiers.LOAD, 2e9)
+    vd, current = rectifiers._diode(E, R)
+    expected = np.array([diode_reference(e, r) for e, r in zip(E, R)])
+    np.testing.assert_allclose(vd, expected, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(current, (E - expected) / R, rtol=1e-9, atol=1e-14)
+
+
+def test_superdiode_tracks_input():
+    x = np.linspace(-5, 5, 1001)
+    y = rectifiers.superdiode(x)
+    assert np.abs(y[x > 0.01] - x[x > 0.01]).max() < 1e-4
+    # Reverse-biased by the negative rail, the diode only leaks IS into RL.
+    np.testing.assert_allclose(y[x < 0], -rectifiers.IS * rectifiers.LOAD, rtol=1e-3)
+
+
+def test_passive_loses_a_diode_drop():
+    y = rectifiers.passive(np.array([5.0]))
+    assert 0.5 < 5.0 - y[0] < 0.8
+    bridge = rectifiers.passive(np.array([-5.0]), full_wave=True)
+    assert 1.0 < 5.0 - bridge[0] < 1.6
+
+
+def smoothed_loop(y, dt, tau, v0):
+    a = np.exp(-dt / tau)
+    out = np.empty(len(y))
+    v = v0
+    for n, yn in enumerate(y):
+        v = max(v * a, yn) if n else max(v, yn)
+        out[n] = v
+    return out
+
+
+@pytest.mark.parametrize("tau", [1e-4, 1e-2, 0.1, 10.0])
+def test_smoothed_matches_loop(tau):
+    rng = np.random.default_rng(2)
+    t = np.linspace(0, 0.05, 20000, endpoint=False)
+    y = np.abs(np.sin(2 * np.pi * 100 * t)) + rng.normal(0, 0.01, len(t))
+    dt = t[1] - t[0]
+    np.testing.assert_allclose(rectifiers.smoothed(y, dt, tau), smoothed_loop(y, dt, tau, y[0]),
+                               rtol=0, atol=1e-12)
+    np.testing.assert_allclose(rectifiers.smoothed(y, dt, tau, v0=2.0), smoothed_loop(y, dt, tau, 2.0),
+                               rtol=0, atol=1e-12)
+
+
+def test_smoothed_periodic_repeats():
+    t = np.linspace(0, 0.03, 3000, endpoint=False)
+    y = np.abs(np.sin(2 * np.pi * 100 * t))
+    dt = t[1] - t[0]
+    out = rectifiers.smoothed_periodic(y, dt, 0.1)
+    assert np.isclose(out[0], max(out[-1] * np.exp(-dt / 0.1), y[0]), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(out[1000:2000], out[:1000], rtol=0, atol=1e-12)
+
+
+def test_smoothed_charges_on_the_last_sample():
+    y = [1, 0.5, 0.3, 0.2, 2.0]
+    np.testing.assert_allclose(rectifiers.smoothed(y, 0.1, 1.0, out=np.full(5, np.nan)),
+                               smoothed_loop(y, 0.1, 1.0, 1.0))
+    t = np.linspace(0, 0.03, 300, endpoint=False)
+    y = np.maximum(np.cos(2 * np.pi * 100 * t), 0)
+    dt = t[1] - t[0]
+    for capacitance in (200e-6, 300e-6):
+        out = rectifiers.smoothed_periodic(y, dt, rectifiers.LOAD * capacitance,
+                                           out=np.full(len(y), np.nan))
+        assert np.all(np.isfinite(out))
+        assert np.ptp(out) < 0.01
+
+
+def test_meter_half_wave():
+    t = np.linspace(0, 1, 200000, endpoint=False)
+    y = np.maximum(np.sin(2 * np.pi * 50 * t), 0)
+    meter = rectifiers.Meter().feed(y, chunk_size=1000)
+    assert np.isclose(meter.dc, 1 / np.pi)
+    assert np.isclose(meter.rms, 0.5)
+    assert np.isclose(meter.ripple, 1.0)
+    assert np.isclose(meter.form_factor, np.pi / 2)
+    assert np.isclose(meter.ac_rms, np.std(y))
+
+
+def test_meter_chunks_and_empty():
+    rng = np.random.default_rng(3)
+    y = rng.normal(1.0, 0.2, 12345)
+    whole = rectifiers.Meter().feed(y)
+    chunked = rectifiers.Meter().feed(y, chunk_size=100)
+    assert np.isclose(whole.rms, chunked.rms) and whole.ripple == chunked.ripple
+    empty = rectifiers.Meter()
+    assert empty.dc == 0.0 and empty.rms == 0.0 and np.isnan(empty.form_factor)